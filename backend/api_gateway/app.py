@@ -1,46 +1,54 @@
-import os
-from flask import Flask, request, jsonify, Response
-from flask_cors import CORS
-import requests
-from config import Config
-from event_bus import event_bus
-from shared.event_client import Events
-import json
-from datetime import datetime
-from queue import Queue
-import threading
-from routes import api_gateway
-
-
-def create_app():
-    app = Flask(__name__)
-    CORS(app)
-    app.config.from_object(Config)
-    app.register_blueprint(api_gateway)
-
-    # # ===== Start EventBus once =====
-    # if not event_bus.running:
-    #     event_bus.start()
-    #     print("✅ EventBus started")
-
-    # @app.teardown_appcontext
-    # def shutdown(exception=None):
-    #     """Stop EventBus on shutdown"""
-    #     event_bus.stop()
-    #     print("❌ API Gateway shutting down")
-
-    @app.route("/")
-    def index():
-        return jsonify({'message': 'API GATEWAY running.. try /v1/... endpoints'}), 200
-
-    return app
-
-if __name__ == '__main__':
-    app = create_app()
-    port = int(os.getenv('PORT', 5000))
-    app.run(
-        host='0.0.0.0',
-        port=port,
-        debug=app.config['DEBUG'],
-        threaded=True
+import os
+import atexit
+from flask import Flask, request, jsonify, Response
+from flask_cors import CORS
+import requests
+from config import Config
+from shared.json_provider import FastJSONProvider
+from event_bus import event_bus
+from event_log import event_log
+from shared.event_client import Events
+import json
+from datetime import datetime
+from queue import Queue
+import threading
+from routes import api_gateway
+from upstream import upstreams
+
+
+def create_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    # X-Sync-Cursor: the task service's re-issued delta-sync cursor on 204
+    CORS(app, expose_headers=['X-Sync-Cursor'])
+    app.config.from_object(Config)
+    app.register_blueprint(api_gateway)
+
+    # Close pooled upstream sockets when the process exits
+    atexit.register(upstreams.close)
+
+    # Open the event log before anything can append to it
+    if not event_log.running:
+        event_log.start()
+        atexit.register(event_log.stop)
+
+    # Start the EventBus workers once; drain what is queued on exit
+    if not event_bus.running:
+        event_bus.start()
+        atexit.register(event_bus.stop)
+
+    @app.route("/")
+    def index():
+        return jsonify({'message': 'API GATEWAY running.. try /v1/... endpoints'}), 200
+
+    return app
+
+if __name__ == '__main__':
+    app = create_app()
+    port = int(os.getenv('PORT', 5000))
+    app.run(
+        host='0.0.0.0',
+        port=port,
+        debug=app.config['DEBUG'],
+        threaded=True
     )
\ No newline at end of file
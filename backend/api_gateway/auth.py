@@ -0,0 +1,58 @@
+import datetime
+import jwt
+from jwt import InvalidTokenError
+from flask import request
+from config import Config
+
+
+def _decode_access_token(token: str):
+    return jwt.decode(
+        token,
+        Config.JWT_SECRET,
+        algorithms=["HS256"],
+        issuer=Config.JWT_ISS,
+        audience=Config.JWT_AUD,
+    )
+
+def make_stream_ticket(user_id: str) -> str:
+    """
+    Issue a token that only opens the user's event stream. It outlives an
+    access token so EventSource reconnects keep working after the access
+    token behind it has expired.
+    """
+    now = datetime.datetime.utcnow()
+    payload = {
+        "sub": str(user_id),
+        "iss": Config.JWT_ISS,
+        "aud": Config.JWT_AUD,
+        "iat": now,
+        "exp": now + datetime.timedelta(seconds=Config.SSE_TICKET_TTL_SEC),
+        "scope": "events",
+    }
+    return jwt.encode(payload, Config.JWT_SECRET, algorithm="HS256")
+
+def get_user_id_from_request(scopes=("access",)) -> str | None:
+    """
+    Resolve the caller from an access token issued by the user service.
+
+    Reads `Authorization: Bearer <token>`, or `?access_token=` / `?ticket=`
+    for clients that cannot set headers (the browser EventSource API).
+    `scopes` lists the token scopes accepted (e.g. "events" for stream tickets).
+    """
+    token = None
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        token = auth.split(" ", 1)[1].strip()
+    if not token:
+        token = request.args.get("access_token") or request.args.get("ticket")
+    if not token or not Config.JWT_SECRET:
+        return None
+    try:
+        payload = _decode_access_token(token)
+        if payload.get("scope") not in scopes:
+            return None
+        return str(payload["sub"])
+    except InvalidTokenError:
+        return None
+    except Exception:
+        return None
@@ -1,11 +1,53 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Config:
-    DEBUG = os.getenv('DEBUG', 'False') == 'True'
-    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL')
-    PET_SERVICE_URL = os.getenv('PET_SERVICE_URL')
-    TASK_SERVICE_URL = os.getenv('TASK_SERVICE_URL')
-    DATA_TRACKING_SERVICE_URL = os.getenv('DATA_TRACKING_SERVICE_URL')
\ No newline at end of file
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    DEBUG = os.getenv('DEBUG', 'False') == 'True'
+    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL')
+    PET_SERVICE_URL = os.getenv('PET_SERVICE_URL')
+    TASK_SERVICE_URL = os.getenv('TASK_SERVICE_URL')
+    DATA_TRACKING_SERVICE_URL = os.getenv('DATA_TRACKING_SERVICE_URL')
+
+    # Access tokens issued by the user service (same values as user_service)
+    JWT_SECRET = os.getenv('JWT_SECRET')
+    JWT_ISS = os.getenv('JWT_ISS')
+    JWT_AUD = os.getenv('JWT_AUD')
+
+    # Upstream connection pools (one keep-alive pool per backend service)
+    UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '20'))                 # sockets kept per service
+    UPSTREAM_POOL_BLOCK = os.getenv('UPSTREAM_POOL_BLOCK', 'False') == 'True'       # wait for a free socket instead of opening extras
+    UPSTREAM_KEEPALIVE = os.getenv('UPSTREAM_KEEPALIVE', 'True') == 'True'          # reuse sockets between requests
+    UPSTREAM_IDLE_TIMEOUT_SEC = float(os.getenv('UPSTREAM_IDLE_TIMEOUT_SEC', '60')) # close a service's sockets after this much idle time
+    UPSTREAM_TIMEOUT_SEC = float(os.getenv('UPSTREAM_TIMEOUT_SEC', '10'))
+
+    # Proxy body handling
+    PROXY_STREAMING = os.getenv('PROXY_STREAMING', 'False') == 'True'                    # pass bodies through chunk by chunk
+    PROXY_MAX_BUFFER_BYTES = int(os.getenv('PROXY_MAX_BUFFER_BYTES', str(64 * 1024)))   # max body bytes held per request while streaming
+
+    # SSE fan-out (/v1/events)
+    SSE_SUBSCRIBER_BUFFER = int(os.getenv('SSE_SUBSCRIBER_BUFFER', '256'))              # events buffered per connected client
+    SSE_SLOW_CONSUMER_POLICY = os.getenv('SSE_SLOW_CONSUMER_POLICY', 'drop_oldest')     # drop_oldest | disconnect
+    SSE_REPLAY_BUFFER = int(os.getenv('SSE_REPLAY_BUFFER', '1000'))                     # recent events kept for Last-Event-ID replay
+    SSE_REPLAY_SCAN_MAX = int(os.getenv('SSE_REPLAY_SCAN_MAX', '50000'))                 # log records one reconnect replay may read
+    SSE_HEARTBEAT_SEC = float(os.getenv('SSE_HEARTBEAT_SEC', '5'))
+    SSE_TICKET_TTL_SEC = int(os.getenv('SSE_TICKET_TTL_SEC', str(24 * 3600)))          # lifetime of a POST /v1/events/ticket stream token
+
+    # Internal event bus
+    EVENT_BUS_QUEUE_SIZE = int(os.getenv('EVENT_BUS_QUEUE_SIZE', '1000'))                # bounded queue per event type
+    EVENT_BUS_OVERFLOW = os.getenv('EVENT_BUS_OVERFLOW', 'block')                       # block | drop | spill
+    EVENT_BUS_BLOCK_TIMEOUT_SEC = float(os.getenv('EVENT_BUS_BLOCK_TIMEOUT_SEC', '1'))  # 'block' gives up (drops) after this
+    EVENT_BUS_WORKERS = int(os.getenv('EVENT_BUS_WORKERS', '4'))
+    EVENT_BUS_SPILL_DIR = os.getenv('EVENT_BUS_SPILL_DIR', 'spill')
+
+    # Durable event log
+    EVENT_LOG_DIR = os.getenv('EVENT_LOG_DIR', 'event_log')
+    EVENT_LOG_SEGMENT_BYTES = int(os.getenv('EVENT_LOG_SEGMENT_BYTES', str(16 * 1024 * 1024)))
+    EVENT_LOG_FSYNC_INTERVAL_MS = int(os.getenv('EVENT_LOG_FSYNC_INTERVAL_MS', '50'))            # fsync batching window
+    EVENT_LOG_SYNC_ACK = os.getenv('EVENT_LOG_SYNC_ACK', 'False') == 'True'   # ack only after fsync
+    EVENT_LOG_RETENTION_BYTES = int(os.getenv('EVENT_LOG_RETENTION_BYTES', str(256 * 1024 * 1024)))
+    EVENT_LOG_RETENTION_HOURS = float(os.getenv('EVENT_LOG_RETENTION_HOURS', '168'))
+
+    # Event ingestion
+    EVENT_BATCH_MAX = int(os.getenv('EVENT_BATCH_MAX', '500'))                         # events per POST /v1/events batch
@@ -1,60 +1,291 @@
-from queue import Queue
-import threading
-from datetime import datetime
-from typing import Callable, Dict, List
-
-class EventBus:
-    def __init__(self):
-        self.subscribers: Dict[str, List[Callable]] = {}
-        self.event_queue = Queue()
-        self.running = False
-        self.thread = None
-        self.lock = threading.Lock()
-
-    def subscribe(self, event_type: str, callback: Callable):
-        with self.lock:
-            if event_type not in self.subscribers:
-                self.subscribers[event_type] = []
-            self.subscribers[event_type].append(callback)
-
-    def publish(self, event_type: str, data: dict):
-        event = {
-            'type': event_type,
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.event_queue.put(event)
-
-    def start(self):
-        if not self.running:
-            self.running = True
-            self.thread = threading.Thread(target=self._run, daemon=True)
-            self.thread.start()
-            print("✅ EventBus started")
-
-    def stop(self):
-        self.running = False
-        if self.thread:
-            self.thread.join(timeout=5)
-        print("❌ EventBus stopped")
-
-    def _run(self):
-        while self.running:
-            try:
-                event = self.event_queue.get(timeout=1)
-                self._dispatch_event(event)
-            except:
-                continue
-
-    def _dispatch_event(self, event: dict):
-        event_type = event['type']
-        with self.lock:
-            callbacks = self.subscribers.get(event_type, [])
-        for cb in callbacks:
-            try:
-                cb(event)
-            except Exception as e:
-                print(f"Error in event callback: {e}")
-
-# Global instance
-event_bus = EventBus()
+from queue import Queue, Empty, Full
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List
+from config import Config
+
+OVERFLOW_POLICIES = ('block', 'drop', 'spill')
+
+
+class _Spill:
+    """
+    Overflow file for one event type (JSON lines), used by the 'spill' policy.
+    Events are read back in the order they were written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.read_pos = 0
+        self.pending = 0
+        if os.path.exists(path):
+            # Left over from a previous run: replay it
+            with open(path, 'r', encoding='utf-8') as f:
+                self.pending = sum(1 for _ in f)
+
+    def append(self, event: dict):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + '\n')
+        self.pending += 1
+
+    def take(self, limit: int) -> List[dict]:
+        if not self.pending or limit <= 0:
+            return []
+        events = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            f.seek(self.read_pos)
+            while len(events) < limit:
+                line = f.readline()
+                if not line:
+                    break
+                events.append(json.loads(line))
+            self.read_pos = f.tell()
+        self.pending -= len(events)
+        if self.pending <= 0:
+            self.pending = 0
+            self.read_pos = 0
+            os.remove(self.path)
+        return events
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for the gateway.
+
+    - Each event type has its own bounded queue. When it is full the
+      overflow policy applies: 'block' (wait up to block_timeout, then drop),
+      'drop', or 'spill' (append to a per-type file and feed it back in order
+      once the queue has room).
+    - Dispatch runs on a pool of worker threads. Every event type is pinned to
+      one worker, so callbacks see the events of a type in publish order.
+    - A supervisor thread restarts workers that die.
+    - metrics() reports queue depth, dispatch latency and callback errors.
+    """
+
+    def __init__(self, queue_size: int = 1000, overflow: str = 'block',
+                 block_timeout: float = 1.0, workers: int = 4, spill_dir: str = 'spill'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.subscribers: Dict[str, List[Callable]] = {}
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.spill_dir = spill_dir
+        self.queues: Dict[str, Queue] = {}
+        self.spills: Dict[str, _Spill] = {}
+        self.stats: Dict[str, dict] = {}
+        self.stats_lock = threading.Lock()
+        # One token per queued event, on the queue of the worker that owns its type
+        self.shards: List[Queue] = [Queue() for _ in range(max(workers, 1))]
+        self.workers: List[threading.Thread] = []
+        self.supervisor = None
+        self.running = False
+        self.lock = threading.Lock()
+
+    def subscribe(self, event_type: str, callback: Callable):
+        with self.lock:
+            if event_type not in self.subscribers:
+                self.subscribers[event_type] = []
+            self.subscribers[event_type].append(callback)
+
+    def publish(self, event_type: str, data: dict) -> bool:
+        """Queue an event. Returns False if it was dropped on overflow."""
+        event = {
+            'type': event_type,
+            'data': data,
+            'timestamp': datetime.now().isoformat()
+        }
+        queue = self._queue_for(event_type)
+        self._count(event_type, 'published')
+
+        if self.overflow == 'spill':
+            spill = self.spills[event_type]
+            with spill.lock:
+                # Keep order: once spilling, later events go behind the spilled ones
+                if spill.pending:
+                    spill.append(event)
+                    self._count(event_type, 'spilled')
+                    return True
+                try:
+                    queue.put_nowait((time.monotonic(), event))
+                except Full:
+                    spill.append(event)
+                    self._count(event_type, 'spilled')
+                    return True
+        else:
+            try:
+                if self.overflow == 'block':
+                    queue.put((time.monotonic(), event), timeout=self.block_timeout)
+                else:
+                    queue.put_nowait((time.monotonic(), event))
+            except Full:
+                self._count(event_type, 'dropped')
+                print(f"⚠️  EventBus queue full, dropped event: {event_type}")
+                return False
+
+        self.shards[self._shard(event_type)].put(event_type)
+        return True
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            if self.overflow == 'spill':
+                os.makedirs(self.spill_dir, exist_ok=True)
+                self._load_spills()
+            self.workers = [self._start_worker(i) for i in range(len(self.shards))]
+            self.supervisor = threading.Thread(target=self._supervise, daemon=True)
+            self.supervisor.start()
+            print(f"✅ EventBus started ({len(self.workers)} workers, overflow={self.overflow})")
+
+    def stop(self):
+        """Stop the workers after they dispatch what is already queued."""
+        if not self.running:
+            return
+        self.running = False
+        deadline = time.monotonic() + 5
+        for thread in self.workers:
+            thread.join(timeout=max(deadline - time.monotonic(), 0))
+        if self.supervisor:
+            self.supervisor.join(timeout=1)
+        print("❌ EventBus stopped")
+
+    def metrics(self) -> dict:
+        types = {}
+        with self.stats_lock:
+            snapshot = {event_type: dict(stats) for event_type, stats in self.stats.items()}
+        for event_type, stats in snapshot.items():
+            queue = self.queues.get(event_type)
+            dispatched = stats['dispatched']
+            types[event_type] = {
+                'depth': queue.qsize() if queue else 0,
+                'spill_pending': self.spills[event_type].pending if event_type in self.spills else 0,
+                'published': stats['published'],
+                'dispatched': dispatched,
+                'dropped': stats['dropped'],
+                'spilled': stats['spilled'],
+                'callback_errors': stats['errors'],
+                'dispatch_latency_ms_avg': round(stats['latency_total'] * 1000 / dispatched, 3) if dispatched else 0.0,
+                'dispatch_latency_ms_max': round(stats['latency_max'] * 1000, 3),
+            }
+        return {
+            'running': self.running,
+            'workers_alive': sum(1 for t in self.workers if t.is_alive()),
+            'queue_size': self.queue_size,
+            'overflow': self.overflow,
+            'types': types,
+        }
+
+    def _queue_for(self, event_type: str) -> Queue:
+        queue = self.queues.get(event_type)
+        if queue is None:
+            with self.lock:
+                queue = self.queues.get(event_type)
+                if queue is None:
+                    self.stats[event_type] = {
+                        'published': 0, 'dispatched': 0, 'dropped': 0, 'spilled': 0,
+                        'errors': 0, 'latency_total': 0.0, 'latency_max': 0.0,
+                    }
+                    if self.overflow == 'spill':
+                        self.spills[event_type] = _Spill(self._spill_path(event_type))
+                    queue = Queue(maxsize=self.queue_size)
+                    self.queues[event_type] = queue
+        return queue
+
+    def _shard(self, event_type: str) -> int:
+        return zlib.crc32(event_type.encode('utf-8')) % len(self.shards)
+
+    def _start_worker(self, index: int) -> threading.Thread:
+        thread = threading.Thread(target=self._run, args=(index,), daemon=True,
+                                  name=f"event-bus-worker-{index}")
+        thread.start()
+        return thread
+
+    def _supervise(self):
+        while self.running:
+            for i, thread in enumerate(self.workers):
+                if not thread.is_alive() and self.running:
+                    print(f"⚠️  EventBus worker {i} died, restarting")
+                    self.workers[i] = self._start_worker(i)
+            time.sleep(1)
+
+    def _run(self, index: int):
+        shard = self.shards[index]
+        while self.running or not shard.empty():
+            try:
+                event_type = shard.get(timeout=0.5)
+            except Empty:
+                self._refill_from_spill(index)
+                continue
+            queued_at, event = self.queues[event_type].get_nowait()
+            self._dispatch_event(event)
+            self._record(event_type, queued_at)
+            if self.overflow == 'spill':
+                self._refill_from_spill(index, event_type)
+
+    def _dispatch_event(self, event: dict):
+        event_type = event['type']
+        with self.lock:
+            callbacks = list(self.subscribers.get(event_type, []))
+        for cb in callbacks:
+            try:
+                cb(event)
+            except Exception as e:
+                self._count(event_type, 'errors')
+                print(f"❌ Error in event callback for {event_type}: {e}")
+
+    def _count(self, event_type: str, key: str):
+        with self.stats_lock:
+            self.stats[event_type][key] += 1
+
+    def _record(self, event_type: str, queued_at: float):
+        latency = time.monotonic() - queued_at
+        with self.stats_lock:
+            stats = self.stats[event_type]
+            stats['dispatched'] += 1
+            stats['latency_total'] += latency
+            if latency > stats['latency_max']:
+                stats['latency_max'] = latency
+
+    def _refill_from_spill(self, index: int, only_type: str = None):
+        """Move spilled events of this worker's types back into their queues."""
+        for event_type, spill in list(self.spills.items()):
+            if only_type and event_type != only_type:
+                continue
+            if not spill.pending or self._shard(event_type) != index:
+                continue
+            queue = self.queues[event_type]
+            with spill.lock:
+                for event in spill.take(self.queue_size - queue.qsize()):
+                    queue.put_nowait((time.monotonic(), event))
+                    self.shards[index].put(event_type)
+
+    def _load_spills(self):
+        # Spill files left by a previous run; idle workers feed them back in.
+        # The file name is sanitised, so the type is read from the events.
+        for name in os.listdir(self.spill_dir):
+            if not name.endswith('.jsonl'):
+                continue
+            with open(os.path.join(self.spill_dir, name), 'r', encoding='utf-8') as f:
+                first = f.readline()
+            if first:
+                self._queue_for(json.loads(first)['type'])
+
+    def _spill_path(self, event_type: str) -> str:
+        # Event types come from request bodies: keep them out of path syntax
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', event_type)
+        return os.path.join(self.spill_dir, f"{safe}-{zlib.crc32(event_type.encode('utf-8')):08x}.jsonl")
+
+
+# Global instance
+event_bus = EventBus(
+    queue_size=Config.EVENT_BUS_QUEUE_SIZE,
+    overflow=Config.EVENT_BUS_OVERFLOW,
+    block_timeout=Config.EVENT_BUS_BLOCK_TIMEOUT_SEC,
+    workers=Config.EVENT_BUS_WORKERS,
+    spill_dir=Config.EVENT_BUS_SPILL_DIR,
+)
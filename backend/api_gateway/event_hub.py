@@ -0,0 +1,243 @@
+import json
+import threading
+from collections import deque, namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import Config
+
+# One published event. `frame` is the ready-to-send SSE text, encoded once
+# per event no matter how many clients receive it.
+HubEvent = namedtuple('HubEvent', ['id', 'type', 'user_id', 'frame'])
+
+SLOW_CONSUMER_POLICIES = ('drop_oldest', 'disconnect')
+
+
+class Subscriber:
+    """
+    One SSE connection: a bounded ring buffer plus a wakeup flag.
+
+    The flag is only set when it is clear, so a burst of events wakes the
+    connection's thread once and it drains everything that piled up.
+    `types` optionally limits the connection to some event types.
+    Events replayed on connect are held apart in `replay` (up to the hub's
+    replay size) and sent before the live buffer, so a long replay is not
+    squeezed through the live buffer's limit. Live events up to
+    `replayed_upto` are already in the replay and are not buffered again.
+    """
+
+    def __init__(self, user_id: str, types: Optional[frozenset],
+                 buffer_size: int, policy: str):
+        self.user_id = user_id
+        self.types = types
+        self.buffer = deque()
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.dropped = 0
+        self.replay: List[HubEvent] = []
+        # Events up to this id were replayed from history; skip them if they arrive live
+        self.replayed_upto = 0
+
+    def wants(self, event: HubEvent) -> bool:
+        return self.types is None or event.type in self.types
+
+    def push(self, event: HubEvent):
+        with self.lock:
+            if self.closed or event.id <= self.replayed_upto:
+                return
+            if len(self.buffer) >= self.buffer_size:
+                if self.policy == 'disconnect':
+                    self.closed = True
+                    self.ready.set()
+                    return
+                self.buffer.popleft()
+                self.dropped += 1
+            self.buffer.append(event)
+        if not self.ready.is_set():
+            self.ready.set()
+
+    def set_replay(self, events: List[HubEvent], upto: int):
+        """Hold `events` (history up to id `upto`) for take_replay() and drop the live overlap."""
+        with self.lock:
+            self.replay = events
+            self.replayed_upto = upto
+            if self.buffer and self.buffer[0].id <= upto:
+                self.buffer = deque(event for event in self.buffer if event.id > upto)
+
+    def take_replay(self) -> List[HubEvent]:
+        """Return (once) the events replayed on connect."""
+        with self.lock:
+            events, self.replay = self.replay, []
+        return events
+
+    def wait(self, timeout: float) -> List[HubEvent]:
+        """Block until events arrive (or timeout) and return all buffered events."""
+        self.ready.wait(timeout)
+        # Clear before draining: anything pushed after this point sets it again.
+        self.ready.clear()
+        with self.lock:
+            events = list(self.buffer)
+            self.buffer.clear()
+        return events
+
+
+class EventHub:
+    """
+    Fan-out hub for the SSE stream.
+
+    Subscribers belong to a user and are indexed by user_id, so an event is
+    only pushed into the ring buffers of its own user's connections (those
+    whose type filter matches). Dispatch cost depends on that user's
+    connections, not on everyone connected; events without a user_id are not
+    delivered. Events get monotonically increasing ids, and the most recent
+    ones are kept in a shared replay buffer so a reconnecting client can
+    resume from `Last-Event-ID`.
+
+    With a `history` source (the gateway's event log) ids are the log
+    offsets passed to publish(), and reconnecting clients are replayed from
+    the log instead, which also works across gateway restarts. `history`
+    is called as history(after_id, limit, user_id, types) and returns the
+    user's events after `after_id` as (id, event) pairs plus the last id it
+    covered. publish() must then be called in id order. History is read
+    outside the hub lock, so a long replay does not hold up publish();
+    the new subscriber buffers live events meanwhile and drops the ones
+    the history already covered.
+
+    Usage:
+        from event_hub import event_hub
+
+        event_hub.publish(event)
+        subscriber = event_hub.subscribe('42', types={'task_deleted'}, last_event_id=41)
+        for hub_event in subscriber.wait(timeout=5): ...
+        event_hub.unsubscribe(subscriber)
+    """
+
+    def __init__(self, buffer_size: int = 256, replay_size: int = 1000,
+                 slow_consumer_policy: str = 'drop_oldest',
+                 history: Optional[Callable[..., Tuple[List[Tuple[int, dict]], int]]] = None):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"slow_consumer_policy must be one of {SLOW_CONSUMER_POLICIES}")
+        self.buffer_size = buffer_size
+        self.replay_size = replay_size
+        self.history = history
+        self.slow_consumer_policy = slow_consumer_policy
+        self.recent = deque(maxlen=replay_size)
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.subscriber_count = 0
+        self.next_id = 1
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+        self.lock = threading.Lock()
+
+    def publish(self, event: dict, event_id: Optional[int] = None) -> int:
+        """Fan `event` out under `event_id` (default: the next id) and return the id."""
+        # Delivery happens under the hub lock so every subscriber sees events
+        # in id order even with concurrent publishers.
+        with self.lock:
+            if event_id is None:
+                event_id = self.next_id
+            self.next_id = max(self.next_id, event_id + 1)
+            hub_event = self._hub_event(event_id, event)
+            self.recent.append(hub_event)
+            self.published += 1
+            for subscriber in self.subscribers.get(hub_event.user_id, ()):
+                if subscriber.wants(hub_event):
+                    subscriber.push(hub_event)
+        return event_id
+
+    def subscribe(self, user_id: str, types: Optional[Iterable[str]] = None,
+                  last_event_id: Optional[int] = None) -> Subscriber:
+        """
+        Register a new subscriber for `user_id`'s events, optionally only the
+        given event types. If `last_event_id` is given, matching events after
+        it that are still in the replay buffer (or the history source) are
+        set aside for take_replay(), ahead of anything live.
+        """
+        user_id = str(user_id)
+        types = frozenset(types) if types else None
+        subscriber = Subscriber(user_id, types, self.buffer_size, self.slow_consumer_policy)
+        with self.lock:
+            if last_event_id is not None and not self.history:
+                subscriber.replay = [
+                    hub_event for hub_event in self._replay_after(last_event_id)
+                    if hub_event.user_id == user_id and subscriber.wants(hub_event)
+                ]
+            self.subscribers.setdefault(user_id, set()).add(subscriber)
+            self.subscriber_count += 1
+        if last_event_id is not None and self.history:
+            # Registered first, so nothing published while the history is read is missed
+            try:
+                events, upto = self.history(last_event_id, self.replay_size, user_id, types)
+            except Exception:
+                self.unsubscribe(subscriber)
+                raise
+            subscriber.set_replay([self._hub_event(event_id, event) for event_id, event in events], upto)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self.lock:
+            user_subscribers = self.subscribers.get(subscriber.user_id)
+            if user_subscribers is None or subscriber not in user_subscribers:
+                return
+            user_subscribers.discard(subscriber)
+            if not user_subscribers:
+                del self.subscribers[subscriber.user_id]
+            self.subscriber_count -= 1
+            self.dropped += subscriber.dropped
+            if subscriber.closed:
+                self.disconnected += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'subscribers': self.subscriber_count,
+                'users': len(self.subscribers),
+                'last_event_id': self.next_id - 1,
+                'published': self.published,
+                'replay_buffered': len(self.recent),
+                'dropped': self.dropped + sum(
+                    s.dropped for user_subscribers in self.subscribers.values() for s in user_subscribers
+                ),
+                'slow_consumers_disconnected': self.disconnected,
+                'slow_consumer_policy': self.slow_consumer_policy,
+            }
+
+    def _replay_after(self, last_event_id: int) -> List[HubEvent]:
+        # An id from the future means ids restarted (gateway restart): the
+        # client has seen none of the current events.
+        if last_event_id >= self.next_id:
+            return list(self.recent)
+        return [hub_event for hub_event in self.recent if hub_event.id > last_event_id]
+
+    def _hub_event(self, event_id: int, event: dict) -> HubEvent:
+        return HubEvent(event_id, event.get('type'), event_user_id(event), self._frame(event_id, event))
+
+    @staticmethod
+    def _frame(event_id: int, event: dict) -> str:
+        return f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+
+
+def event_user_id(event: dict) -> Optional[str]:
+    """
+    Find the owning user of an event. Services nest their payload (the bus
+    wraps the received event again), so look a few `data` levels down.
+    """
+    current = event
+    for _ in range(3):
+        if not isinstance(current, dict):
+            return None
+        if current.get('user_id') is not None:
+            return str(current['user_id'])
+        current = current.get('data')
+    return None
+
+
+# Global instance
+event_hub = EventHub(
+    buffer_size=Config.SSE_SUBSCRIBER_BUFFER,
+    replay_size=Config.SSE_REPLAY_BUFFER,
+    slow_consumer_policy=Config.SSE_SLOW_CONSUMER_POLICY,
+)
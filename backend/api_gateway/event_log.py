@@ -0,0 +1,402 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from typing import Callable, List, Optional, Tuple
+from config import Config
+
+# Record header: offset, payload length, crc32 of the payload
+HEADER = struct.Struct('>QII')
+# One sparse index entry (offset -> file position) every this many records
+INDEX_EVERY = 64
+
+
+class _Segment:
+    """One log file holding the records from `base` up to `next - 1`."""
+
+    def __init__(self, directory: str, base: int):
+        self.base = base
+        self.next = base
+        self.size = 0
+        self.path = os.path.join(directory, f"{base:020d}.log")
+        self.index_offsets: List[int] = []
+        self.index_positions: List[int] = []
+        self.last_append = time.time()
+
+    def add(self, offset: int, position: int, length: int):
+        if (offset - self.base) % INDEX_EVERY == 0:
+            self.index_offsets.append(offset)
+            self.index_positions.append(position)
+        self.size = position + HEADER.size + length
+        self.next = offset + 1
+
+    def position_of(self, offset: int) -> int:
+        """File position of the closest indexed record at or before `offset`."""
+        i = bisect_right(self.index_offsets, offset) - 1
+        return self.index_positions[i] if i >= 0 else 0
+
+    def recover(self):
+        """Rebuild the index from disk and cut off a torn or corrupt tail."""
+        self.last_append = os.path.getmtime(self.path)
+        with open(self.path, 'rb') as f:
+            position = 0
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                offset, length, crc = HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc or offset != self.next:
+                    break
+                self.add(offset, position, length)
+                position = self.size
+        if os.path.getsize(self.path) != self.size:
+            print(f"⚠️  Event log: truncating {self.path} at byte {self.size}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(self.size)
+
+
+class EventLog:
+    """
+    Append-only event log for the gateway, split into segment files.
+
+    - append() writes the record and flushes it to the OS before returning
+      its offset, so an acknowledged event survives a gateway crash. fsync
+      is batched: a background thread syncs every fsync_interval seconds
+      (with sync_ack=True append() also waits for that sync).
+    - Records are length-prefixed and checksummed; on start the last segment
+      is scanned and a torn tail is cut off.
+    - Old segments are deleted once the log exceeds retention_bytes or they
+      are older than retention_sec. The active segment is never deleted.
+    - read() returns records from any offset still retained; follow()
+      registers an internal consumer that is called for every record in
+      offset order, optionally remembering its position under a name.
+
+    Usage:
+        from event_log import event_log
+
+        event_log.start()
+        offset = event_log.append({'type': 'task_created', 'data': {...}})
+        for offset, event in event_log.read(from_offset=offset, limit=100): ...
+        event_log.follow(callback, name='audit')   # callback(offset, event)
+    """
+
+    def __init__(self, directory: str = 'event_log', segment_bytes: int = 16 * 1024 * 1024,
+                 fsync_interval: float = 0.05, sync_ack: bool = False,
+                 retention_bytes: int = 256 * 1024 * 1024, retention_sec: float = 7 * 24 * 3600):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.sync_ack = sync_ack
+        self.retention_bytes = retention_bytes
+        self.retention_sec = retention_sec
+        self.segments: List[_Segment] = []
+        self.file = None
+        self.unsynced_files = []
+        self.next_offset = 1
+        self.durable_offset = 0
+        self.appends = 0
+        self.fsyncs = 0
+        self.deleted_segments = 0
+        self.flush_errors = 0
+        self.consumers: List['LogConsumer'] = []
+        self.running = False
+        self.flusher = None
+        self.lock = threading.Lock()
+        # Consumers wait on `appended`, sync_ack writers on `synced`
+        self.appended = threading.Condition(self.lock)
+        self.synced = threading.Condition()
+
+    @property
+    def last_offset(self) -> int:
+        return self.next_offset - 1
+
+    @property
+    def first_offset(self) -> int:
+        with self.lock:
+            return self.segments[0].base if self.segments else self.next_offset
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        bases = sorted(int(name[:-len('.log')]) for name in os.listdir(self.directory)
+                       if name.endswith('.log') and name[:-len('.log')].isdigit())
+        for base in bases:
+            segment = _Segment(self.directory, base)
+            segment.recover()
+            self.segments.append(segment)
+        if self.segments:
+            self.next_offset = self.segments[-1].next
+        else:
+            self.segments.append(_Segment(self.directory, self.next_offset))
+        self.durable_offset = self.last_offset
+        self.file = open(self.segments[-1].path, 'ab')
+        self.running = True
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True, name='event-log-flusher')
+        self.flusher.start()
+        for consumer in self.consumers:
+            consumer.start()
+        print(f"✅ Event log opened at {self.directory} (offsets {self.first_offset}-{self.last_offset})")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        for consumer in self.consumers:
+            consumer.stop()
+        self.flusher.join(timeout=5)
+        with self.lock:
+            self.unsynced_files.append(self.file)
+            self.file = None
+        self._sync()
+        print("❌ Event log closed")
+
+    def append(self, event: dict) -> int:
+        """Write `event` to the log and return its offset."""
+        return self.append_many([event])[0]
+
+    def append_many(self, events: List[dict]) -> List[int]:
+        """Write `events` as consecutive records (one flush) and return their offsets."""
+        payloads = [json.dumps(event, separators=(',', ':')).encode('utf-8') for event in events]
+        offsets = []
+        with self.lock:
+            if self.file is None:
+                raise RuntimeError('event log is not open')
+            for payload in payloads:
+                offset = self.next_offset
+                segment = self.segments[-1]
+                if segment.size and segment.size + HEADER.size + len(payload) > self.segment_bytes:
+                    self.file.flush()
+                    segment = self._roll(offset)
+                self.file.write(HEADER.pack(offset, len(payload), zlib.crc32(payload)) + payload)
+                segment.add(offset, segment.size, len(payload))
+                self.next_offset = offset + 1
+                offsets.append(offset)
+            self.file.flush()
+            self.segments[-1].last_append = time.time()
+            self.appends += len(offsets)
+            self.appended.notify_all()
+        if self.sync_ack and offsets:
+            last = offsets[-1]
+            with self.synced:
+                self.synced.wait_for(lambda: self.durable_offset >= last or not self.running,
+                                     timeout=max(self.fsync_interval * 10, 1))
+        return offsets
+
+    def read(self, from_offset: int, limit: int = 500,
+             to_offset: Optional[int] = None) -> List[Tuple[int, dict]]:
+        """Return up to `limit` (offset, event) pairs starting at `from_offset`."""
+        with self.lock:
+            last = self.last_offset if to_offset is None else min(to_offset, self.last_offset)
+            # Snapshot what to read; the files themselves are read without the lock
+            plan = [(s.path, s.position_of(from_offset) if s.base <= from_offset else 0, s.size)
+                    for s in self.segments if s.next > from_offset and s.base <= last]
+        records = []
+        for path, position, end in plan:
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(position)
+                    while position < end and len(records) < limit:
+                        offset, length, _ = HEADER.unpack(f.read(HEADER.size))
+                        payload = f.read(length)
+                        position += HEADER.size + length
+                        if offset > last:
+                            return records
+                        if offset >= from_offset:
+                            records.append((offset, json.loads(payload)))
+            except FileNotFoundError:
+                # Deleted by retention in the meantime: continue with the next segment
+                continue
+            if len(records) >= limit:
+                break
+        return records
+
+    def wait_for(self, offset: int, timeout: float) -> bool:
+        """Block until a record with `offset` exists (or timeout)."""
+        with self.appended:
+            return self.appended.wait_for(lambda: self.next_offset > offset or not self.running, timeout)
+
+    def follow(self, callback: Callable[[int, dict], None], name: Optional[str] = None,
+               from_offset: Optional[int] = None) -> 'LogConsumer':
+        """
+        Register a consumer thread that calls `callback(offset, event)` for
+        every record in order. A named consumer resumes from its last
+        committed offset; otherwise it starts at `from_offset`, or at the
+        end of the log.
+        """
+        consumer = LogConsumer(self, callback, name, from_offset)
+        self.consumers.append(consumer)
+        if self.running:
+            consumer.start()
+        return consumer
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'running': self.running,
+                'first_offset': self.segments[0].base if self.segments else self.next_offset,
+                'last_offset': self.last_offset,
+                'durable_offset': self.durable_offset,
+                'segments': len(self.segments),
+                'bytes': sum(s.size for s in self.segments),
+                'appends': self.appends,
+                'fsyncs': self.fsyncs,
+                'deleted_segments': self.deleted_segments,
+                'flush_errors': self.flush_errors,
+                'consumers': {c.label: {'offset': c.offset,
+                                        'lag': self.next_offset - c.offset if c.offset else None,
+                                        'errors': c.errors}
+                              for c in self.consumers},
+            }
+
+    def _roll(self, base: int) -> _Segment:
+        # Caller holds self.lock. The old file is synced and closed by the flusher.
+        self.unsynced_files.append(self.file)
+        segment = _Segment(self.directory, base)
+        self.segments.append(segment)
+        self.file = open(segment.path, 'ab')
+        return segment
+
+    def _flush_loop(self):
+        last_retention = 0.0
+        while self.running:
+            time.sleep(self.fsync_interval)
+            # One failed fsync or delete must not stop syncing for good
+            try:
+                self._sync()
+                if time.monotonic() - last_retention >= 1:
+                    last_retention = time.monotonic()
+                    self._apply_retention()
+            except Exception as e:
+                self.flush_errors += 1
+                print(f"❌ Event log flusher error: {e}")
+
+    def _sync(self):
+        with self.lock:
+            if self.durable_offset >= self.last_offset and not self.unsynced_files:
+                return
+            target = self.last_offset
+            files = self.unsynced_files + ([self.file] if self.file else [])
+            retired = self.unsynced_files
+            self.unsynced_files = []
+        # fsync outside the lock so appends keep going meanwhile
+        try:
+            for f in files:
+                os.fsync(f.fileno())
+        except Exception:
+            # Keep the rolled-over files for the next attempt
+            with self.lock:
+                self.unsynced_files = retired + self.unsynced_files
+            raise
+        for f in retired:
+            f.close()
+        with self.synced:
+            self.durable_offset = target
+            self.fsyncs += 1
+            self.synced.notify_all()
+
+    def _apply_retention(self):
+        with self.lock:
+            total = sum(s.size for s in self.segments)
+            now = time.time()
+            while len(self.segments) > 1:
+                oldest = self.segments[0]
+                if total <= self.retention_bytes and now - oldest.last_append <= self.retention_sec:
+                    break
+                total -= oldest.size
+                self.segments.pop(0)
+                self.deleted_segments += 1
+                try:
+                    os.remove(oldest.path)
+                except FileNotFoundError:
+                    pass
+
+
+class LogConsumer:
+    """Reads the log in offset order on its own thread and hands records to a callback."""
+
+    def __init__(self, log: EventLog, callback: Callable[[int, dict], None],
+                 name: Optional[str] = None, from_offset: Optional[int] = None):
+        self.log = log
+        self.callback = callback
+        self.name = name
+        self.label = name or getattr(callback, '__name__', 'consumer')
+        self.from_offset = from_offset
+        self.offset = None
+        self.errors = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        committed = self._load_committed()
+        if committed is not None:
+            self.offset = committed
+        elif self.from_offset is not None:
+            self.offset = self.from_offset
+        else:
+            self.offset = self.log.next_offset
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"event-log-{self.label}")
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        self._commit()
+
+    def _run(self):
+        last_commit = time.monotonic()
+        while self.running:
+            records = self.log.read(self.offset, limit=500)
+            if not records:
+                # Skip past offsets removed by retention
+                self.offset = max(self.offset, self.log.first_offset)
+                self.log.wait_for(self.offset, timeout=0.5)
+                continue
+            for offset, event in records:
+                try:
+                    self.callback(offset, event)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Event log consumer {self.label} failed at offset {offset}: {e}")
+                self.offset = offset + 1
+            if self.name and time.monotonic() - last_commit >= 1:
+                self._commit()
+                last_commit = time.monotonic()
+
+    def _offset_path(self) -> str:
+        return os.path.join(self.log.directory, 'consumers', f"{self.name}.offset")
+
+    def _load_committed(self) -> Optional[int]:
+        if not self.name:
+            return None
+        try:
+            with open(self._offset_path(), 'r') as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _commit(self):
+        if not self.name or self.offset is None:
+            return
+        path = self._offset_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            f.write(str(self.offset))
+        os.replace(path + '.tmp', path)
+
+
+# Global instance
+event_log = EventLog(
+    directory=Config.EVENT_LOG_DIR,
+    segment_bytes=Config.EVENT_LOG_SEGMENT_BYTES,
+    fsync_interval=Config.EVENT_LOG_FSYNC_INTERVAL_MS / 1000,
+    sync_ack=Config.EVENT_LOG_SYNC_ACK,
+    retention_bytes=Config.EVENT_LOG_RETENTION_BYTES,
+    retention_sec=Config.EVENT_LOG_RETENTION_HOURS * 3600,
+)
@@ -1,479 +1,750 @@
-import os
-from flask import Blueprint, request, jsonify, Response
-import requests
-from config import Config
-from event_bus import event_bus
-from shared.event_client import Events
-import json
-from datetime import datetime
-from queue import Queue
-
-
-api_gateway = Blueprint('api_gateway', __name__, url_prefix='/v1')
-
-# ============ GLOBAL EVENT BROADCAST ============
-# Single shared queue for all SSE clients
-_event_broadcast_queue = Queue()
-
-def _setup_broadcast_subscription():
-    """Set up the event bus subscription once at startup"""
-    def broadcast_callback(event):
-        # Put event in shared queue for all clients
-        _event_broadcast_queue.put(event)
-    
-    # Subscribe to all event types with single callback
-    for event_type in [Events.USER_CREATED, Events.USER_UPDATED,
-                      Events.TASK_CREATED, Events.TASK_PENDING,
-                      Events.TASK_COMPLETED, Events.PET_CREATED,
-                      Events.PET_UPDATED, Events.TASK_UPDATED, 
-                      Events.TASK_DELETED, Events.TASK_RESTORED]:
-        event_bus.subscribe(event_type, broadcast_callback)
-    
-    print("✅ Broadcast subscription set up.")
-
-# Set up broadcast subscription immediately on app creation
-_setup_broadcast_subscription()
-
-def generate_service_cards(services_status):
-    cards = ""
-    for service_name, status_info in services_status.items():
-        status = status_info['status']
-        url = status_info['url']
-        details = status_info.get('details', {})
-        
-        display_name = service_name.replace('_', ' ').title()
-        
-        if status == 'healthy':
-            status_text = '✅ Healthy'
-            icon = '🟢'
-        elif status == 'unhealthy':
-            status_text = '⚠️ Unhealthy'
-            icon = '🟡'
-        else:
-            status_text = '❌ Down'
-            icon = '🔴'
-        
-        if isinstance(details, dict):
-            details_text = details.get('status', details.get('message', 'No details'))
-        else:
-            details_text = str(details)
-        
-        cards += f"""
-        <div class="service-card {status}">
-            <div class="service-name">
-                <span class="status-badge {status}"></span>
-                {icon} {display_name}
-            </div>
-            <div class="service-url">🔗 {url}</div>
-            <div class="status-text {status}">{status_text}</div>
-            <div class="status-details">{details_text}</div>
-        </div>
-        """
-    
-    return cards
-
-@api_gateway.route('/api_health', methods=['GET'])
-def health():
-    return jsonify({'status': 'API Gateway is running', 'service': 'api_gateway'}), 200
-
-@api_gateway.route('/', methods=['GET'])
-def index():
-    return jsonify({'Note': 'specify endpoints'}), 200
-
-
-@api_gateway.route('/events', methods=['POST'])
-def receive_event():
-    """
-    Receive events from microservices and publish to event bus.
-    
-    Services POST here to emit events:
-        POST /events
-        {
-            "type": "task_created",
-            "data": {"task_id": ---, "title": "---"},
-            "timestamp": "2025-01-15T10:30:00"
-        }
-    """
-    try:
-        data = request.json
-        event_type = data.get('type')
-        event_data = data.get('data')
-        timestamp = data.get('timestamp', datetime.now().isoformat())
-        
-        if not event_type or event_data is None:
-            return {'error': 'Missing type or data'}, 400
-        
-        print(f"✅ Event received: {event_type}")
-        
-        # Create full event object
-        event = {
-            'type': event_type,
-            'data': event_data,
-            'timestamp': timestamp
-        }
-        
-        # Publish to internal event bus (triggers broadcast_callback)
-        event_bus.publish(event_type, event)
-        
-        return {'status': 'received', 'type': event_type}, 202
-    
-    except Exception as e:
-        print(f"❌ Error receiving event: {e}")
-        return {'error': str(e)}, 500
-
-
-@api_gateway.route('/events', methods=['GET'])
-def events_stream():
-    """
-    SSE endpoint for frontend to receive real-time events.
-    All clients share the same broadcast queue.
-    
-    Frontend usage:
-        const eventSource = new EventSource('/events');
-        eventSource.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            console.log('Received:', data);
-        };
-    """
-    def generate():
-        print("🔌 New SSE client connected")
-        
-        while True:
-            try:
-                # Get events from shared broadcast queue (all clients share this)
-                # Use a short timeout for frequent heartbeats
-                event = _event_broadcast_queue.get(timeout=5)
-                print(f"Broadcasting event to all clients: {event.get('type')}")
-                yield f"data: {json.dumps(event)}\n\n"
-            except:
-                # Send heartbeat every 5 seconds to keep connection alive
-                try:
-                    yield f": heartbeat\n\n"
-                except GeneratorExit:
-                    print("🔌 SSE client disconnected")
-                    break
-    
-    return Response(
-        generate(),
-        mimetype='text/event-stream',
-        headers={
-            'Cache-Control': 'no-cache',
-            'X-Accel-Buffering': 'no',
-            'Connection': 'keep-alive',
-            'Transfer-Encoding': 'chunked'
-        }
-    )
-
-@api_gateway.route('/health', methods=['GET'])
-def dashboard():
-    services_status = {
-        'user_service': check_service_health(Config.USER_SERVICE_URL),
-        'pet_service': check_service_health(Config.PET_SERVICE_URL),
-        'task_service': check_service_health(Config.TASK_SERVICE_URL),
-        'data_tracking_service': check_service_health(Config.DATA_TRACKING_SERVICE_URL)
-    }
-    
-    return render_dashboard(services_status), 200
-
-def check_service_health(service_url):
-    try:
-        response = requests.get(f'{service_url}/api/v1/health', timeout=3)
-        if response.status_code == 200:
-            return {'status': 'healthy', 'url': service_url, 'details': response.json()}
-        else:
-            return {'status': 'unhealthy', 'url': service_url, 'details': 'Bad status code'}
-    except Exception as e:
-        return {'status': 'down', 'url': service_url, 'details': str(e)}
-
-
-@api_gateway.route('/user-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
-def proxy_users(endpoint):
-    """Forward user service requests"""
-    return proxy_request(Config.USER_SERVICE_URL, endpoint, service_type='user')
-
-@api_gateway.route('/pet-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
-def proxy_pets(endpoint):
-    """Forward pet service requests"""
-    return proxy_request(Config.PET_SERVICE_URL, endpoint, service_type='pet')
-
-@api_gateway.route('/task-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
-def proxy_tasks(endpoint):
-    """Forward task service requests"""
-    return proxy_request(Config.TASK_SERVICE_URL, endpoint, service_type='task')
-
-@api_gateway.route('/data-tracking-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
-def proxy_data_tracking(endpoint):
-    """Forward data-tracking service requests"""
-    return proxy_request(Config.DATA_TRACKING_SERVICE_URL, endpoint, service_type='data-tracking')
-
-def proxy_request(service_url, endpoint, service_type='default'):
-    """
-    Generic proxy function to forward requests to microservices
-    
-    Args:
-        service_url: Base URL of the target microservice
-        endpoint: The endpoint path from the gateway route
-        service_type: Type of service ('user', 'pet', 'task', etc.)
-    """
-    try:
-
-        target_url = f'{service_url}/api/v1/{endpoint}'
-        
-        # Prepare request parameters
-        headers = dict(request.headers)
-        headers.pop('Host', None)
-
-        # Get request body if it exists
-        body = request.get_data() if request.method in ['POST', 'PUT', 'PATCH'] else None
-        
-        # Forward the request to the microservice
-        if request.method == 'GET':
-            response = requests.get(target_url, headers=headers, params=request.args, timeout=10)
-        elif request.method == 'POST':
-            response = requests.post(target_url, headers=headers, data=body, timeout=10)
-        elif request.method == 'PUT':
-            response = requests.put(target_url, headers=headers, data=body, timeout=10)
-        elif request.method == 'DELETE':
-            response = requests.delete(target_url, headers=headers, timeout=10)
-        elif request.method == 'PATCH':
-            response = requests.patch(target_url, headers=headers, data=body, timeout=10)
-        
-        print(f"✅  Proxied {request.method} {target_url} -> {response.status_code}")
-        
-        # Return the service response to the frontend
-        return Response(
-            response.content,
-            status=response.status_code,
-            headers=dict(response.headers)
-        )
-    
-    except requests.exceptions.Timeout:
-        print(f"Error = Service timeout: {service_url}")
-        return jsonify({'error': 'Service timeout'}), 504
-    except requests.exceptions.ConnectionError:
-        print(f"Error = Cannot connect to service: {service_url}")
-        return jsonify({'error': 'Service unavailable'}), 503
-    except Exception as e:
-        print(f"Error = Proxy error: {e}")
-        return jsonify({'error': str(e)}), 500
-    
-
-
-def render_dashboard(services_status):
-    api_url = os.getenv('FRONTEND_URL')
-
-    cards_html = generate_service_cards(services_status)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>API Gateway - Health Dashboard</title>
-        <style>
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                padding: 20px;
-            }}
-            
-            .container {{
-                background: white;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-                padding: 40px;
-                max-width: 800px;
-                width: 100%;
-            }}
-            
-            h1 {{
-                color: #333;
-                margin-bottom: 10px;
-                font-size: 2.5em;
-                text-align: center;
-            }}
-            
-            .subtitle {{
-                text-align: center;
-                color: #666;
-                margin-bottom: 40px;
-                font-size: 1.1em;
-            }}
-            
-            .services-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                gap: 20px;
-            }}
-            
-            .service-card {{
-                border-radius: 15px;
-                padding: 25px;
-                border-left: 5px solid;
-                transition: transform 0.3s ease, box-shadow 0.3s ease;
-                box-shadow: 0 5px 15px rgba(0, 0, 0, 0.1);
-            }}
-            
-            .service-card:hover {{
-                transform: translateY(-5px);
-                box-shadow: 0 10px 25px rgba(0, 0, 0, 0.15);
-            }}
-            
-            .service-card.healthy {{
-                border-left-color: #10b981;
-                background: linear-gradient(135deg, #f0fdf4 0%, #f0fdf4 100%);
-            }}
-            
-            .service-card.unhealthy {{
-                border-left-color: #f59e0b;
-                background: linear-gradient(135deg, #fffbf0 0%, #fffbf0 100%);
-            }}
-            
-            .service-card.down {{
-                border-left-color: #ef4444;
-                background: linear-gradient(135deg, #fef2f2 0%, #fef2f2 100%);
-            }}
-            
-            .service-name {{
-                font-size: 1.3em;
-                font-weight: 600;
-                margin-bottom: 10px;
-                color: #333;
-                display: flex;
-                align-items: center;
-                gap: 10px;
-            }}
-            
-            .status-badge {{
-                display: inline-block;
-                width: 12px;
-                height: 12px;
-                border-radius: 50%;
-                animation: pulse 2s infinite;
-            }}
-            
-            .status-badge.healthy {{
-                background-color: #10b981;
-            }}
-            
-            .status-badge.unhealthy {{
-                background-color: #f59e0b;
-            }}
-            
-            .status-badge.down {{
-                background-color: #ef4444;
-            }}
-            
-            @keyframes pulse {{
-                0%, 100% {{
-                    opacity: 1;
-                }}
-                50% {{
-                    opacity: 0.5;
-                }}
-            }}
-            
-            .service-url {{
-                font-size: 0.9em;
-                color: #666;
-                margin-bottom: 10px;
-                word-break: break-all;
-            }}
-            
-            .status-text {{
-                font-weight: 600;
-                font-size: 1.1em;
-                margin-bottom: 8px;
-            }}
-            
-            .status-text.healthy {{
-                color: #10b981;
-            }}
-            
-            .status-text.unhealthy {{
-                color: #f59e0b;
-            }}
-            
-            .status-text.down {{
-                color: #ef4444;
-            }}
-            
-            .status-details {{
-                font-size: 0.85em;
-                color: #999;
-                margin-top: 10px;
-                padding-top: 10px;
-                border-top: 1px solid rgba(0, 0, 0, 0.1);
-            }}
-            
-            .footer {{
-                margin-top: 40px;
-                padding-top: 20px;
-                border-top: 1px solid #e5e7eb;
-                text-align: center;
-                color: #999;
-                font-size: 0.9em;
-            }}
-            
-            .api-info {{
-                background: #f3f4f6;
-                border-radius: 10px;
-                padding: 20px;
-                margin-top: 30px;
-            }}
-            
-            .api-info h2 {{
-                color: #333;
-                margin-bottom: 15px;
-                font-size: 1.3em;
-            }}
-            
-            .api-link {{
-                display: inline-block;
-                background: #667eea;
-                color: white;
-                padding: 10px 20px;
-                border-radius: 8px;
-                text-decoration: none;
-                margin-right: 10px;
-                margin-bottom: 10px;
-                transition: background 0.3s ease;
-            }}
-            
-            .api-link:hover {{
-                background: #764ba2;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🚀 API Gateway</h1>
-            <p class="subtitle">Health Dashboard</p>
-            
-            <div class="services-grid">
-                {cards_html}
-            </div>
-            
-            <div class="api-info">
-                <h2>📚 API Documentation</h2>
-                <a class="api-link" href="{api_url}" target="_blank">Frontend</a>
-            </div>
-            
-            <div class="footer">
-                <p>Last updated: {timestamp}</p>
-                <p>All services running on Docker microservices architecture</p>
-            </div>
-        </div>
-    </body>
-    </html>
+import os
+from flask import Blueprint, request, jsonify, Response
+import requests
+from config import Config
+from event_bus import event_bus
+from event_hub import event_hub, event_user_id
+from event_log import event_log
+from upstream import upstreams
+from auth import get_user_id_from_request, make_stream_ticket
+from shared.event_client import Events
+import json
+from datetime import datetime
+
+
+api_gateway = Blueprint('api_gateway', __name__, url_prefix='/v1')
+
+# ============ GLOBAL EVENT BROADCAST ============
+# Every SSE client subscribes to the hub and gets its own copy of each event.
+# The hub is fed from the event log in offset order.
+
+# Event types forwarded to SSE clients
+SSE_EVENT_TYPES = (Events.USER_CREATED, Events.USER_UPDATED,
+                   Events.TASK_CREATED, Events.TASK_PENDING,
+                   Events.TASK_COMPLETED, Events.PET_CREATED,
+                   Events.PET_UPDATED, Events.TASK_UPDATED,
+                   Events.TASK_DELETED, Events.TASK_RESTORED,
+                   Events.TASKS_BULK_UPDATED,
+                   Events.ROADMAP_CREATED, Events.ROADMAP_UPDATED,
+                   Events.ROADMAP_DELETED)
+
+# Event types POST /events accepts. The bus creates a queue, stats and (when
+# spilling) a file per type, so types outside Events are rejected.
+KNOWN_EVENT_TYPES = frozenset(value for name, value in vars(Events).items() if name.isupper())
+
+def _sse_event(offset, event):
+    """A logged event in the shape SSE clients receive; its log offset is the SSE id."""
+    return {'type': event['type'], 'data': dict(event, offset=offset), 'timestamp': event['timestamp']}
+
+def _sse_history(after_id, limit, user_id, types=None):
+    """
+    Replay source for reconnecting SSE clients: the last `limit` events of
+    `user_id` (of `types`, if given) after `after_id`, read from the event
+    log. The log is paged from the end so only the user's own events count
+    towards `limit`, and at most SSE_REPLAY_SCAN_MAX records are read (a
+    user with few events does not walk the whole retained log).
+    """
+    last = event_log.last_offset
+    if after_id > last:
+        # Offset from a log that no longer exists: the client has seen none of this one
+        after_id = 0
+    first = max(after_id + 1, event_log.first_offset)
+    page = max(limit, 500)
+    matches = []
+    hi = last
+    first = max(first, last - Config.SSE_REPLAY_SCAN_MAX + 1)
+    while hi >= first and len(matches) < limit:
+        lo = max(first, hi - page + 1)
+        for offset, event in reversed(event_log.read(lo, limit=page, to_offset=hi)):
+            if event['type'] not in SSE_EVENT_TYPES or (types and event['type'] not in types):
+                continue
+            sse_event = _sse_event(offset, event)
+            if event_user_id(sse_event) == user_id:
+                matches.append((offset, sse_event))
+                if len(matches) == limit:
+                    break
+        hi = lo - 1
+    matches.reverse()
+    return matches, last
+
+def _setup_broadcast_subscription():
+    """Set up the hub's feed from the event log once at startup"""
+    def broadcast(offset, event):
+        # One consumer thread reads the log in offset order, so SSE ids reach
+        # every client in increasing order (a reconnect resumes after the
+        # last id without skipping earlier ones still in flight).
+        if event['type'] in SSE_EVENT_TYPES:
+            event_hub.publish(_sse_event(offset, event), event_id=offset)
+    
+    event_log.follow(broadcast)
+    event_hub.history = _sse_history
+    
+    print("✅ Broadcast subscription set up.")
+
+# Set up broadcast subscription immediately on app creation
+_setup_broadcast_subscription()
+
+def generate_service_cards(services_status):
+    cards = ""
+    for service_name, status_info in services_status.items():
+        status = status_info['status']
+        url = status_info['url']
+        details = status_info.get('details', {})
+        
+        display_name = service_name.replace('_', ' ').title()
+        
+        if status == 'healthy':
+            status_text = '✅ Healthy'
+            icon = '🟢'
+        elif status == 'unhealthy':
+            status_text = '⚠️ Unhealthy'
+            icon = '🟡'
+        else:
+            status_text = '❌ Down'
+            icon = '🔴'
+        
+        if isinstance(details, dict):
+            details_text = details.get('status', details.get('message', 'No details'))
+        else:
+            details_text = str(details)
+        
+        cards += f"""
+        <div class="service-card {status}">
+            <div class="service-name">
+                <span class="status-badge {status}"></span>
+                {icon} {display_name}
+            </div>
+            <div class="service-url">🔗 {url}</div>
+            <div class="status-text {status}">{status_text}</div>
+            <div class="status-details">{details_text}</div>
+        </div>
+        """
+    
+    return cards
+
+@api_gateway.route('/api_health', methods=['GET'])
+def health():
+    return jsonify({'status': 'API Gateway is running', 'service': 'api_gateway'}), 200
+
+@api_gateway.route('/', methods=['GET'])
+def index():
+    return jsonify({'Note': 'specify endpoints'}), 200
+
+
+@api_gateway.route('/events', methods=['POST'])
+def receive_event():
+    """
+    Receive events from microservices, append them to the event log and
+    publish them to the event bus. Events are acknowledged once they are in
+    the log.
+    
+    Services POST here to emit events:
+        POST /events
+        {
+            "type": "task_created",
+            "data": {"task_id": ---, "title": "---"},
+            "timestamp": "2025-01-15T10:30:00"
+        }
+    
+    or several at once (up to EVENT_BATCH_MAX), each acknowledged separately:
+        POST /events
+        [{"type": "task_created", "data": {...}}, {"type": "task_deleted", "data": {...}}]
+        -> {"accepted": 1, "rejected": 1, "results": [
+               {"index": 0, "status": "accepted", "offset": 41},
+               {"index": 1, "status": "rejected", "error": "Missing type or data"}]}
+    
+    Only the types in shared.event_client.Events are accepted.
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if isinstance(data, list):
+            return _receive_batch(data)
+        
+        event, error = _build_event(data)
+        if error:
+            return {'error': error}, 400
+        
+        print(f"✅ Event received: {event['type']}")
+        offset = _ingest([event])[0]
+        
+        return {'status': 'received', 'type': event['type'], 'offset': offset}, 202
+    
+    except Exception as e:
+        print(f"❌ Error receiving event: {e}")
+        return {'error': str(e)}, 500
+
+
+def _receive_batch(items):
+    if not items:
+        return {'error': 'Empty batch'}, 400
+    if len(items) > Config.EVENT_BATCH_MAX:
+        return {'error': f'Batch too large (max {Config.EVENT_BATCH_MAX} events)'}, 413
+    
+    results = []
+    events = []
+    for index, item in enumerate(items):
+        event, error = _build_event(item)
+        if error:
+            results.append({'index': index, 'status': 'rejected', 'error': error})
+        else:
+            results.append({'index': index, 'status': 'accepted'})
+            events.append(event)
+    
+    offsets = iter(_ingest(events)) if events else iter(())
+    for result in results:
+        if result['status'] == 'accepted':
+            result['offset'] = next(offsets)
+    
+    print(f"✅ Event batch received: {len(events)}/{len(items)} accepted")
+    return {'accepted': len(events), 'rejected': len(items) - len(events), 'results': results}, 202
+
+
+def _build_event(data):
+    """Validate one posted event. Returns (event, None) or (None, error)."""
+    if not isinstance(data, dict):
+        return None, 'Event must be a JSON object'
+    event_type = data.get('type')
+    event_data = data.get('data')
+    if not event_type or event_data is None:
+        return None, 'Missing type or data'
+    if not isinstance(event_type, str) or event_type not in KNOWN_EVENT_TYPES:
+        return None, 'Unknown event type'
+    return {
+        'type': event_type,
+        'data': event_data,
+        'timestamp': data.get('timestamp', datetime.now().isoformat())
+    }, None
+
+
+def _ingest(events):
+    """Append events to the log, then publish them to the bus. Returns their offsets."""
+    # Durable first: SSE clients replay from the log after a drop or restart
+    offsets = event_log.append_many(events)
+    
+    for event, offset in zip(events, offsets):
+        event['offset'] = offset
+        # Publish to internal event bus subscribers (SSE clients are fed from the log)
+        event_bus.publish(event['type'], event)
+    
+    return offsets
+
+
+def _parse_event_id(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+@api_gateway.route('/events/ticket', methods=['POST'])
+def events_ticket():
+    """
+    Exchange an access token (Authorization header) for a stream ticket:
+    a token that only opens GET /events and lasts SSE_TICKET_TTL_SEC, so
+    the stream can reconnect after the short-lived access token expires.
+    """
+    user_id = get_user_id_from_request()
+    if not user_id:
+        return jsonify({'error': 'unauthorized'}), 401
+    return jsonify({'ticket': make_stream_ticket(user_id), 'expires_in': Config.SSE_TICKET_TTL_SEC}), 200
+
+
+@api_gateway.route('/events', methods=['GET'])
+def events_stream():
+    """
+    SSE endpoint for frontend to receive real-time events.
+    Requires a stream ticket from POST /events/ticket (or an access token);
+    EventSource cannot send headers, so it is passed as ?ticket= (or
+    ?access_token=). Each client only receives its own user's events,
+    optionally narrowed with ?types=task_deleted,pet_updated.
+    Events carry an `id:`; on reconnect the browser sends it back as
+    Last-Event-ID (or ?last_event_id=) and missed events are replayed.
+    
+    Frontend usage:
+        const { ticket } = await (await fetch('/events/ticket', {method: 'POST', headers})).json();
+        const eventSource = new EventSource(`/events?ticket=${ticket}`);
+        eventSource.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            console.log('Received:', data);
+        };
+    """
+    user_id = get_user_id_from_request(scopes=("access", "events"))
+    if not user_id:
+        return jsonify({'error': 'unauthorized'}), 401
+
+    types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    last_event_id = _parse_event_id(
+        request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    )
+    subscriber = event_hub.subscribe(user_id, types=types, last_event_id=last_event_id)
+    heartbeat = Config.SSE_HEARTBEAT_SEC
+
+    def generate():
+        print(f"🔌 New SSE client connected for user {user_id}")
+        try:
+            # Missed events go out first, straight from the replay
+            replay = subscriber.take_replay()
+            if replay:
+                yield "".join(hub_event.frame for hub_event in replay)
+            while not subscriber.closed:
+                events = subscriber.wait(timeout=heartbeat)
+                if events:
+                    yield "".join(hub_event.frame for hub_event in events)
+                else:
+                    # Send heartbeat to keep connection alive
+                    yield ": heartbeat\n\n"
+            # Slow consumer cut off: flush what is buffered, the browser
+            # reconnects and resumes from the last id it received
+            yield "".join(hub_event.frame for hub_event in subscriber.wait(timeout=0))
+        finally:
+            event_hub.unsubscribe(subscriber)
+            print("🔌 SSE client disconnected")
+    
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Connection': 'keep-alive',
+            'Transfer-Encoding': 'chunked'
+        }
+    )
+    # Also covers clients that disconnect before the stream starts
+    response.call_on_close(lambda: event_hub.unsubscribe(subscriber))
+    return response
+
+@api_gateway.route('/events/stats', methods=['GET'])
+def events_stats():
+    """Event log, bus queues and SSE fan-out state: offsets, depth, latency, drops."""
+    return jsonify({'log': event_log.stats(), 'bus': event_bus.metrics(), 'hub': event_hub.stats()}), 200
+
+@api_gateway.route('/health', methods=['GET'])
+def dashboard():
+    services_status = {
+        'user_service': check_service_health(Config.USER_SERVICE_URL, 'user'),
+        'pet_service': check_service_health(Config.PET_SERVICE_URL, 'pet'),
+        'task_service': check_service_health(Config.TASK_SERVICE_URL, 'task'),
+        'data_tracking_service': check_service_health(Config.DATA_TRACKING_SERVICE_URL, 'data-tracking')
+    }
+    
+    return render_dashboard(services_status), 200
+
+def check_service_health(service_url, service_type='default'):
+    try:
+        response = upstreams.request(service_type, 'GET', f'{service_url}/api/v1/health', timeout=3)
+        if response.status_code == 200:
+            return {'status': 'healthy', 'url': service_url, 'details': response.json()}
+        else:
+            return {'status': 'unhealthy', 'url': service_url, 'details': 'Bad status code'}
+    except Exception as e:
+        return {'status': 'down', 'url': service_url, 'details': str(e)}
+
+@api_gateway.route('/upstreams/stats', methods=['GET'])
+def upstream_stats():
+    """Connection pool usage per backend service (hits, misses, in-flight)."""
+    return jsonify(upstreams.stats()), 200
+
+
+@api_gateway.route('/user-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+def proxy_users(endpoint):
+    """Forward user service requests"""
+    return proxy_request(Config.USER_SERVICE_URL, endpoint, service_type='user')
+
+@api_gateway.route('/pet-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+def proxy_pets(endpoint):
+    """Forward pet service requests"""
+    return proxy_request(Config.PET_SERVICE_URL, endpoint, service_type='pet')
+
+@api_gateway.route('/task-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+def proxy_tasks(endpoint):
+    """Forward task service requests"""
+    return proxy_request(Config.TASK_SERVICE_URL, endpoint, service_type='task')
+
+@api_gateway.route('/data-tracking-service/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+def proxy_data_tracking(endpoint):
+    """Forward data-tracking service requests"""
+    return proxy_request(Config.DATA_TRACKING_SERVICE_URL, endpoint, service_type='data-tracking')
+
+# Hop-by-hop headers (RFC 7230 §6.1) describe a single connection and must
+# not be forwarded by a proxy in either direction.
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade',
+}
+
+def _end_to_end_headers(headers, drop=()):
+    """
+    Copy `headers` without hop-by-hop headers, headers named in `Connection`,
+    and any extra names in `drop`. Returns a list so repeated headers such as
+    Set-Cookie survive.
+    """
+    connection_tokens = {
+        token.strip().lower()
+        for token in headers.get('Connection', '').split(',')
+        if token.strip()
+    }
+    excluded = HOP_BY_HOP_HEADERS | connection_tokens | {name.lower() for name in drop}
+    return [(name, value) for name, value in headers.items() if name.lower() not in excluded]
+
+
+class _RequestBodyStream:
+    """
+    Iterable over the client request body, read `chunk_size` bytes at a time.
+
+    `len` carries the client's Content-Length so `requests` forwards it as-is;
+    when it is unknown the upstream request is sent chunked.
+    """
+
+    def __init__(self, stream, content_length, chunk_size):
+        self.stream = stream
+        self.len = content_length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def proxy_request(service_url, endpoint, service_type='default'):
+    """
+    Generic proxy function to forward requests to microservices
+    
+    Args:
+        service_url: Base URL of the target microservice
+        endpoint: The endpoint path from the gateway route
+        service_type: Type of service ('user', 'pet', 'task', etc.)
+    """
+    try:
+
+        target_url = f'{service_url}/api/v1/{endpoint}'
+        
+        # Prepare request parameters (Host and hop-by-hop headers are per-connection)
+        headers = dict(_end_to_end_headers(request.headers, drop=('Host',)))
+
+        if Config.PROXY_STREAMING:
+            return _proxy_streaming(service_type, target_url, headers)
+
+        # Get request body if it exists
+        body = request.get_data() if request.method in ['POST', 'PUT', 'PATCH'] else None
+        
+        # Forward the request to the microservice over its pooled connection
+        response = upstreams.request(
+            service_type,
+            request.method,
+            target_url,
+            headers=headers,
+            params=request.args,
+            data=body,
+        )
+        
+        print(f"✅  Proxied {request.method} {target_url} -> {response.status_code}")
+        
+        # Return the service response to the frontend. `response.content` is
+        # already decoded, so the upstream encoding and length no longer apply.
+        return Response(
+            response.content,
+            status=response.status_code,
+            headers=_end_to_end_headers(
+                response.raw.headers,
+                drop=('Content-Encoding', 'Content-Length'),
+            )
+        )
+    
+    except requests.exceptions.Timeout:
+        print(f"Error = Service timeout: {service_url}")
+        return jsonify({'error': 'Service timeout'}), 504
+    except requests.exceptions.ConnectionError:
+        print(f"Error = Cannot connect to service: {service_url}")
+        return jsonify({'error': 'Service unavailable'}), 503
+    except Exception as e:
+        print(f"Error = Proxy error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def _proxy_streaming(service_type, target_url, headers):
+    """
+    Pass-through variant of proxy_request (PROXY_STREAMING=True).
+
+    The request body is forwarded to the service as it is read from the client
+    and the response body is relayed to the client as it arrives, so at most
+    PROXY_MAX_BUFFER_BYTES of either body is held by the gateway at a time.
+    The upstream body is relayed undecoded, so Content-Encoding and
+    Content-Length stay valid.
+    """
+    chunk_size = Config.PROXY_MAX_BUFFER_BYTES
+
+    body = None
+    if request.method in ['POST', 'PUT', 'PATCH']:
+        body = _RequestBodyStream(request.stream, request.content_length, chunk_size)
+
+    response = upstreams.request(
+        service_type,
+        request.method,
+        target_url,
+        headers=headers,
+        params=request.args,
+        data=body,
+        stream=True,
+    )
+
+    print(f"✅  Streaming {request.method} {target_url} -> {response.status_code}")
+
+    finished = False
+    released = False
+
+    def release():
+        # Runs from the generator and from call_on_close; only the first call counts.
+        nonlocal released
+        if not released:
+            released = True
+            # A fully read body leaves the socket reusable; an aborted one does not.
+            upstreams.release(service_type, response, reuse=finished)
+
+    def generate():
+        nonlocal finished
+        try:
+            for chunk in response.raw.stream(chunk_size, decode_content=False):
+                yield chunk
+            finished = True
+        finally:
+            release()
+
+    try:
+        proxied = Response(
+            generate(),
+            status=response.status_code,
+            headers=_end_to_end_headers(response.raw.headers),
+            direct_passthrough=True,
+        )
+        # A generator that never started (client gone first) has no finally to run
+        proxied.call_on_close(release)
+    except Exception:
+        release()
+        raise
+    return proxied
+    
+
+
+def render_dashboard(services_status):
+    api_url = os.getenv('FRONTEND_URL')
+
+    cards_html = generate_service_cards(services_status)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>API Gateway - Health Dashboard</title>
+        <style>
+            * {{
+                margin: 0;
+                padding: 0;
+                box-sizing: border-box;
+            }}
+            
+            body {{
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                min-height: 100vh;
+                display: flex;
+                justify-content: center;
+                align-items: center;
+                padding: 20px;
+            }}
+            
+            .container {{
+                background: white;
+                border-radius: 20px;
+                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
+                padding: 40px;
+                max-width: 800px;
+                width: 100%;
+            }}
+            
+            h1 {{
+                color: #333;
+                margin-bottom: 10px;
+                font-size: 2.5em;
+                text-align: center;
+            }}
+            
+            .subtitle {{
+                text-align: center;
+                color: #666;
+                margin-bottom: 40px;
+                font-size: 1.1em;
+            }}
+            
+            .services-grid {{
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+                gap: 20px;
+            }}
+            
+            .service-card {{
+                border-radius: 15px;
+                padding: 25px;
+                border-left: 5px solid;
+                transition: transform 0.3s ease, box-shadow 0.3s ease;
+                box-shadow: 0 5px 15px rgba(0, 0, 0, 0.1);
+            }}
+            
+            .service-card:hover {{
+                transform: translateY(-5px);
+                box-shadow: 0 10px 25px rgba(0, 0, 0, 0.15);
+            }}
+            
+            .service-card.healthy {{
+                border-left-color: #10b981;
+                background: linear-gradient(135deg, #f0fdf4 0%, #f0fdf4 100%);
+            }}
+            
+            .service-card.unhealthy {{
+                border-left-color: #f59e0b;
+                background: linear-gradient(135deg, #fffbf0 0%, #fffbf0 100%);
+            }}
+            
+            .service-card.down {{
+                border-left-color: #ef4444;
+                background: linear-gradient(135deg, #fef2f2 0%, #fef2f2 100%);
+            }}
+            
+            .service-name {{
+                font-size: 1.3em;
+                font-weight: 600;
+                margin-bottom: 10px;
+                color: #333;
+                display: flex;
+                align-items: center;
+                gap: 10px;
+            }}
+            
+            .status-badge {{
+                display: inline-block;
+                width: 12px;
+                height: 12px;
+                border-radius: 50%;
+                animation: pulse 2s infinite;
+            }}
+            
+            .status-badge.healthy {{
+                background-color: #10b981;
+            }}
+            
+            .status-badge.unhealthy {{
+                background-color: #f59e0b;
+            }}
+            
+            .status-badge.down {{
+                background-color: #ef4444;
+            }}
+            
+            @keyframes pulse {{
+                0%, 100% {{
+                    opacity: 1;
+                }}
+                50% {{
+                    opacity: 0.5;
+                }}
+            }}
+            
+            .service-url {{
+                font-size: 0.9em;
+                color: #666;
+                margin-bottom: 10px;
+                word-break: break-all;
+            }}
+            
+            .status-text {{
+                font-weight: 600;
+                font-size: 1.1em;
+                margin-bottom: 8px;
+            }}
+            
+            .status-text.healthy {{
+                color: #10b981;
+            }}
+            
+            .status-text.unhealthy {{
+                color: #f59e0b;
+            }}
+            
+            .status-text.down {{
+                color: #ef4444;
+            }}
+            
+            .status-details {{
+                font-size: 0.85em;
+                color: #999;
+                margin-top: 10px;
+                padding-top: 10px;
+                border-top: 1px solid rgba(0, 0, 0, 0.1);
+            }}
+            
+            .footer {{
+                margin-top: 40px;
+                padding-top: 20px;
+                border-top: 1px solid #e5e7eb;
+                text-align: center;
+                color: #999;
+                font-size: 0.9em;
+            }}
+            
+            .api-info {{
+                background: #f3f4f6;
+                border-radius: 10px;
+                padding: 20px;
+                margin-top: 30px;
+            }}
+            
+            .api-info h2 {{
+                color: #333;
+                margin-bottom: 15px;
+                font-size: 1.3em;
+            }}
+            
+            .api-link {{
+                display: inline-block;
+                background: #667eea;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 8px;
+                text-decoration: none;
+                margin-right: 10px;
+                margin-bottom: 10px;
+                transition: background 0.3s ease;
+            }}
+            
+            .api-link:hover {{
+                background: #764ba2;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>🚀 API Gateway</h1>
+            <p class="subtitle">Health Dashboard</p>
+            
+            <div class="services-grid">
+                {cards_html}
+            </div>
+            
+            <div class="api-info">
+                <h2>📚 API Documentation</h2>
+                <a class="api-link" href="{api_url}" target="_blank">Frontend</a>
+            </div>
+            
+            <div class="footer">
+                <p>Last updated: {timestamp}</p>
+                <p>All services running on Docker microservices architecture</p>
+            </div>
+        </div>
+    </body>
+    </html>
     """
\ No newline at end of file
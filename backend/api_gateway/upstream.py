@@ -0,0 +1,190 @@
+import threading
+import time
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+
+class UpstreamPool:
+    """
+    Keep-alive HTTP sessions for the backend services, one pool per service.
+
+    Every proxied call goes through `request()`, so sockets to the user, pet,
+    task and data-tracking services are reused instead of being opened (and
+    left in TIME_WAIT) on every request.
+
+    Usage:
+        from upstream import upstreams
+
+        response = upstreams.request('task', 'GET', url, params=request.args)
+        upstreams.stats()   # -> per-service hits / misses / in-flight
+    """
+
+    def __init__(self, pool_size: int = 20, pool_block: bool = False,
+                 keepalive: bool = True, idle_timeout: float = 60.0,
+                 timeout: float = 10.0):
+        self.pool_size = pool_size
+        self.pool_block = pool_block
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.sessions: Dict[str, requests.Session] = {}
+        self.counters: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def request(self, service: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request to `service` on its pooled session.
+
+        With stream=True the socket stays checked out (and counted in flight)
+        until the caller hands the response back with `release()`.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        session = self._acquire(service)
+        counters = self.counters[service]
+        streaming = kwargs.get('stream', False)
+        try:
+            return session.request(method, url, **kwargs)
+        except Exception as e:
+            # No response to hand back, so nothing will call release()
+            if isinstance(e, requests.exceptions.RequestException):
+                with self.lock:
+                    counters['errors'] += 1
+            streaming = False
+            raise
+        finally:
+            if not streaming:
+                self._done(service)
+
+    def release(self, service: str, response: requests.Response, reuse: bool = True):
+        """
+        Finish a streamed response. `reuse=True` returns the socket to the pool
+        (the body must have been read to the end); otherwise it is closed.
+        """
+        try:
+            if reuse:
+                response.raw.release_conn()
+            else:
+                response.close()
+        finally:
+            self._done(service)
+
+    def stats(self) -> dict:
+        """Per-service pool usage. Misses are requests that had to open a new socket."""
+        self.evict_idle()
+        with self.lock:
+            result = {}
+            for service, counters in self.counters.items():
+                session = self.sessions.get(service)
+                opened, idle = self._socket_counts(session) if session else (0, 0)
+                misses = counters['retired_connections'] + opened
+                result[service] = {
+                    'requests': counters['requests'],
+                    'hits': max(counters['requests'] - misses, 0),
+                    'misses': misses,
+                    'in_flight': counters['in_flight'],
+                    'idle_connections': idle,
+                    'errors': counters['errors'],
+                    'evictions': counters['evictions'],
+                }
+            return {
+                'pool_size': self.pool_size,
+                'pool_block': self.pool_block,
+                'keepalive': self.keepalive,
+                'idle_timeout_sec': self.idle_timeout,
+                'services': result,
+            }
+
+    def evict_idle(self):
+        """Close the sockets of services that have been idle longer than idle_timeout."""
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        with self.lock:
+            for service, session in list(self.sessions.items()):
+                counters = self.counters[service]
+                if counters['in_flight'] or now - counters['last_used'] < self.idle_timeout:
+                    continue
+                self._retire(service, session)
+
+    def close(self):
+        """Close every pooled socket (used on shutdown)."""
+        with self.lock:
+            for service, session in list(self.sessions.items()):
+                self._retire(service, session)
+
+    def _acquire(self, service: str) -> requests.Session:
+        # Counted as in flight before the lock is released so evict_idle()
+        # never closes a session that is about to be used.
+        self.evict_idle()
+        with self.lock:
+            session = self.sessions.get(service)
+            if session is None:
+                session = self._new_session()
+                self.sessions[service] = session
+                self.counters.setdefault(service, {
+                    'requests': 0,
+                    'in_flight': 0,
+                    'errors': 0,
+                    'evictions': 0,
+                    'retired_connections': 0,
+                    'last_used': time.monotonic(),
+                })
+            counters = self.counters[service]
+            counters['requests'] += 1
+            counters['in_flight'] += 1
+            return session
+
+    def _done(self, service: str):
+        with self.lock:
+            counters = self.counters[service]
+            counters['in_flight'] -= 1
+            counters['last_used'] = time.monotonic()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_block,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keepalive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _retire(self, service: str, session: requests.Session):
+        # Caller holds self.lock. Keep the socket count so misses stay cumulative.
+        opened, _ = self._socket_counts(session)
+        counters = self.counters[service]
+        counters['retired_connections'] += opened
+        counters['evictions'] += 1
+        session.close()
+        del self.sessions[service]
+
+    @staticmethod
+    def _socket_counts(session: requests.Session):
+        """Return (sockets opened so far, sockets currently idle in the pool)."""
+        opened = idle = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                opened += pool.num_connections
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        return opened, idle
+
+
+# Global instance
+upstreams = UpstreamPool(
+    pool_size=Config.UPSTREAM_POOL_SIZE,
+    pool_block=Config.UPSTREAM_POOL_BLOCK,
+    keepalive=Config.UPSTREAM_KEEPALIVE,
+    idle_timeout=Config.UPSTREAM_IDLE_TIMEOUT_SEC,
+    timeout=Config.UPSTREAM_TIMEOUT_SEC,
+)
@@ -2,11 +2,13 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from config import Config
+from shared.json_provider import FastJSONProvider
 from models import db
 from routes import data_tracking_bp
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(Config)
     
     CORS(app)
@@ -30,7 +30,7 @@ class Roadmap(db.Model):
         return int((self.completed_tasks / self.total_tasks) * 100)
 
     def to_dict(self):
-        iso = lambda dt: dt.isoformat() if dt else None
+        # Datetimes stay datetimes: the JSON provider writes them as ISO 8601
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -40,11 +40,11 @@ class Roadmap(db.Model):
             'total_tasks': self.total_tasks,
             'completed_tasks': self.completed_tasks,
             'task_ids': self.task_ids or [],
-            'due_date': iso(self.due_date),
-            'created_at': iso(self.created_at),
-            'updated_at': iso(self.updated_at),
-            'deleted_at': iso(self.deleted_at),
-            'completed_at': iso(self.completed_at),
+            'due_date': self.due_date,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'deleted_at': self.deleted_at,
+            'completed_at': self.completed_at,
         }
 
     def __repr__(self):
@@ -66,7 +66,7 @@ class TagStatistic(db.Model):
             'tag': self.tag,
             'total_tasks': self.total_tasks,
             'completed_tasks': self.completed_tasks,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at
         }
 
     def __repr__(self):
@@ -58,6 +58,41 @@ def normalize_task_ids(task_ids):
 def handle_http_exc(e):
     return jsonify({"error": e.name, "message": e.description}), e.code
 
+def _lookup_tasks(uid, task_ids):
+    """
+    Fetch the user's live (not deleted) tasks among task_ids from the task
+    service in one request. Returns {task_id: {"id", "status", "deleted_at"}},
+    or None when the task service could not answer.
+    """
+    if not task_ids:
+        return {}
+    try:
+        # Pass X-User-Id header to ensure we only get tasks belonging to the user
+        response = requests.post(
+            f"{Config.API_GATEWAY_URL}/v1/task-service/tasks/lookup",
+            json={"ids": task_ids, "compact": True},
+            headers={"X-User-Id": uid},
+            timeout=3,
+        )
+        if response.ok:
+            return {task["id"]: task for task in response.json()["items"]}
+    except Exception:
+        pass
+    return None
+
+def _count_roadmap_tasks(uid, task_ids):
+    """
+    Return (valid task ids, completed count) for a roadmap's tasks: ids that
+    don't exist, are deleted or belong to someone else are dropped. If the
+    task service is unavailable every id is kept.
+    """
+    tasks = _lookup_tasks(uid, task_ids)
+    if tasks is None:
+        return list(task_ids), 0
+    valid_task_ids = [task_id for task_id in task_ids if task_id in tasks]
+    completed = sum(1 for task_id in valid_task_ids if tasks[task_id]["status"] in ("completed", "done"))
+    return valid_task_ids, completed
+
 def _sync_roadmap_with_tasks(roadmap):
     """
     Sync roadmap with actual task statuses from task service.
@@ -69,41 +104,14 @@ def _sync_roadmap_with_tasks(roadmap):
         return
     
     uid = current_user_id()
-    
-    valid_task_ids = []
-    completed_count = 0
-    
-    for task_id in roadmap.task_ids:
-        try:
-            # Pass X-User-Id header to ensure we only get tasks belonging to the user
-            headers = {"X-User-Id": uid}
-            response = requests.get(f"{Config.API_GATEWAY_URL}/v1/task-service/tasks/{task_id}", headers=headers, timeout=3)
-            if response.ok:
-                task_data = response.json()
-                
-                # Check if task is deleted
-                if task_data.get('deleted_at'):
-                    # Task is deleted - remove from roadmap
-                    continue
-                
-                # Task is valid - keep it
-                valid_task_ids.append(task_id)
-                
-                # Check if task is completed
-                status = task_data.get('status', '').lower()
-                if status in ['completed', 'done']:
-                    completed_count += 1
-            elif response.status_code == 404:
-                # Task not found (likely deleted or doesn't belong to user) - remove from roadmap
-                continue
-            else:
-                # Other error - assume task still exists (don't remove it)
-                # This prevents removing tasks due to temporary service issues
-                valid_task_ids.append(task_id)
-        except Exception:
-            # On error, assume task still exists (don't remove it)
-            # This prevents removing tasks due to temporary service issues
-            valid_task_ids.append(task_id)
+    tasks = _lookup_tasks(uid, roadmap.task_ids)
+    if tasks is None:
+        # Task service unavailable: keep the roadmap as it is rather than
+        # dropping tasks or completions because of a temporary outage
+        return
+
+    valid_task_ids = [task_id for task_id in roadmap.task_ids if task_id in tasks]
+    completed_count = sum(1 for task_id in valid_task_ids if tasks[task_id]["status"] in ("completed", "done"))
     
     # Update roadmap with synced data
     roadmap.task_ids = valid_task_ids
@@ -140,27 +148,7 @@ def create_roadmap():
     due_date = parse_iso(data.get('due_date'))
         
     # Fetch task statuses from task-service
-    headers = {"X-User-Id": uid}
-    
-    completed_tasks = 0
-    valid_task_ids = []
-    
-    if task_ids:
-        for task_id in task_ids:
-            try:
-                # Pass X-User-Id header to ensure we only get tasks belonging to the user
-                response = requests.get(f"{Config.API_GATEWAY_URL}/v1/task-service/tasks/{task_id}", headers=headers, timeout=3)
-                if response.ok:
-                    task_data = response.json()
-                    valid_task_ids.append(task_id)
-                    if task_data.get('status') == 'done' or task_data.get('status') == 'completed':
-                        completed_tasks += 1
-                elif response.status_code == 404:
-                    # Task doesn't exist or doesn't belong to user - skip it
-                    continue
-            except Exception:
-                # Handle connection errors gracefully - assume task exists
-                valid_task_ids.append(task_id)
+    valid_task_ids, completed_tasks = _count_roadmap_tasks(uid, task_ids)
 
     r = Roadmap(
         user_id=uid,
@@ -255,28 +243,7 @@ def update_roadmap(roadmap_id):
         task_ids = normalize_task_ids(data.get('task_ids'))
         
         # Fetch task statuses from task-service
-        headers = {"X-User-Id": uid}
-        
-        total_tasks = len(task_ids)
-        completed_tasks = 0
-        valid_task_ids = []
-        
-        if task_ids:
-            for task_id in task_ids:
-                try:
-                    # Pass X-User-Id header to ensure we only get tasks belonging to the user
-                    response = requests.get(f"{Config.API_GATEWAY_URL}/v1/task-service/tasks/{task_id}", headers=headers, timeout=3)
-                    if response.ok:
-                        task_data = response.json()
-                        valid_task_ids.append(task_id)
-                        if task_data.get('status') == 'done' or task_data.get('status') == 'completed':
-                            completed_tasks += 1
-                    elif response.status_code == 404:
-                        # Task doesn't exist or doesn't belong to user - skip it
-                        continue
-                except Exception:
-                    # Handle connection errors gracefully - assume task exists
-                    valid_task_ids.append(task_id)
+        valid_task_ids, completed_tasks = _count_roadmap_tasks(uid, task_ids)
         
         r.total_tasks = len(valid_task_ids)
         r.completed_tasks = completed_tasks
@@ -306,28 +273,7 @@ def refresh_roadmap_progress(roadmap_id):
     task_ids = normalize_task_ids(data.get('task_ids'))
     
     # Same fetch logic as create/update
-    headers = {"X-User-Id": uid}
-    
-    total_tasks = len(task_ids)
-    completed_tasks = 0
-    valid_task_ids = []
-    
-    if task_ids:
-        for task_id in task_ids:
-            try:
-                # Pass X-User-Id header to ensure we only get tasks belonging to the user
-                response = requests.get(f"{Config.API_GATEWAY_URL}/v1/task-service/tasks/{task_id}", headers=headers, timeout=3)
-                if response.ok:
-                    task_data = response.json()
-                    valid_task_ids.append(task_id)
-                    if task_data.get('status') == 'done' or task_data.get('status') == 'completed':
-                        completed_tasks += 1
-                elif response.status_code == 404:
-                    # Task doesn't exist or doesn't belong to user - skip it
-                    continue
-            except Exception:
-                # Handle connection errors gracefully - assume task exists
-                valid_task_ids.append(task_id)
+    valid_task_ids, completed_tasks = _count_roadmap_tasks(uid, task_ids)
     
     r.total_tasks = len(valid_task_ids)
     r.completed_tasks = completed_tasks
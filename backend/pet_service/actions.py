@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from sqlalchemy import case, select, update
+from models import db, Pet, ACTION_DELTAS, ACTION_BUCKETS
+from decay import clamp, decay_columns
+import rules
+
+
+def _level_columns(r, happiness, energy, gain):
+    """
+    SQL for Pet.add_xp(gain) on top of `happiness` and `energy`: for each
+    level below max, the levels that XP + gain reaches are constants from
+    the cumulative XP table, so every expression names the row's xp once
+    per branch instead of nesting the level computation.
+    """
+    if gain <= 0:
+        return {Pet.happiness: happiness, Pet.energy: energy}
+    top, total = r.max_level, r.xp_total
+    earned = Pet.xp + gain
+
+    def per_level(reached, otherwise, full=None):
+        # CASE level WHEN l THEN CASE WHEN earned >= <XP from l to L> THEN reached(L, l) ... END ... END
+        whens = {}
+        for level in range(top):
+            branches = [(earned >= total[top + 1] - total[level], full)] if full is not None else []
+            branches += [(earned >= total[to] - total[level], reached(to, level)) for to in range(top, level, -1)]
+            whens[level] = case(*branches, else_=otherwise)
+        return case(whens, value=Pet.level, else_=otherwise)
+
+    capped = Pet.level >= top
+    bonus = case((capped, 0), else_=per_level(lambda to, level: (to - level) * rules.LEVEL_UP_BONUS, 0))
+    return {
+        Pet.level: case((capped, top), else_=per_level(lambda to, level: to, Pet.level)),
+        # A full bar at max level resets XP to 0
+        Pet.xp: case((capped, 0), else_=per_level(lambda to, level: earned - (total[to] - total[level]),
+                                                  earned, full=0)),
+        # Level-up bonus, capped at stat_max (the stats are already >= stat_min)
+        Pet.happiness: clamp(happiness + bonus, r.stat_min, r.stat_max),
+        Pet.energy: clamp(energy + bonus, r.stat_min, r.stat_max),
+    }
+
+
+def action_columns(action, cost, now):
+    """
+    SET clause for one action, as _apply_and_return ran it in Python: decay
+    to `now`, spend `cost` points, apply the action's stat delta (clamped),
+    then grant its XP with any level-ups.
+    """
+    r = rules.current()
+    values, _ = decay_columns(now)
+    delta = ACTION_DELTAS[action]
+    for stat in ("hunger", "happiness", "energy"):
+        column = getattr(Pet, stat)
+        values[column] = clamp(values.get(column, column) + delta[stat], r.stat_min, r.stat_max)
+    values.update(_level_columns(r, values[Pet.happiness], values[Pet.energy], r.action_xp.get(action, 0)))
+    bucket = getattr(Pet, ACTION_BUCKETS[action])
+    if cost > 0:
+        values[bucket] = bucket - cost
+    return values
+
+
+def perform(action, cost, pet_id=None, user_id=None, now=None):
+    """
+    Run an action as one conditional UPDATE ... RETURNING: the row changes
+    only if its bucket holds `cost` points, so concurrent actions cannot
+    spend the same point, and nothing is read first.
+
+    Targets pet `pet_id`, or the first pet of `user_id`. Returns the updated
+    Pet, or None when no row matched (missing pet or too few points; see
+    exists()). The caller commits.
+    """
+    now = now or datetime.utcnow()
+    if pet_id is None:
+        pet_id = (select(Pet.id).where(Pet.user_id == user_id)
+                  .order_by(Pet.id.asc()).limit(1).scalar_subquery())
+    stmt = update(Pet).where(Pet.id == pet_id)
+    if cost > 0:
+        stmt = stmt.where(getattr(Pet, ACTION_BUCKETS[action]) >= cost)
+    stmt = (stmt.values(action_columns(action, cost, now))
+            .returning(Pet)
+            .execution_options(synchronize_session=False, populate_existing=True))
+    return db.session.execute(stmt).scalars().first()
+
+
+def perform_many(user_id, verbs, cost, now=None):
+    """
+    Apply `verbs` in order to the user's first pet inside the caller's
+    transaction: the row is locked (SELECT ... FOR UPDATE), decayed once,
+    then each action spends, applies and grants XP as in Python, and the
+    whole batch is written by one UPDATE at commit. Stops at the first
+    action whose bucket is short.
+
+    Returns (pet, applied, stopped) or None if the user has no pet. Each
+    applied entry carries the stat change that action actually made (after
+    clamping and level-up bonuses); `stopped` is the index of the action
+    that was short, or None.
+    """
+    pet = (Pet.query.filter_by(user_id=user_id).order_by(Pet.id.asc())
+           .with_for_update().first())
+    if pet is None:
+        return None
+    r = rules.current()
+    pet.tick(now or datetime.utcnow())
+    applied, stopped = [], None
+    for i, verb in enumerate(verbs):
+        before = {stat: getattr(pet, stat) for stat in ("hunger", "happiness", "energy", "level", "xp")}
+        if not pet.spend_points(verb, cost):
+            stopped = i
+            break
+        pet.apply_action(verb)
+        pet.add_xp(r.action_xp.get(verb, 0))
+        applied.append({
+            "action": verb,
+            "delta": {stat: getattr(pet, stat) - before[stat] for stat in ("hunger", "happiness", "energy")},
+            "xp": r.action_xp.get(verb, 0),
+            "level_up": pet.level > before["level"],
+        })
+    return pet, applied, stopped
+
+
+def exists(pet_id=None, user_id=None):
+    """After perform() returned None: True if the pet is there (so points were short)."""
+    q = Pet.query.filter(Pet.id == pet_id) if pet_id is not None else Pet.query.filter(Pet.user_id == user_id)
+    return db.session.query(q.exists()).scalar()
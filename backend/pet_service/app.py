@@ -1,31 +1,54 @@
-import os
-from flask import Flask, jsonify
-from flask_cors import CORS
-from config import Config
-from models import db
-from routes import pets_bp, root_bp
-
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
-    
-    CORS(app)
-    db.init_app(app)
-    
-    with app.app_context():
-        #db.drop_all()
-        db.create_all()
-    
-    app.register_blueprint(pets_bp)
-    app.register_blueprint(root_bp)
-
-    @app.route("/")
-    def index():
-        return jsonify({'message': 'PET SERVICE is running'}), 200
-
-    return app
-
-if __name__ == '__main__':
-    app = create_app()
-    port = int(os.getenv('PORT', 5002))
+import os
+from flask import Flask, jsonify
+from flask_cors import CORS
+from flask_migrate import Migrate
+from config import Config
+from shared.json_provider import FastJSONProvider
+from models import db
+import rules
+from routes import pets_bp, root_bp
+
+BASE_DIR = os.path.dirname(__file__)
+
+migrate = Migrate()
+
+def create_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(Config)
+    
+    CORS(app)
+    db.init_app(app)
+    # XP table, clamps and decay rates, compiled once from config
+    rules.init_app(app)
+    # Schema changes for existing databases: `flask db upgrade` (migrations/)
+    migrate.init_app(app, db, directory=os.path.join(BASE_DIR, 'migrations'))
+    
+    with app.app_context():
+        #db.drop_all()
+        db.create_all()
+    
+    app.register_blueprint(pets_bp)
+    app.register_blueprint(root_bp)
+
+    @app.route("/")
+    def index():
+        return jsonify({'message': 'PET SERVICE is running'}), 200
+
+    return app
+
+def start_background_jobs(app):
+    """
+    Start the decay sweeper (if enabled). Called by the server entrypoint,
+    not create_app(), so `flask db upgrade` never sweeps a half-migrated table.
+    """
+    # Persist pet decay in the background (safe to run on every instance)
+    if app.config['PET_DECAY_SWEEP_ENABLED']:
+        from decay import sweeper
+        sweeper.start(app)
+
+if __name__ == '__main__':
+    app = create_app()
+    start_background_jobs(app)
+    port = int(os.getenv('PORT', 5002))
     app.run(host='0.0.0.0', port=port, debug=app.config['DEBUG'])
\ No newline at end of file
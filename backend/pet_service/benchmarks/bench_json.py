@@ -0,0 +1,103 @@
+"""
+Cost of JSON-encoding GET /pets.
+
+Seeds pets and times the full (streamed) request, then the serialize +
+encode step alone: Flask's default provider with isoformat() per datetime
+field (as before), shared.json_provider forced onto the stdlib encoder,
+and with orjson.
+
+    python benchmarks/bench_json.py --pets 100 1000 10000
+
+The benchmark drops and recreates the tables: point it at a scratch database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("PET_DATABASE_URL", "sqlite:///bench_json.db")
+os.environ.setdefault("POINT_COST_PER_ACTION", "1")
+os.environ["DEBUG"] = "False"
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from models import db, Pet
+from shared import json_provider
+
+URL = "/api/v1/pets"
+BREEDS = ("dog", "cat", "bird", "dragon")
+
+
+def seed(n):
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    db.session.execute(Pet.__table__.insert(), [{
+        "name": f"Pet {i}",
+        "breed": rng.choice(BREEDS),
+        "age": rng.randint(0, 10),
+        "user_id": i % 50,
+        "description": "A very good pet that likes walks, naps and snacks.",
+        "created_at": now,
+        "updated_at": now,
+        "last_tick_at": now,
+        "level": rng.randint(0, 9),
+        "xp": rng.randint(0, 500),
+        "hunger": rng.randint(0, 100),
+        "happiness": rng.randint(0, 100),
+        "energy": rng.randint(0, 100),
+        "feeding_points": 0,
+        "playing_points": 0,
+        "cleaning_points": 0,
+    } for i in range(n)])
+    db.session.commit()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pets", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    ctx = app.app_context()
+    ctx.push()
+    legacy = DefaultJSONProvider(app)
+    iso = lambda d: {k: v.isoformat() if isinstance(v, datetime) else v for k, v in d.items()}
+    fast = json_provider.orjson
+    print(f"orjson available: {fast is not None}")
+    print(f"{'pets':>6} | {'bytes':>9} | {'request ms':>10} | {'flask+isoformat ms':>18} | {'stdlib ms':>9} | {'orjson ms':>9}")
+    for n in args.pets:
+        seed(n)
+        pets = Pet.query.order_by(Pet.id).all()
+        size = len(client.get(URL).data)
+        request_ms = timed(lambda: client.get(URL).data, args.runs)
+        legacy_ms = timed(lambda: legacy.response({"items": [iso(p.to_dict()) for p in pets]}), args.runs)
+        encode_ms = {}
+        for name, encoder in (("stdlib", None), ("orjson", fast)):
+            json_provider.orjson = encoder
+            encode_ms[name] = timed(lambda: app.json.response({"items": [p.to_dict() for p in pets]}), args.runs)
+        json_provider.orjson = fast
+        orjson_ms = f"{encode_ms['orjson']:>9.2f}" if fast is not None else f"{'-':>9}"
+        print(f"{n:>6} | {size:>9} | {request_ms:>10.2f} | {legacy_ms:>18.2f} | {encode_ms['stdlib']:>9.2f} | {orjson_ms}")
+    db.session.remove()
+    ctx.pop()
+
+
+if __name__ == "__main__":
+    main()
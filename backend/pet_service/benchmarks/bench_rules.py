@@ -0,0 +1,114 @@
+"""
+Cost of Pet.add_xp() and Pet.to_dict() with compiled rules.PetRules against
+the previous versions, which read current_app.config and recomputed
+`base * growth ** (level-1)` on every call (add_xp twice per level gained).
+
+    python benchmarks/bench_rules.py --grants 100000 --pets 10000
+
+Runs in memory (no database rows are written).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("PET_DATABASE_URL", "sqlite://")
+os.environ.setdefault("POINT_COST_PER_ACTION", "1")
+os.environ["PET_DECAY_SWEEP_ENABLED"] = "False"
+os.environ["DEBUG"] = "False"
+
+from flask import current_app
+from app import create_app
+from models import Pet
+import rules
+
+
+def legacy_xp_to_next(pet):
+    base = current_app.config.get('PET_LEVEL_XP_BASE', 100)
+    growth = current_app.config.get('PET_LEVEL_XP_GROWTH', 1.5)
+    return max(int(round(base * (growth ** (pet.level - 1)))), 1)
+
+
+def legacy_add_xp(pet, points):
+    max_level = current_app.config.get('PET_MAX_LEVEL', 9)
+    if int(pet.level) >= int(max_level):
+        pet.level, pet.xp = int(max_level), 0
+        return
+    pet.xp += points
+    while pet.xp >= legacy_xp_to_next(pet):
+        if int(pet.level) >= int(max_level):
+            pet.level, pet.xp = int(max_level), 0
+            break
+        pet.xp -= legacy_xp_to_next(pet)
+        pet.level += 1
+        pet.happiness = min(pet.happiness + 5, 100)
+        pet.energy = min(pet.energy + 5, 100)
+
+
+def legacy_status(pet, now):
+    # The config-dependent part of the previous to_dict (decay + xp_to_next)
+    mn = current_app.config.get('STAT_MIN', 0)
+    mx = current_app.config.get('STAT_MAX', 100)
+    elapsed = (now - pet.last_tick_at).total_seconds()
+    stats = {}
+    for stat, key, default in rules.DECAYING_STATS:
+        per_point = float(current_app.config.get(key, default))
+        steps, _ = divmod(float(getattr(pet, f"{stat}_carry_sec")) + elapsed, per_point)
+        stats[stat] = max(mn, min(mx, int(getattr(pet, stat) - steps)))
+    return {**stats, "level": pet.level, "xp": pet.xp, "xp_to_next": legacy_xp_to_next(pet)}
+
+
+def pets(n, rng, now):
+    return [Pet(id=i, name="p", breed="b", user_id=i, level=rng.randint(0, 3), xp=0,
+                hunger=rng.randint(0, 100), happiness=rng.randint(0, 100), energy=rng.randint(0, 100),
+                feeding_points=0, playing_points=0, cleaning_points=0,
+                hunger_carry_sec=0.0, energy_carry_sec=0.0, happiness_carry_sec=0.0,
+                last_tick_at=now - timedelta(seconds=rng.randint(0, 7200))) for i in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grants", type=int, default=100000)
+    parser.add_argument("--pets", type=int, default=10000)
+    parser.add_argument("--max-level", type=int, default=50, help="PET_MAX_LEVEL for the burst runs")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        now = datetime.utcnow()
+        print(f"{'case':<34} | {'legacy ms':>10} | {'PetRules ms':>11}")
+        try:
+            for max_level in (int(app.config["PET_MAX_LEVEL"]), args.max_level):
+                rules.reload(app, {"PET_MAX_LEVEL": max_level, "PET_LEVEL_XP_GROWTH": 1.1})
+                for burst in (10, 1000, 10 ** 6):
+                    rng = random.Random(1)
+                    old, new = pets(args.grants, rng, now), pets(args.grants, random.Random(1), now)
+                    legacy = timed(lambda: [legacy_add_xp(p, burst) for p in old])
+                    compiled = timed(lambda: [p.add_xp(burst) for p in new])
+                    assert [(p.level, p.xp) for p in old] == [(p.level, p.xp) for p in new]
+                    label = f"add_xp({burst}) x{args.grants}, max {max_level}"
+                    print(f"{label:<34} | {legacy:>10.1f} | {compiled:>11.1f}")
+        finally:
+            # Overrides are stored in the database; leave none behind
+            rules.reload(app, {"PET_MAX_LEVEL": None, "PET_LEVEL_XP_GROWTH": None})
+
+        # The stat/XP fields to_dict() adds for every pet on GET /pets
+        listed = pets(args.pets, random.Random(2), now)
+        legacy = timed(lambda: [legacy_status(p, now) for p in listed])
+        compiled = timed(lambda: [p.status_dict(now) for p in listed])
+        print(f"{f'status fields x{args.pets}':<34} | {legacy:>10.1f} | {compiled:>11.1f}")
+        full = timed(lambda: [p.to_dict() for p in listed])
+        print(f"{f'full to_dict x{args.pets}':<34} | {'':>10} | {full:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
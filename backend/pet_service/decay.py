@@ -0,0 +1,156 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, and_, case, cast, func, literal, or_, select, update
+from config import Config
+from models import db, Pet
+import rules
+
+
+def elapsed_sec(now):
+    """SQL: seconds from each row's last_tick_at to `now` (naive UTC, like the column)."""
+    at = literal(now, db.DateTime)
+    if db.engine.dialect.name == "postgresql":
+        return func.extract("epoch", at - Pet.last_tick_at)
+    # SQLite keeps datetimes to the millisecond; rounding drops the float
+    # error of julianday() so whole intervals land on exact step boundaries
+    return func.round((func.julianday(at) - func.julianday(Pet.last_tick_at)) * 86400.0, 3)
+
+
+def whole(x):
+    """SQL floor() of a non-negative number (Postgres rounds on a plain CAST)."""
+    if db.engine.dialect.name == "postgresql":
+        return cast(func.floor(x), Integer)
+    return cast(x, Integer)
+
+
+def clamp(x, mn, mx):
+    """SQL clamp that names `x` once (it is often a large expression)."""
+    if db.engine.dialect.name == "postgresql":
+        return func.greatest(mn, func.least(mx, x))
+    return func.max(mn, func.min(mx, x))  # SQLite's multi-argument scalar max()/min()
+
+
+def decay_columns(now):
+    """
+    SQL expressions for Pet.tick(now), computed in the database from each
+    row's own stats, carries and last_tick_at.
+
+    Returns (values, due): the SET clause, and a condition that is true for
+    rows where some stat loses at least one point.
+    """
+    r = rules.current()
+    # Non-monotonic clocks: a row ticked "after" now does not decay (or move back)
+    behind = Pet.last_tick_at < literal(now, db.DateTime)
+    elapsed = case((behind, elapsed_sec(now)), else_=0.0)
+    values, due = {Pet.last_tick_at: case((behind, literal(now, db.DateTime)), else_=Pet.last_tick_at)}, []
+    for stat, per_point in r.decay:
+        column, carry = getattr(Pet, stat), getattr(Pet, f"{stat}_carry_sec")
+        total = carry + elapsed
+        steps = whole(total / per_point)
+        values[column] = case((steps > 0, clamp(column - steps, r.stat_min, r.stat_max)), else_=column)
+        values[carry] = total - steps * per_point
+        due.append(and_(steps > 0, column > r.stat_min))
+    return values, (or_(*due) if due else None)
+
+
+class DecaySweeper:
+    """
+    Persists time-based decay for every pet, so stored stats stay close to
+    what reads show (reporting queries read the pets table directly).
+
+    Each id range [lo, lo + chunk_size) is one set-based UPDATE computed in
+    the database and one commit. Rows with nothing to decay are skipped, so
+    idle pets already at STAT_MIN are not rewritten on every pass.
+
+    Usage:
+        from decay import sweeper
+
+        sweeper.start(app)     # background thread
+        sweeper.run_once()     # all pets, inside an app context
+        sweeper.stats()
+    """
+
+    def __init__(self, chunk_size=10000, interval=600.0):
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._totals = {"runs": 0, "chunks": 0, "updated": 0}
+        self._last = None
+        self.thread = None
+
+    def start(self, app):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, args=(app,), daemon=True, name="decay-sweeper")
+            self.thread.start()
+            print("✅ Pet decay sweeper started")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, now=None):
+        """Sweep every pet once. Returns this run's counts."""
+        started = time.monotonic()
+        now = now or datetime.utcnow()
+        values, due = decay_columns(now)
+        lo, hi = db.session.execute(select(func.min(Pet.id), func.max(Pet.id))).one()
+        db.session.commit()
+
+        chunks = updated = 0
+        if due is not None and lo is not None:
+            for start in range(lo, hi + 1, self.chunk_size):
+                result = db.session.execute(
+                    update(Pet)
+                    .where(Pet.id >= start, Pet.id < start + self.chunk_size, Pet.last_tick_at < now, due)
+                    .values(values)
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                chunks += 1
+                updated += result.rowcount
+
+        duration = time.monotonic() - started
+        last = {
+            "chunks": chunks,
+            "updated": updated,
+            "duration_sec": round(duration, 4),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._stats_lock:
+            self._totals["runs"] += 1
+            self._totals["chunks"] += chunks
+            self._totals["updated"] += updated
+            self._last = last
+        if updated:
+            print(f"✅ Decay sweep: {updated} pets in {chunks} chunks, {duration:.2f}s")
+        return last
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "chunk_size": self.chunk_size,
+                "interval_sec": self.interval,
+                "totals": dict(self._totals),
+                "last_run": dict(self._last) if self._last else None,
+            }
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Decay sweep error: {e}")
+                finally:
+                    db.session.remove()
+                self._stop.wait(self.interval)
+
+
+# Global instance
+sweeper = DecaySweeper(
+    chunk_size=Config.PET_DECAY_SWEEP_CHUNK_SIZE,
+    interval=Config.PET_DECAY_SWEEP_INTERVAL_SEC,
+)
@@ -0,0 +1,63 @@
+"""baseline: pets and event_logs as created by db.create_all()
+
+Revision ID: 5a9e2c7f1b03
+Revises: 
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9e2c7f1b03'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # Databases created before migrations existed already have these tables
+    # (from db.create_all()); only create what is missing.
+    if not _has_table('pets'):
+        op.create_table(
+            'pets',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('breed', sa.String(length=100), nullable=False),
+            sa.Column('age', sa.Integer(), nullable=True),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('level', sa.Integer(), nullable=False),
+            sa.Column('xp', sa.Integer(), nullable=False),
+            sa.Column('hunger', sa.Integer(), nullable=False),
+            sa.Column('happiness', sa.Integer(), nullable=False),
+            sa.Column('energy', sa.Integer(), nullable=False),
+            sa.Column('feeding_points', sa.Integer(), nullable=False),
+            sa.Column('playing_points', sa.Integer(), nullable=False),
+            sa.Column('cleaning_points', sa.Integer(), nullable=False),
+            sa.Column('last_tick_at', sa.DateTime(), nullable=False),
+        )
+
+    if not _has_table('event_logs'):
+        op.create_table(
+            'event_logs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+            sa.Column('event_type', sa.String(length=100), nullable=False),
+            sa.Column('payload', postgresql.JSONB(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.UniqueConstraint('idempotency_key', name='uq_event_idempotency_key'),
+        )
+
+
+def downgrade():
+    op.drop_table('event_logs')
+    op.drop_table('pets')
@@ -0,0 +1,37 @@
+"""read-side decay: per-stat partial decay interval on pets
+
+Revision ID: 9c4d1e8a2f60
+Revises: 5a9e2c7f1b03
+Create Date: 2026-10-17 17:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d1e8a2f60'
+down_revision = '5a9e2c7f1b03'
+branch_labels = None
+depends_on = None
+
+CARRY_COLUMNS = ('hunger_carry_sec', 'energy_carry_sec', 'happiness_carry_sec')
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # Existing pets start with no partial interval (what tick() used to leave)
+    missing = [c for c in CARRY_COLUMNS if not _has_column('pets', c)]
+    if missing:
+        with op.batch_alter_table('pets') as batch:
+            for name in missing:
+                batch.add_column(sa.Column(name, sa.Float(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('pets') as batch:
+        for name in CARRY_COLUMNS:
+            batch.drop_column(name)
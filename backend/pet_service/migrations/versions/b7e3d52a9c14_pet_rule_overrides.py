@@ -0,0 +1,35 @@
+"""pet_rule_overrides: operator rule overrides shared by every worker
+
+Revision ID: b7e3d52a9c14
+Revises: 9c4d1e8a2f60
+Create Date: 2026-10-17 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d52a9c14'
+down_revision = '9c4d1e8a2f60'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which may have created it already
+    if not _has_table('pet_rule_overrides'):
+        op.create_table(
+            'pet_rule_overrides',
+            sa.Column('key', sa.String(length=64), primary_key=True),
+            sa.Column('value', sa.JSON(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('pet_rule_overrides')
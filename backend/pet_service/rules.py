@@ -0,0 +1,206 @@
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+# (stat, config key for seconds per -1 point, default)
+DECAYING_STATS = (
+    ("hunger", "HUNGER_DECAY_SEC", 600.0),        # ~1 every 10m
+    ("energy", "ENERGY_DECAY_SEC", 900.0),        # ~1 every 15m
+    ("happiness", "HAPPINESS_DECAY_SEC", 1200.0), # ~1 every 20m
+)
+
+# (config key, default) for every value PetRules compiles
+RULE_KEYS = (
+    ("STAT_MIN", 0),
+    ("STAT_MAX", 100),
+    ("PET_LEVEL_XP_BASE", 100),
+    ("PET_LEVEL_XP_GROWTH", 1.5),
+    ("PET_MAX_LEVEL", 9),
+    ("XP_PER_FEED", 10),
+    ("XP_PER_PLAY", 15),
+    ("XP_PER_CLEAN", 8),
+) + tuple((key, default) for _, key, default in DECAYING_STATS)
+
+LEVEL_UP_BONUS = 5  # happiness and energy per level gained
+
+
+class PetRules:
+    """
+    Progression and stat rules, compiled once from Flask config.
+
+    - stat_min / stat_max: clamp bounds
+    - decay: ((stat, seconds per -1 point), ...) for the stats that decay
+    - xp_to_next[level]: XP needed to leave `level`
+    - xp_total[level]: XP from level 0 to reach `level`, so a burst of XP
+      resolves to a level with one binary search
+    - action_xp: XP granted per action verb
+
+    Treat an instance as read-only; reload() swaps in a new one.
+    """
+
+    def __init__(self, config):
+        values = {key: config.get(key, default) for key, default in RULE_KEYS}
+        self.stat_min = int(values["STAT_MIN"])
+        self.stat_max = int(values["STAT_MAX"])
+        self.decay = tuple(
+            (stat, float(values[key])) for stat, key, _ in DECAYING_STATS if float(values[key]) > 0
+        )
+        self.max_level = int(values["PET_MAX_LEVEL"])
+        base, growth = values["PET_LEVEL_XP_BASE"], values["PET_LEVEL_XP_GROWTH"]
+        self.xp_to_next = tuple(
+            max(int(round(base * (growth ** (level - 1)))), 1) for level in range(self.max_level + 1)
+        )
+        total = [0]
+        for needed in self.xp_to_next:
+            total.append(total[-1] + needed)
+        self.xp_total = tuple(total)
+        self.action_xp = {
+            "feed": int(values["XP_PER_FEED"]),
+            "play": int(values["XP_PER_PLAY"]),
+            "clean": int(values["XP_PER_CLEAN"]),
+        }
+        self.source = values
+
+    def clamp(self, value):
+        return max(self.stat_min, min(self.stat_max, int(value)))
+
+    def needed(self, level):
+        """XP required to leave `level` (levels outside the table are computed)."""
+        if 0 <= level <= self.max_level:
+            return self.xp_to_next[level]
+        base, growth = self.source["PET_LEVEL_XP_BASE"], self.source["PET_LEVEL_XP_GROWTH"]
+        return max(int(round(base * (growth ** (level - 1)))), 1)
+
+    def level_for(self, level, xp):
+        """
+        (level, xp) after holding `xp` at `level`, with every level-up applied:
+        the highest level whose cumulative threshold the total XP reaches,
+        capped at max_level (where a full bar resets XP to 0).
+        """
+        if level < 0:
+            return level, xp
+        total = self.xp_total[min(level, self.max_level)] + xp
+        new_level = bisect_right(self.xp_total, total, level, self.max_level + 1) - 1
+        xp = total - self.xp_total[new_level]
+        if new_level == self.max_level and xp >= self.xp_to_next[new_level]:
+            xp = 0
+        return new_level, xp
+
+    def as_dict(self):
+        return {
+            "stat_min": self.stat_min,
+            "stat_max": self.stat_max,
+            "decay_sec": dict(self.decay),
+            "max_level": self.max_level,
+            "xp_to_next": list(self.xp_to_next),
+            "action_xp": dict(self.action_xp),
+        }
+
+
+_lock = threading.Lock()
+RULE_NAMES = frozenset(key for key, _ in RULE_KEYS)
+
+
+def init_app(app):
+    """Compile the rules for `app` (called once from create_app)."""
+    app.extensions["pet_rules"] = PetRules(app.config)
+    # Operator overrides live in pet_rule_overrides so every worker applies
+    # them; current() re-reads the table at most every PET_RULES_REFRESH_SEC
+    app.extensions["pet_rule_overrides"] = {
+        "base": {key: app.config.get(key, default) for key, default in RULE_KEYS},
+        "values": {},
+        "checked_at": None,
+    }
+
+
+def current():
+    """The current app's compiled rules, with the shared overrides applied."""
+    app = current_app._get_current_object()
+    if "pet_rules" not in app.extensions:
+        init_app(app)
+    checked_at = app.extensions["pet_rule_overrides"]["checked_at"]
+    if checked_at is None or time.monotonic() - checked_at >= app.config.get("PET_RULES_REFRESH_SEC", 5.0):
+        refresh(app)
+    return app.extensions["pet_rules"]
+
+
+def refresh(app, force=False):
+    """
+    Re-read the overrides and recompile if they changed. A failed read or an
+    invalid stored value keeps the current rules until the next interval.
+    """
+    from models import db, RuleOverride
+
+    state = app.extensions["pet_rule_overrides"]
+    with _lock:
+        checked_at = state["checked_at"]
+        if not force and checked_at is not None and \
+                time.monotonic() - checked_at < app.config.get("PET_RULES_REFRESH_SEC", 5.0):
+            return app.extensions["pet_rules"]  # another thread just did it
+        state["checked_at"] = time.monotonic()
+        try:
+            # Own connection: callers may be mid-transaction on the session
+            with db.engine.connect() as conn:
+                rows = conn.execute(select(RuleOverride.key, RuleOverride.value)).all()
+        except SQLAlchemyError as e:
+            app.logger.warning("pet rule overrides not read: %s", e)
+            return app.extensions["pet_rules"]
+        values = {key: value for key, value in rows if key in RULE_NAMES}
+        if values != state["values"]:
+            merged = dict(state["base"], **values)
+            try:
+                rules = PetRules(merged)
+            except (ValueError, TypeError) as e:
+                app.logger.warning("pet rule overrides not applied: %s", e)
+                return app.extensions["pet_rules"]
+            app.config.update(merged)
+            app.extensions["pet_rules"] = rules
+            state["values"] = values
+    return app.extensions["pet_rules"]
+
+
+def reload(app, changes=None):
+    """
+    Store config `changes` (rule keys only; None drops a key's override) for
+    every worker, then recompile this one. Other workers pick the change up
+    on their next refresh.
+    """
+    from models import db, RuleOverride
+
+    changes = dict(changes or {})
+    unknown = set(changes) - RULE_NAMES
+    if unknown:
+        raise ValueError(f"not a pet rule: {', '.join(sorted(unknown))}")
+    state = app.extensions["pet_rule_overrides"]
+    candidate = dict(state["base"], **state["values"])
+    candidate.update({key: state["base"][key] if value is None else value for key, value in changes.items()})
+    PetRules(candidate)  # validate before storing anything
+
+    dropped = [key for key, value in changes.items() if value is None]
+    if dropped:
+        db.session.execute(delete(RuleOverride).where(RuleOverride.key.in_(dropped)))
+    stored = [{"key": key, "value": value, "updated_at": datetime.utcnow()}
+              for key, value in changes.items() if value is not None]
+    if stored:
+        db.session.execute(_upsert(db, RuleOverride, stored))
+    db.session.commit()
+    return refresh(app, force=True)
+
+
+def _upsert(db, model, rows):
+    # Concurrent reloads of the same key both succeed (the last one wins)
+    # instead of one failing on the primary key
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+    )
@@ -0,0 +1,61 @@
+# tests/conftest.py
+import os, sys, tempfile, pytest
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# A file database (not :memory:) so concurrent tests get separate connections;
+# point PET_TEST_DATABASE_URL at Postgres to run the Postgres SQL branches.
+_DB_FILE = os.path.join(tempfile.mkdtemp(prefix="pet-tests-"), "pets.db")
+os.environ["PET_DATABASE_URL"] = os.getenv("PET_TEST_DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ["DEBUG"] = "False"
+os.environ["PET_DECAY_SWEEP_ENABLED"] = "False"
+os.environ["POINT_COST_PER_ACTION"] = "1"
+os.environ["PET_OPS_TOKEN"] = "test-ops"
+
+from datetime import datetime
+from app import create_app
+from models import db, Pet
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+@pytest.fixture()
+def app():
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+def make_pet(**fields):
+    """Insert a pet (defaults: user 1, mid stats, no points, ticked at NOW) and return it."""
+    values = dict(name="Mochi", breed="Cat", user_id=1, level=0, xp=0,
+                  hunger=50, happiness=50, energy=50,
+                  feeding_points=0, playing_points=0, cleaning_points=0,
+                  hunger_carry_sec=0.0, energy_carry_sec=0.0, happiness_carry_sec=0.0,
+                  last_tick_at=NOW)
+    values.update(fields)
+    pet = Pet(**values)
+    db.session.add(pet)
+    db.session.commit()
+    return pet
+
+STATE = ("level", "xp", "hunger", "happiness", "energy",
+         "feeding_points", "playing_points", "cleaning_points", "last_tick_at")
+CARRIES = ("hunger_carry_sec", "energy_carry_sec", "happiness_carry_sec")
+
+def copy_pet(pet):
+    """Detached Pet with the same state, for running the Python model methods."""
+    return Pet(**{f: getattr(pet, f) for f in STATE + CARRIES})
+
+def assert_same_state(got, expected):
+    assert {f: getattr(got, f) for f in STATE} == {f: getattr(expected, f) for f in STATE}
+    for f in CARRIES:
+        assert getattr(got, f) == pytest.approx(getattr(expected, f), abs=1e-3), f
@@ -0,0 +1,166 @@
+# tests/test_actions.py
+import random
+import threading
+from datetime import timedelta
+
+import pytest
+from models import db, Pet, ACTION_DELTAS, ACTION_BUCKETS
+import actions
+import rules
+from conftest import NOW, make_pet, copy_pet, assert_same_state
+
+API = "/api/v1"
+ME = {"X-User-Id": "1"}
+
+def _python_action(pet, action, cost, now):
+    """The per-row path perform() replaced: tick, spend, apply, grant XP."""
+    pet.tick(now)
+    if not pet.spend_points(action, cost):
+        return False
+    pet.apply_action(action)
+    pet.add_xp(rules.current().action_xp[action])
+    return True
+
+def _random_pet(rng, user_id):
+    # Fractional carries/elapsed keep decay steps off exact boundaries
+    return make_pet(
+        user_id=user_id,
+        level=rng.randint(0, 5), xp=rng.randint(0, 20),
+        hunger=rng.randint(0, 100), happiness=rng.randint(0, 100), energy=rng.randint(0, 100),
+        feeding_points=rng.randint(0, 2), playing_points=rng.randint(0, 2), cleaning_points=rng.randint(0, 2),
+        hunger_carry_sec=rng.randint(0, 599) + 0.5, energy_carry_sec=rng.randint(0, 899) + 0.5,
+        happiness_carry_sec=rng.randint(0, 1199) + 0.5,
+        last_tick_at=NOW - timedelta(seconds=rng.randint(0, 20000) + 0.25),
+    )
+
+@pytest.mark.parametrize("changes", [
+    {},
+    # Small XP steps and a low cap: most actions level up, often into max level
+    {"PET_LEVEL_XP_BASE": 6, "PET_LEVEL_XP_GROWTH": 1.3, "PET_MAX_LEVEL": 5},
+])
+def test_perform_matches_tick_spend_apply_add_xp(app, changes):
+    rules.reload(app, changes)
+    rng = random.Random(24)
+    for i in range(60):
+        pet = _random_pet(rng, user_id=i)
+        action = rng.choice(sorted(ACTION_DELTAS))
+        expected = copy_pet(pet)
+        ok = _python_action(expected, action, 1, NOW)
+
+        got = actions.perform(action, 1, pet_id=pet.id, now=NOW)
+        db.session.commit()
+        assert (got is not None) == ok
+        if ok:
+            assert_same_state(got, expected)
+        else:
+            db.session.refresh(pet)
+            assert getattr(pet, ACTION_BUCKETS[action]) == 0
+
+def test_perform_by_user_targets_first_pet(app):
+    first = make_pet(user_id=7, feeding_points=1)
+    second = make_pet(user_id=7, feeding_points=1)
+    got = actions.perform("feed", 1, user_id=7, now=NOW)
+    db.session.commit()
+    assert got.id == first.id
+    assert db.session.get(Pet, second.id).feeding_points == 1
+
+def test_missing_pet_is_404_and_short_points_400(client):
+    assert client.post(f"{API}/pets/999/actions/feed").status_code == 404
+    assert client.post(f"{API}/pets/me/actions/feed", headers=ME).status_code == 404
+
+    pet = make_pet(feeding_points=0, playing_points=1)
+    r = client.post(f"{API}/pets/{pet.id}/actions/feed")
+    assert r.status_code == 400 and r.get_json()["error"] == "insufficient_points"
+    r = client.post(f"{API}/pets/me/actions/feed", headers=ME)
+    assert r.status_code == 400 and r.get_json()["error"] == "insufficient_points"
+
+    r = client.post(f"{API}/pets/me/actions/play", headers=ME)
+    body = r.get_json()
+    assert r.status_code == 200 and body["applied"] == "play" and body["delta"] == ACTION_DELTAS["play"]
+    assert body["pet"]["playing_points"] == 0
+
+def test_concurrent_spends_of_the_last_point(app):
+    if app.config["SQLALCHEMY_DATABASE_URI"].endswith(":memory:"):
+        pytest.skip("needs a database shared between connections")
+    pet_id = make_pet(feeding_points=1).id
+    db.session.remove()
+
+    barrier = threading.Barrier(2)
+    results = []
+
+    def spend():
+        with app.app_context():
+            barrier.wait()
+            try:
+                pet = actions.perform("feed", 1, pet_id=pet_id, now=NOW)
+                results.append(pet is not None)
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=spend) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == [False, True]
+    pet = db.session.get(Pet, pet_id)
+    assert pet.feeding_points == 0 and pet.xp == rules.current().action_xp["feed"]
+
+def test_perform_many_matches_single_actions(app):
+    verbs = ["feed", "play", "clean", "feed", "play", "feed"]
+    points = dict(feeding_points=3, playing_points=2, cleaning_points=1)
+    batched = make_pet(user_id=1, level=1, hunger=95, energy=8, last_tick_at=NOW - timedelta(hours=3), **points)
+    single = make_pet(user_id=2, level=1, hunger=95, energy=8, last_tick_at=NOW - timedelta(hours=3), **points)
+
+    pet, applied, stopped = actions.perform_many(1, verbs, 1, now=NOW)
+    db.session.commit()
+    for verb in verbs:
+        assert actions.perform(verb, 1, pet_id=single.id, now=NOW) is not None
+        db.session.commit()
+
+    assert stopped is None and [a["action"] for a in applied] == verbs
+    db.session.refresh(single)
+    assert_same_state(pet, single)
+    # Deltas are the clamped change: 3h of decay leaves hunger at 77, and +25 caps at 100
+    assert applied[0]["delta"]["hunger"] == 100 - (95 - 18)
+
+def test_batch_stops_at_first_short_action(client):
+    make_pet(feeding_points=2, playing_points=5)
+    r = client.post(f"{API}/pets/me/actions", json={"actions": ["feed", "play", "feed", "feed", "play"]}, headers=ME)
+    body = r.get_json()
+    assert r.status_code == 200
+    assert [a["action"] for a in body["applied"]] == ["feed", "play", "feed"]
+    assert body["stopped"] == {"index": 3, "action": "feed", "error": "insufficient_points"}
+    assert body["requested"] == 5
+    # The applied prefix is committed
+    pet = Pet.query.filter_by(user_id=1).one()
+    assert (pet.feeding_points, pet.playing_points) == (0, 4)
+
+def test_batch_with_nothing_applied_rolls_back(client):
+    pet = make_pet(feeding_points=0, playing_points=3, hunger=40, last_tick_at=NOW - timedelta(hours=2))
+    before = {f: getattr(pet, f) for f in ("hunger", "playing_points", "last_tick_at", "hunger_carry_sec")}
+
+    r = client.post(f"{API}/pets/me/actions", json={"action": "feed", "count": 3}, headers=ME)
+    assert r.status_code == 400 and r.get_json()["error"] == "insufficient_points"
+
+    db.session.expire_all()
+    pet = db.session.get(Pet, pet.id)
+    # Not even the decay applied while locking the row is kept
+    assert {f: getattr(pet, f) for f in before} == before
+
+def test_batch_validation(client):
+    make_pet(feeding_points=100)
+    limit = client.application.config["PET_ACTIONS_BATCH_MAX"]
+    assert client.post(f"{API}/pets/me/actions", json={"actions": ["feed"]}).status_code == 401
+    r = client.post(f"{API}/pets/me/actions", json={"action": "feed", "count": limit + 1}, headers=ME)
+    assert r.status_code == 400 and r.get_json() == {"error": "too_many_actions", "max": limit}
+    r = client.post(f"{API}/pets/me/actions", json={"actions": ["feed", "nap"]}, headers=ME)
+    assert r.status_code == 400 and r.get_json() == {"error": "invalid_action", "index": 1}
+    r = client.post(f"{API}/pets/me/actions", json={"actions": []}, headers=ME)
+    assert r.status_code == 400
+    r = client.post(f"{API}/pets/me/actions", json={"action": "feed", "count": "many"}, headers=ME)
+    assert r.status_code == 400
+    assert client.post(f"{API}/pets/me/actions", json={"actions": ["feed"]},
+                       headers={"X-User-Id": "2"}).status_code == 404
@@ -0,0 +1,94 @@
+# tests/test_decay.py
+import random
+from datetime import timedelta
+
+from models import db, Pet
+from decay import DecaySweeper
+from conftest import NOW, make_pet, copy_pet, assert_same_state
+
+def test_decayed_is_pure_and_keeps_partial_progress(app):
+    pet = make_pet(hunger=50, energy=50, happiness=50, last_tick_at=NOW - timedelta(seconds=1500))
+    stats = pet.decayed(NOW)
+    # 1500s: hunger 2 steps of 600 (+300 carry), energy 1 of 900 (+600), happiness 1 of 1200 (+300)
+    assert stats == {"hunger": (48, 300.0), "energy": (49, 600.0), "happiness": (49, 300.0)}
+    assert (pet.hunger, pet.hunger_carry_sec, pet.last_tick_at) == (50, 0.0, NOW - timedelta(seconds=1500))
+    assert pet.status_dict(NOW)["hunger"] == 48
+
+def test_split_ticks_equal_one_tick(app):
+    rng = random.Random(21)
+    start = NOW - timedelta(hours=6)
+    for _ in range(50):
+        pet = make_pet(hunger=rng.randint(0, 100), energy=rng.randint(0, 100), happiness=rng.randint(0, 100),
+                       last_tick_at=start)
+        once, split = copy_pet(pet), copy_pet(pet)
+        end = start + timedelta(seconds=rng.randint(0, 20000))
+        once.tick(end)
+        for _ in range(rng.randint(1, 6)):
+            split.tick(split.last_tick_at + (end - split.last_tick_at) * rng.random())
+        split.tick(end)
+        # Short ticks lose nothing: carries accumulate toward the next point
+        assert_same_state(split, once)
+
+def test_tick_never_moves_backwards(app):
+    pet = make_pet(hunger=50, last_tick_at=NOW)
+    assert pet.tick(NOW - timedelta(hours=1)) is False
+    assert (pet.hunger, pet.last_tick_at) == (50, NOW)
+    assert pet.decayed(NOW - timedelta(hours=1))["hunger"] == (50, 0.0)
+
+def test_sweeper_matches_tick(app):
+    rng = random.Random(22)
+    pets = [make_pet(user_id=i,
+                     hunger=rng.randint(0, 100), energy=rng.randint(0, 100), happiness=rng.randint(0, 100),
+                     hunger_carry_sec=rng.randint(0, 599) + 0.5, energy_carry_sec=rng.randint(0, 899) + 0.5,
+                     happiness_carry_sec=rng.randint(0, 1199) + 0.5,
+                     last_tick_at=NOW - timedelta(seconds=rng.randint(0, 20000) + 0.25))
+            for i in range(40)]
+    expected = {}
+    for pet in pets:
+        expected[pet.id] = copy_pet(pet)
+        expected[pet.id].tick(NOW)
+
+    result = DecaySweeper(chunk_size=7).run_once(NOW)
+    assert result["chunks"] == 6
+
+    db.session.expire_all()
+    updated = 0
+    for pet_id, want in expected.items():
+        got = db.session.get(Pet, pet_id)
+        if got.last_tick_at == NOW:
+            updated += 1
+            assert_same_state(got, want)
+        else:
+            # Skipped rows had nothing to lose; reads still decay them the same way
+            assert {s: v for s, (v, _) in got.decayed(NOW).items()} == \
+                   {s: getattr(want, s) for s in ("hunger", "energy", "happiness")}
+    assert result["updated"] == updated > 0
+
+def test_sweeper_skips_idle_and_future_rows(app):
+    idle = make_pet(hunger=0, energy=0, happiness=0, last_tick_at=NOW - timedelta(days=1))
+    ahead = make_pet(hunger=50, last_tick_at=NOW + timedelta(hours=1))
+    due = make_pet(hunger=50, last_tick_at=NOW - timedelta(hours=1))
+
+    sweeper = DecaySweeper()
+    assert sweeper.run_once(NOW)["updated"] == 1
+    db.session.expire_all()
+    assert db.session.get(Pet, idle.id).last_tick_at == NOW - timedelta(days=1)
+    assert db.session.get(Pet, ahead.id).last_tick_at == NOW + timedelta(hours=1)
+    assert db.session.get(Pet, due.id).hunger == 44
+
+    # A second pass at the same instant has nothing left to write
+    assert sweeper.run_once(NOW)["updated"] == 0
+    assert sweeper.stats()["totals"] == {"runs": 2, "chunks": 2, "updated": 1}
+
+def test_sweep_endpoints_require_the_operator_token(app, client):
+    make_pet(hunger=50, last_tick_at=NOW)
+    for method, path in (("post", "/api/v1/pets/decay/sweep"), ("get", "/api/v1/pets/decay/stats")):
+        call = getattr(client, method)
+        assert call(path).status_code == 403
+        assert call(path, headers={"X-Ops-Token": "wrong"}).status_code == 403
+        assert call(path, headers={"X-Ops-Token": "test-ops"}).status_code == 200
+
+    app.config["PET_OPS_TOKEN"] = None
+    resp = client.post("/api/v1/pets/decay/sweep", headers={"X-Ops-Token": "test-ops"})
+    assert resp.status_code == 403
+    assert resp.get_json()["message"] == "operator endpoints are disabled"
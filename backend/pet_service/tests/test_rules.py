@@ -0,0 +1,94 @@
+# tests/test_rules.py
+import random
+
+import pytest
+from flask import current_app
+from app import create_app
+from models import Pet
+import rules
+
+def _legacy_xp_to_next(pet):
+    base = current_app.config.get('PET_LEVEL_XP_BASE', 100)
+    growth = current_app.config.get('PET_LEVEL_XP_GROWTH', 1.5)
+    return max(int(round(base * (growth ** (pet.level - 1)))), 1)
+
+def _legacy_add_xp(pet, points):
+    """Pet.add_xp before PetRules: recompute the threshold and loop per level."""
+    max_level = current_app.config.get('PET_MAX_LEVEL', 9)
+    if int(pet.level) >= int(max_level):
+        pet.level, pet.xp = int(max_level), 0
+        return
+    pet.xp += points
+    while pet.xp >= _legacy_xp_to_next(pet):
+        if int(pet.level) >= int(max_level):
+            pet.level, pet.xp = int(max_level), 0
+            break
+        pet.xp -= _legacy_xp_to_next(pet)
+        pet.level += 1
+        pet.happiness = min(pet.happiness + 5, 100)
+        pet.energy = min(pet.energy + 5, 100)
+
+@pytest.mark.parametrize("changes", [
+    {},
+    {"PET_LEVEL_XP_BASE": 7, "PET_LEVEL_XP_GROWTH": 1.2, "PET_MAX_LEVEL": 4},
+    {"PET_LEVEL_XP_BASE": 50, "PET_LEVEL_XP_GROWTH": 2.0, "PET_MAX_LEVEL": 12},
+    {"PET_LEVEL_XP_BASE": 1, "PET_LEVEL_XP_GROWTH": 0.5, "PET_MAX_LEVEL": 6},
+])
+def test_add_xp_matches_the_old_loop(app, changes):
+    r = rules.reload(app, changes)
+    rng = random.Random(23)
+    for _ in range(2000):
+        level = rng.randint(0, r.max_level + 1)
+        start = dict(level=level, xp=rng.randint(0, r.needed(level) - 1),
+                     happiness=rng.randint(0, 100), energy=rng.randint(0, 100))
+        points = rng.choice([0, 1, rng.randint(1, 50), rng.randint(1, r.xp_total[-1] * 2)])
+        new, old = Pet(**start), Pet(**start)
+        new.add_xp(points)
+        if points:
+            _legacy_add_xp(old, points)
+        assert (new.level, new.xp, new.happiness, new.energy) == \
+               (old.level, old.xp, old.happiness, old.energy), (start, points)
+        assert r.needed(new.level) == _legacy_xp_to_next(new)
+
+def test_level_for_walks_the_cumulative_table(app):
+    r = rules.current()
+    assert r.xp_to_next[:4] == (67, 100, 150, 225)
+    assert r.level_for(0, 66) == (0, 66)
+    assert r.level_for(0, 67) == (1, 0)
+    assert r.level_for(1, 100 + 150 + 1) == (3, 1)
+    # A full bar at max level resets XP
+    assert r.level_for(r.max_level, r.xp_to_next[r.max_level]) == (r.max_level, 0)
+
+def test_reload_rejects_unknown_keys_and_keeps_rules(app):
+    before = rules.current()
+    with pytest.raises(ValueError):
+        rules.reload(app, {"PET_MAX_LEVL": 3})
+    assert rules.current() is before
+    assert rules.reload(app, {"PET_MAX_LEVEL": 3}).max_level == 3
+    assert app.config["PET_MAX_LEVEL"] == 3
+
+OPS = {"X-Ops-Token": "test-ops"}
+
+def test_reload_requires_the_operator_token(app, client):
+    assert client.post("/api/v1/pets/rules/reload", json={"PET_MAX_LEVEL": 3}).status_code == 403
+    assert rules.current().max_level == 9
+    resp = client.post("/api/v1/pets/rules/reload", json={"PET_MAX_LEVL": 3}, headers=OPS)
+    assert resp.status_code == 400
+
+def test_reload_reaches_every_worker(app, client):
+    other = create_app()  # a second worker on the same database
+    other.config["PET_RULES_REFRESH_SEC"] = 0
+    with other.app_context():
+        assert rules.current().max_level == 9
+
+    resp = client.post("/api/v1/pets/rules/reload", json={"PET_MAX_LEVEL": 4}, headers=OPS)
+    assert resp.status_code == 200 and resp.get_json()["max_level"] == 4
+    with other.app_context():
+        assert rules.current().max_level == 4
+        assert other.config["PET_MAX_LEVEL"] == 4
+
+    # null drops the override everywhere, back to the environment's value
+    client.post("/api/v1/pets/rules/reload", json={"PET_MAX_LEVEL": None}, headers=OPS)
+    assert rules.current().max_level == 9
+    with other.app_context():
+        assert rules.current().max_level == 9
@@ -1,16 +1,24 @@
 import os
 from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
+from flask_migrate import Migrate
 from config import Config
+from shared.json_provider import FastJSONProvider
 from models import db
+from search import detect_search_schema
 
 BASE_DIR = os.path.dirname(__file__)
 
+migrate = Migrate()
+
 def create_app():
     app = Flask(__name__)  
+    app.json = FastJSONProvider(app)
     CORS(app)
     app.config.from_object(Config)
     db.init_app(app)
+    # Schema changes for existing databases: `flask db upgrade` (migrations/)
+    migrate.init_app(app, db, directory=os.path.join(BASE_DIR, 'migrations'))
 
     from routes import bp as routes_bp
     app.register_blueprint(routes_bp)
@@ -18,6 +26,7 @@ def create_app():
     with app.app_context():
         #db.drop_all()
         db.create_all()
+        detect_search_schema()
     
     @app.route("/")
     def index():
@@ -25,7 +34,26 @@ def create_app():
 
     return app
 
+def start_background_jobs(app):
+    """
+    Start the outbox relay and the recurring runner (each if enabled).
+
+    Called by the server entrypoint, not create_app(): CLI commands such as
+    `flask db upgrade` build the app too, and the jobs must not run against
+    a schema that is still being migrated.
+    """
+    # Publish outbox events in the background
+    if app.config['OUTBOX_RELAY_ENABLED']:
+        from outbox import relay
+        relay.start(app)
+
+    # Roll recurring series forward (safe to run on every instance)
+    if app.config['TASK_RECURRING_RUNNER_ENABLED']:
+        from recurrence import runner
+        runner.start(app)
+
 if __name__ == "__main__":
     app = create_app()
+    start_background_jobs(app)
     port = int(os.getenv('PORT', 5003))
     app.run(host="0.0.0.0", port=port, debug=app.config['DEBUG'])
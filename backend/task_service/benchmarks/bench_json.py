@@ -0,0 +1,104 @@
+"""
+Cost of JSON-encoding GET /tasks?limit=100.
+
+Seeds 100 tasks for one user and times the full request and the
+serialize + encode step alone: Flask's default provider with isoformat()
+per datetime field (as before), then shared.json_provider forced onto the
+stdlib encoder, then with orjson.
+
+    python benchmarks/bench_json.py --runs 200
+
+The benchmark drops and recreates the tables: point it at a scratch database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TASK_DATABASE_URL", "sqlite:///bench_json.db")
+os.environ["OUTBOX_RELAY_ENABLED"] = "False"
+os.environ["TASK_RECURRING_RUNNER_ENABLED"] = "False"
+os.environ["DEBUG"] = "False"
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from models import db, Task
+from shared import json_provider
+
+URL = "/api/v1/tasks?limit=100&total=none&cursor="
+HEADERS = {"X-User-Id": "bench"}
+WORDS = "laundry groceries homework dishes garden report invoice dentist meeting gym".split()
+
+
+def seed(n=100):
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    db.session.execute(Task.__table__.insert(), [{
+        "user_id": "bench",
+        "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)} #{i}",
+        "description": " ".join(rng.choice(WORDS) for _ in range(30)),
+        "status": rng.choice(["todo", "in_progress", "done"]),
+        "priority": rng.choice(["low", "medium", "high"]),
+        "due_at": now + timedelta(hours=i),
+        "tags": rng.sample(WORDS, 3),
+        "points": rng.randint(1, 10),
+        "created_at": now,
+        "updated_at": now,
+        "completed_at": now,
+    } for i in range(n)])
+    db.session.commit()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    ctx = app.app_context()
+    ctx.push()
+    seed()
+    tasks = Task.query.filter_by(user_id="bench").all()
+    size = len(client.get(URL, headers=HEADERS).data)
+    print(f"GET /tasks?limit=100: {size} bytes, orjson available: {json_provider.orjson is not None}")
+    print(f"{'encoder':>16} | {'request median ms':>17} | {'encode median ms':>16}")
+
+    fast_provider = app.json
+    legacy = DefaultJSONProvider(app)
+    iso = lambda d: {k: v.isoformat() if isinstance(v, datetime) else v for k, v in d.items()}
+    app.json = legacy
+    request_ms = timed(lambda: client.get(URL, headers=HEADERS), args.runs)
+    encode_ms = timed(lambda: legacy.response({"items": [iso(t.to_dict()) for t in tasks]}), args.runs)
+    print(f"{'flask+isoformat':>16} | {request_ms:>17.3f} | {encode_ms:>16.3f}")
+    app.json = fast_provider
+
+    fast = json_provider.orjson
+    for name, encoder in (("stdlib", None), ("orjson", fast)):
+        if name == "orjson" and fast is None:
+            continue
+        json_provider.orjson = encoder
+        request_ms = timed(lambda: client.get(URL, headers=HEADERS), args.runs)
+        encode_ms = timed(lambda: app.json.response({"items": [t.to_dict() for t in tasks]}), args.runs)
+        print(f"{name:>16} | {request_ms:>17.3f} | {encode_ms:>16.3f}")
+    json_provider.orjson = fast
+    ctx.pop()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,4 +9,41 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = os.getenv('DEBUG', 'False') == 'True'
     API_GATEWAY_URL = os.getenv('API_GATEWAY_URL')
-    PET_SERVICE_URL = os.getenv('PET_SERVICE_URL')
\ No newline at end of file
+    PET_SERVICE_URL = os.getenv('PET_SERVICE_URL')
+    # Shared secret for operator endpoints (X-Ops-Token); unset disables them
+    TASK_OPS_TOKEN = os.getenv('TASK_OPS_TOKEN')
+
+    # Transactional outbox relay
+    OUTBOX_RELAY_ENABLED = os.getenv('OUTBOX_RELAY_ENABLED', 'True') == 'True'
+    OUTBOX_RELAY_INTERVAL_SEC = float(os.getenv('OUTBOX_RELAY_INTERVAL_SEC', '1'))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+    OUTBOX_MAX_BACKOFF_SEC = int(os.getenv('OUTBOX_MAX_BACKOFF_SEC', '300'))
+    OUTBOX_LEASE_SEC = int(os.getenv('OUTBOX_LEASE_SEC', '600'))   # claimed rows are retried after this if never recorded
+
+    # POST /tasks/bulk: most tasks (ids or items) per request
+    TASK_BULK_MAX = int(os.getenv('TASK_BULK_MAX', '500'))
+
+    # Recurring tasks: occurrences due within the horizon are stored as rows,
+    # later ones are computed on read (GET /tasks/occurrences, at most MAX_DAYS)
+    TASK_RECURRENCE_HORIZON_DAYS = int(os.getenv('TASK_RECURRENCE_HORIZON_DAYS', '7'))
+    TASK_OCCURRENCES_MAX_DAYS = int(os.getenv('TASK_OCCURRENCES_MAX_DAYS', '366'))
+    # Background runner that keeps stored occurrences rolled forward
+    TASK_RECURRING_RUNNER_ENABLED = os.getenv('TASK_RECURRING_RUNNER_ENABLED', 'True') == 'True'
+    TASK_RECURRING_INTERVAL_SEC = float(os.getenv('TASK_RECURRING_INTERVAL_SEC', '60'))
+    TASK_RECURRING_CHUNK_SIZE = int(os.getenv('TASK_RECURRING_CHUNK_SIZE', '200'))
+
+    # GET /tasks/stats: serve the grouped facets from per-user counters
+    # (task_counters) instead of aggregating the tasks table on each call.
+    # Counters older than the TTL are rebuilt, which bounds any drift.
+    TASK_STATS_COUNTERS_ENABLED = os.getenv('TASK_STATS_COUNTERS_ENABLED', 'False') == 'True'
+    TASK_STATS_COUNTERS_TTL_SEC = float(os.getenv('TASK_STATS_COUNTERS_TTL_SEC', '3600'))
+
+    # GET /tasks/changes: tombstones of removed tasks are kept this long;
+    # older cursors get 410 and the client syncs again from scratch
+    TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv('TASK_TOMBSTONE_RETENTION_DAYS', '30'))
+
+    # GET /tasks totals (?total=cached)
+    TASK_COUNT_CACHE_TTL_SEC = float(os.getenv('TASK_COUNT_CACHE_TTL_SEC', '30'))
+
+    # ?query= full-text search (Postgres text search configuration)
+    TASK_SEARCH_LANGUAGE = os.getenv('TASK_SEARCH_LANGUAGE', 'english')
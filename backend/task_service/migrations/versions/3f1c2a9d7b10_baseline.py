@@ -0,0 +1,84 @@
+"""baseline: tasks, tags and outbox as created by db.create_all()
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # Databases created before migrations existed already have these tables
+    # (from db.create_all()); only create what is missing.
+    json_type = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+    if not _has_table('tasks'):
+        op.create_table(
+            'tasks',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.String(length=64), nullable=False),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('priority', sa.String(length=16), nullable=True),
+            sa.Column('due_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('tags', json_type, nullable=True),
+            sa.Column('points', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_event_emitted_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('repeat_every', sa.String(length=16), nullable=True),
+            sa.Column('next_occurrence_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('is_recurring_template', sa.Boolean(), nullable=True),
+            sa.Column('repeat_until', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_tasks_user_id', 'tasks', ['user_id'])
+
+    if not _has_table('tags'):
+        op.create_table(
+            'tags',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=64), nullable=False, unique=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        )
+
+    if not _has_table('outbox'):
+        op.create_table(
+            'outbox',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('destination', sa.String(length=16), nullable=False),
+            sa.Column('event_type', sa.String(length=64), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=True),
+            sa.Column('idempotency_key', sa.String(length=128), nullable=True, unique=True),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+        )
+        op.create_index('ix_outbox_task_id', 'outbox', ['task_id'])
+        op.create_index('ix_outbox_pending', 'outbox', ['available_at', 'id'],
+                        postgresql_where=sa.text('delivered_at IS NULL'))
+
+
+def downgrade():
+    op.drop_table('outbox')
+    op.drop_table('tags')
+    op.drop_table('tasks')
@@ -0,0 +1,43 @@
+"""descending partial indexes for -priority / -title task cursors (Postgres only)
+
+Revision ID: 5e8b1f3a7c92
+Revises: d41a7c3e9b58
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1f3a7c92'
+down_revision = 'd41a7c3e9b58'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+
+# Same as d41a7c3e9b58 for the other two descending cursor sorts, which
+# order `key DESC NULLS LAST, id DESC` and were still sorted on Postgres.
+DESC_INDEXES = [
+    ('ix_tasks_active_user_priority_desc', 'priority'),
+    ('ix_tasks_active_user_title_desc', 'title'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite has no NULLS LAST in index definitions and sorts NULLs first anyway
+        return
+    with op.get_context().autocommit_block():
+        for name, column in DESC_INDEXES:
+            op.create_index(name, 'tasks', ['user_id', sa.text(f'{column} DESC NULLS LAST'), sa.text('id DESC')],
+                            if_not_exists=True, postgresql_where=ACTIVE, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _ in DESC_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,67 @@
+"""partial composite indexes for task listings and a GIN index on tags
+
+Revision ID: 8b4e6d0c5a21
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d0c5a21'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+
+# (name, columns): every list request filters user_id + deleted_at IS NULL,
+# then narrows by status/priority or sorts by one of these keys with id last
+ACTIVE_INDEXES = [
+    ('ix_tasks_active_user_id', ['user_id', 'id']),
+    ('ix_tasks_active_user_due_at', ['user_id', 'due_at', 'id']),
+    ('ix_tasks_active_user_created_at', ['user_id', 'created_at', 'id']),
+    ('ix_tasks_active_user_priority', ['user_id', 'priority', 'id']),
+    ('ix_tasks_active_user_title', ['user_id', 'title', 'id']),
+    ('ix_tasks_active_user_status', ['user_id', 'status', 'id']),
+]
+
+# Non-partial keyset indexes from before this migration (create_all only)
+OLD_INDEXES = [
+    ('ix_tasks_user_id_id', ['user_id', 'id']),
+    ('ix_tasks_user_due_at_id', ['user_id', 'due_at', 'id']),
+    ('ix_tasks_user_created_at_id', ['user_id', 'created_at', 'id']),
+    ('ix_tasks_user_priority_id', ['user_id', 'priority', 'id']),
+    ('ix_tasks_user_title_id', ['user_id', 'title', 'id']),
+]
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    # On Postgres build without locking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, _ in OLD_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=postgres)
+        for name, columns in ACTIVE_INDEXES:
+            op.create_index(name, 'tasks', columns, if_not_exists=True,
+                            postgresql_where=ACTIVE, sqlite_where=ACTIVE,
+                            postgresql_concurrently=postgres)
+        if postgres:
+            # jsonb_path_ops: smaller than the default opclass and serves `tags @> '["x"]'`
+            op.create_index('ix_tasks_tags_gin', 'tasks', ['tags'], if_not_exists=True,
+                            postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'},
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        if postgres:
+            op.drop_index('ix_tasks_tags_gin', table_name='tasks', if_exists=True, postgresql_concurrently=True)
+        # Put back the indexes upgrade() dropped before removing their replacements
+        for name, columns in OLD_INDEXES:
+            op.create_index(name, 'tasks', columns, if_not_exists=True, postgresql_concurrently=postgres)
+        for name, _ in ACTIVE_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=postgres)
@@ -0,0 +1,62 @@
+"""full-text and trigram search on tasks (Postgres only)
+
+Revision ID: b6e2a0d94c17
+Revises: f82c4a1e6d57
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+import os
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2a0d94c17'
+down_revision = 'f82c4a1e6d57'
+branch_labels = None
+depends_on = None
+
+# Text search configuration baked into the generated column; GET /tasks?query=
+# builds its tsquery with TASK_SEARCH_LANGUAGE, so keep the two the same
+LANGUAGE = os.getenv('TASK_SEARCH_LANGUAGE', 'english')
+
+TRIGRAM_INDEXES = [
+    ('ix_tasks_title_trgm', 'title'),
+    ('ix_tasks_description_trgm', 'description'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite (tests) keeps the plain LIKE search
+        return
+    if not LANGUAGE.isidentifier():
+        raise ValueError(f"TASK_SEARCH_LANGUAGE must be a text search configuration name, got {LANGUAGE!r}")
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"""
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{LANGUAGE}'::regconfig, coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{LANGUAGE}'::regconfig, coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    # Build without locking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_search_vector', 'tasks', ['search_vector'], if_not_exists=True,
+                        postgresql_using='gin', postgresql_concurrently=True)
+        for name, column in TRIGRAM_INDEXES:
+            op.create_index(name, 'tasks', [column], if_not_exists=True,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', if_exists=True, postgresql_concurrently=True)
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    # pg_trgm stays installed: other schemas may use it
@@ -0,0 +1,43 @@
+"""recurring series: recurrence_parent_id and occurrence_at on tasks
+
+Revision ID: c27d9e4f1a36
+Revises: 8b4e6d0c5a21
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27d9e4f1a36'
+down_revision = '8b4e6d0c5a21'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    with op.batch_alter_table('tasks') as batch:
+        if not _has_column('tasks', 'recurrence_parent_id'):
+            batch.add_column(sa.Column('recurrence_parent_id', sa.Integer(), nullable=True))
+            batch.create_foreign_key('fk_tasks_recurrence_parent_id', 'tasks', ['recurrence_parent_id'], ['id'])
+        if not _has_column('tasks', 'occurrence_at'):
+            batch.add_column(sa.Column('occurrence_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_tasks_occurrence', 'tasks', ['recurrence_parent_id', 'occurrence_at'],
+                    unique=True, if_not_exists=True)
+
+    # Existing series (repeat_every set) are anchored at their due date
+    op.execute("UPDATE tasks SET occurrence_at = due_at, is_recurring_template = TRUE "
+               "WHERE repeat_every IS NOT NULL AND occurrence_at IS NULL")
+
+
+def downgrade():
+    op.drop_index('ix_tasks_occurrence', table_name='tasks', if_exists=True)
+    with op.batch_alter_table('tasks') as batch:
+        batch.drop_constraint('fk_tasks_recurrence_parent_id', type_='foreignkey')
+        batch.drop_column('occurrence_at')
+        batch.drop_column('recurrence_parent_id')
@@ -0,0 +1,44 @@
+"""descending partial indexes for newest-first task cursors (Postgres only)
+
+Revision ID: d41a7c3e9b58
+Revises: b6e2a0d94c17
+Create Date: 2026-10-17 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c3e9b58'
+down_revision = 'b6e2a0d94c17'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+
+# -due_at / -created_at cursors order `key DESC NULLS LAST, id DESC`. Postgres
+# scans the ascending (user_id, key, id) indexes backwards as DESC NULLS FIRST,
+# which does not match, so those pages were sorted instead of read in order.
+DESC_INDEXES = [
+    ('ix_tasks_active_user_due_at_desc', 'due_at'),
+    ('ix_tasks_active_user_created_at_desc', 'created_at'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite has no NULLS LAST in index definitions and sorts NULLs first anyway
+        return
+    with op.get_context().autocommit_block():
+        for name, column in DESC_INDEXES:
+            op.create_index(name, 'tasks', ['user_id', sa.text(f'{column} DESC NULLS LAST'), sa.text('id DESC')],
+                            if_not_exists=True, postgresql_where=ACTIVE, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _ in DESC_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
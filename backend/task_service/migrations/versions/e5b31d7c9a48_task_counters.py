@@ -0,0 +1,35 @@
+"""per-user task counters for GET /tasks/stats
+
+Revision ID: e5b31d7c9a48
+Revises: c27d9e4f1a36
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b31d7c9a48'
+down_revision = 'c27d9e4f1a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled on the first GET /tasks/stats per user (with TASK_STATS_COUNTERS_ENABLED)
+    op.create_table(
+        'task_counters',
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('facet', sa.String(length=16), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('sub', sa.String(length=64), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'facet', 'key', 'sub'),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('task_counters', if_exists=True)
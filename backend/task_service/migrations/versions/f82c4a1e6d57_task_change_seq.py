@@ -0,0 +1,57 @@
+"""delta sync: change_seq on tasks, per-user sequence and tombstones
+
+Revision ID: f82c4a1e6d57
+Revises: e5b31d7c9a48
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f82c4a1e6d57'
+down_revision = 'e5b31d7c9a48'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # Existing rows get 0: a sync without a cursor returns them all anyway
+    if not _has_column('tasks', 'change_seq'):
+        with op.batch_alter_table('tasks') as batch:
+            batch.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_index('ix_tasks_user_change_seq', 'tasks', ['user_id', 'change_seq', 'id'], if_not_exists=True)
+
+    op.create_table(
+        'task_sync',
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('removed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_task_tombstones_user_change_seq', 'task_tombstones',
+                    ['user_id', 'change_seq', 'task_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_task_tombstones_user_change_seq', table_name='task_tombstones', if_exists=True)
+    op.drop_table('task_tombstones', if_exists=True)
+    op.drop_table('task_sync', if_exists=True)
+    op.drop_index('ix_tasks_user_change_seq', table_name='tasks', if_exists=True)
+    with op.batch_alter_table('tasks') as batch:
+        batch.drop_column('change_seq')
@@ -1,10 +1,21 @@
 from datetime import datetime, timezone
-from sqlalchemy import func
+from sqlalchemy import func, text
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.dialects.postgresql import JSONB
 
 db = SQLAlchemy()
 
+# Predicate of the partial indexes: the rows every default task listing reads
+ACTIVE = text("deleted_at IS NULL")
+
+# Fields of Task.to_dict(), in output order
+TASK_FIELDS = (
+    "id", "user_id", "title", "description", "status", "priority", "due_at", "tags", "points",
+    "created_at", "updated_at", "deleted_at", "completed_at",
+    "repeat_every", "next_occurrence_at", "is_recurring_template", "repeat_until",
+    "recurrence_parent_id", "occurrence_at",
+)
+
 class Task(db.Model):
     __tablename__ = "tasks"
 
@@ -29,30 +40,56 @@ class Task(db.Model):
     next_occurrence_at = db.Column(db.DateTime(timezone=True), nullable=True)
     is_recurring_template = db.Column(db.Boolean, default=False)
     repeat_until = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Recurring series: the head task holds the rule (repeat_every, repeat_until,
+    # occurrence_at as anchor); its stored occurrences point back to it
+    recurrence_parent_id = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=True)
+    occurrence_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # GET /tasks/changes: the user's change sequence value at the last write (sync.py)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0)
 
+    # GET /tasks: one partial index per sort key (also the keyset cursor keys),
+    # covering only active tasks, plus status filters and JSONB tag containment.
+    # Existing databases get these from migrations/versions.
+    __table_args__ = (
+        db.Index("ix_tasks_active_user_id", "user_id", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        db.Index("ix_tasks_active_user_due_at", "user_id", "due_at", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        db.Index("ix_tasks_active_user_created_at", "user_id", "created_at", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        db.Index("ix_tasks_active_user_priority", "user_id", "priority", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        db.Index("ix_tasks_active_user_title", "user_id", "title", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        db.Index("ix_tasks_active_user_status", "user_id", "status", "id",
+                 postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        # Postgres reads the indexes above backwards as DESC NULLS FIRST; the
+        # descending cursors (-due_at, -created_at, -priority, -title) order DESC NULLS LAST
+        db.Index("ix_tasks_active_user_due_at_desc", user_id, due_at.desc().nulls_last(), id.desc(),
+                 postgresql_where=ACTIVE).ddl_if(dialect="postgresql"),
+        db.Index("ix_tasks_active_user_created_at_desc", user_id, created_at.desc().nulls_last(), id.desc(),
+                 postgresql_where=ACTIVE).ddl_if(dialect="postgresql"),
+        db.Index("ix_tasks_active_user_priority_desc", user_id, priority.desc().nulls_last(), id.desc(),
+                 postgresql_where=ACTIVE).ddl_if(dialect="postgresql"),
+        db.Index("ix_tasks_active_user_title_desc", user_id, title.desc().nulls_last(), id.desc(),
+                 postgresql_where=ACTIVE).ddl_if(dialect="postgresql"),
+        db.Index("ix_tasks_tags_gin", "tags", postgresql_using="gin",
+                 postgresql_ops={"tags": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        # One stored row per occurrence of a series
+        db.Index("ix_tasks_occurrence", "recurrence_parent_id", "occurrence_at", unique=True),
+        # Delta sync: a user's tasks changed after a cursor (soft-deleted ones included)
+        db.Index("ix_tasks_user_change_seq", "user_id", "change_seq", "id"),
+    )
 
-    def to_dict(self):
-        iso = lambda dt: dt.isoformat() if dt else None
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "title": self.title,
-            "description": self.description,
-            "status": self.status,
-            "priority": self.priority,
-            "due_at": iso(self.due_at),
-            "tags": self.tags,
-            "points": self.points,
-            "created_at": iso(self.created_at),
-            "updated_at": iso(self.updated_at),
-            "deleted_at": iso(self.deleted_at),
-            'completed_at': iso(self.completed_at),
-
-            "repeat_every": self.repeat_every,
-            "next_occurrence_at": iso(self.next_occurrence_at),
-            "is_recurring_template": self.is_recurring_template,
-            "repeat_until": iso(self.repeat_until),
-        }
+    def to_dict(self, fields=None):
+        """
+        Serialize the task. `fields` (from ?fields=) limits the output to
+        those keys, and only they are read, so columns left out of a
+        load_only() query are never lazy-loaded. Datetimes are left as
+        they are; the app's JSON provider writes them as ISO 8601.
+        """
+        fields = TASK_FIELDS if fields is None else fields
+        return {f: getattr(self, f) for f in fields}
 
     def __repr__(self):
         return f"<Task id={self.id} user_id={self.user_id} title={self.title!r}>"
@@ -63,3 +100,78 @@ class Tag(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), unique=True, nullable=False)  
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+
+class Outbox(db.Model):
+    """
+    Events waiting to be published, written in the same transaction as the
+    task change that caused them. The relay in outbox.py delivers them.
+    """
+    __tablename__ = "outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    destination = db.Column(db.String(16), nullable=False)              # pet|gateway
+    event_type = db.Column(db.String(64), nullable=False)
+    task_id = db.Column(db.Integer, index=True, nullable=True)
+    idempotency_key = db.Column(db.String(128), unique=True, nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    available_at = db.Column(db.DateTime(timezone=True), nullable=False)  # next delivery attempt
+    delivered_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_outbox_pending", "available_at", "id", postgresql_where=db.text("delivered_at IS NULL")),
+    )
+
+    def __repr__(self):
+        return f"<Outbox id={self.id} {self.destination}:{self.event_type} task_id={self.task_id}>"
+
+
+class TaskCounter(db.Model):
+    """
+    Per-user task counts for GET /tasks/stats, kept up to date by the flush
+    hook in stats.py: active tasks per (status, priority) and per (tag, status).
+    A "_ready" row marks a user's counters as complete; without it they are
+    rebuilt from the tasks table on the next read.
+    """
+    __tablename__ = "task_counters"
+
+    user_id = db.Column(db.String(64), primary_key=True)
+    facet = db.Column(db.String(16), primary_key=True)   # status_priority|tag|_ready
+    key = db.Column(db.String(64), primary_key=True)     # status, or tag
+    sub = db.Column(db.String(64), primary_key=True)     # priority, or status
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<TaskCounter {self.user_id} {self.facet}:{self.key}/{self.sub}={self.count}>"
+
+
+class TaskSync(db.Model):
+    """
+    Per-user change sequence. Every write to a user's tasks bumps `seq`
+    (holding this row's lock until commit) and stamps it on the tasks it
+    touched, so a user's changes commit in sequence order.
+    """
+    __tablename__ = "task_sync"
+
+    user_id = db.Column(db.String(64), primary_key=True)
+    seq = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class TaskTombstone(db.Model):
+    """A task row that was removed outright, kept for GET /tasks/changes."""
+    __tablename__ = "task_tombstones"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String(64), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    removed_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_task_tombstones_user_change_seq", "user_id", "change_seq", "task_id"),
+    )
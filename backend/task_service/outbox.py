@@ -0,0 +1,215 @@
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone, timedelta
+
+import requests
+from config import Config
+from models import db, Task, Outbox
+from shared.event_client import EventClient
+
+PET_EVENTS_URL = f"{Config.API_GATEWAY_URL}/v1/pet-service/events"
+
+event_client = EventClient()
+
+
+def enqueue(destination, event_type, payload, task_id=None, idempotency_key=None):
+    """
+    Add an event to the outbox in the current transaction. It is published
+    only if the transaction commits. Returns False (and adds nothing) when
+    an event with the same idempotency_key is already in the outbox.
+    """
+    return enqueue_many(destination, [(event_type, payload, task_id, idempotency_key)]) == 1
+
+
+def enqueue_many(destination, events, batch_size=500):
+    """
+    enqueue() for many (event_type, payload, task_id, idempotency_key) tuples,
+    as multi-row INSERTs. Returns how many were added.
+    """
+    now = datetime.now(timezone.utc)
+    seen = set()
+    rows = []
+    for event_type, payload, task_id, key in events:
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        rows.append({
+            "destination": destination,
+            "event_type": event_type,
+            "task_id": task_id,
+            "idempotency_key": key,
+            "payload": payload,
+            "available_at": now,
+            "attempts": 0,
+        })
+    added = 0
+    for i in range(0, len(rows), batch_size):
+        added += _insert_ignoring_queued(rows[i:i + batch_size])
+    return added
+
+
+def _insert_ignoring_queued(rows):
+    # Keys already in the outbox hit the unique idempotency_key index and are
+    # skipped. A concurrent transaction queuing the same key waits for the
+    # first one rather than failing its commit (a SELECT first would race).
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(Outbox).values(rows).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    return db.session.execute(stmt).rowcount
+
+
+# A claimed outbox row, detached from the session while it is being sent
+Claimed = namedtuple("Claimed", ["id", "destination", "event_type", "task_id", "payload"])
+
+
+class OutboxRelay:
+    """
+    Publishes pending outbox rows in batches.
+
+    Each batch takes three steps so no transaction stays open during HTTP:
+
+    1. Claim: SELECT ... FOR UPDATE SKIP LOCKED picks due rows, pushes their
+       available_at out by the lease and commits. Several relays (one per
+       worker process) share the work without sending a row twice.
+    2. Send, with no transaction or row locks held.
+    3. Record: a short transaction marks delivered rows (and, for
+       TASK_COMPLETED, the task's completed_event_emitted_at) and backs off
+       failed ones exponentially.
+
+    A relay that dies after claiming leaves its rows to be retried once the
+    lease runs out.
+
+    Usage:
+        from outbox import relay
+
+        relay.start(app)      # background thread
+        relay.wake()          # after committing new outbox rows
+        relay.run_once()      # one batch, inside an app context
+    """
+
+    def __init__(self, batch_size=100, interval=1.0, max_backoff=300, lease=600):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self, app):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, args=(app,), daemon=True, name="outbox-relay")
+            self.thread.start()
+            print("✅ Outbox relay started")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def run_once(self):
+        """Deliver one batch of due rows. Returns counts of delivered and failed rows."""
+        rows = self._claim()
+        if not rows:
+            return {"delivered": 0, "failed": 0}
+
+        results = {}
+        results.update(self._send_to_pet([r for r in rows if r.destination == "pet"]))
+        results.update(self._send_to_gateway([r for r in rows if r.destination == "gateway"]))
+
+        failed = self._record(results)
+        return {"delivered": len(rows) - failed, "failed": failed}
+
+    def _claim(self):
+        """Lease a batch of due rows and commit. Returns them as Claimed tuples."""
+        now = datetime.now(timezone.utc)
+        rows = (
+            Outbox.query
+            .filter(Outbox.delivered_at.is_(None), Outbox.available_at <= now)
+            .order_by(Outbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed = [Claimed(r.id, r.destination, r.event_type, r.task_id, r.payload) for r in rows]
+        leased_until = now + timedelta(seconds=self.lease)
+        for row in rows:
+            row.available_at = leased_until
+        db.session.commit()
+        return claimed
+
+    def _record(self, results):
+        """Store the outcome of each sent row ({id: error or None}). Returns how many failed."""
+        now = datetime.now(timezone.utc)
+        rows = Outbox.query.filter(Outbox.id.in_(list(results))).all()
+        completed_task_ids = []
+        failed = 0
+        for row in rows:
+            row.attempts += 1
+            error = results[row.id]
+            if error is None:
+                row.delivered_at = now
+                row.last_error = None
+                if row.event_type == "TASK_COMPLETED" and row.task_id is not None:
+                    completed_task_ids.append(row.task_id)
+            else:
+                failed += 1
+                row.last_error = error
+                row.available_at = now + timedelta(seconds=min(2 ** row.attempts, self.max_backoff))
+
+        if completed_task_ids:
+            Task.query.filter(
+                Task.id.in_(completed_task_ids),
+                Task.completed_event_emitted_at.is_(None),
+            ).update({Task.completed_event_emitted_at: now}, synchronize_session=False)
+
+        db.session.commit()
+        return failed
+
+    def _send_to_pet(self, rows):
+        # The pet service takes one event per request and answers 409 for an
+        # idempotency_key it has already processed, which counts as delivered.
+        results = {}
+        for row in rows:
+            try:
+                r = requests.post(PET_EVENTS_URL, json=row.payload, timeout=3)
+                results[row.id] = None if (r.ok or r.status_code == 409) else f"HTTP {r.status_code}"
+            except Exception as e:
+                results[row.id] = str(e)
+        return results
+
+    def _send_to_gateway(self, rows):
+        if not rows:
+            return {}
+        accepted = event_client.emit_many([(row.event_type, row.payload) for row in rows])
+        return {row.id: None if ok else "not accepted by gateway" for row, ok in zip(rows, accepted)}
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                counts = {"delivered": 0, "failed": 0}
+                try:
+                    counts = self.run_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Outbox relay error: {e}")
+                finally:
+                    db.session.remove()
+                # A full batch means more may be waiting: go again right away
+                if counts["delivered"] + counts["failed"] < self.batch_size:
+                    self._wake.wait(self.interval)
+                    self._wake.clear()
+
+
+# Global instance
+relay = OutboxRelay(
+    batch_size=Config.OUTBOX_BATCH_SIZE,
+    interval=Config.OUTBOX_RELAY_INTERVAL_SEC,
+    max_backoff=Config.OUTBOX_MAX_BACKOFF_SEC,
+    lease=Config.OUTBOX_LEASE_SEC,
+)
@@ -0,0 +1,160 @@
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import asc, desc, nulls_last, text, tuple_, event
+from sqlalchemy.orm import Session
+from config import Config
+from models import db, Task
+
+# Sort keys that can be paged with a cursor, each with `id` as tiebreaker
+KEYSET_COLUMNS = {
+    "id": Task.id,
+    "due_at": Task.due_at,
+    "created_at": Task.created_at,
+    "priority": Task.priority,
+    "title": Task.title,
+}
+DATETIME_KEYS = {"due_at", "created_at"}
+TOTAL_MODES = {"none", "exact", "estimate", "cached"}
+
+
+def parse_keyset_sort(sort):
+    """
+    Return (key, descending) for a cursor-paged sort such as "-due_at".
+    Only one key is allowed (plus an optional trailing "id"/"-id" tiebreaker).
+    """
+    parts = [p.strip() for p in sort.split(",") if p.strip()]
+    if len(parts) == 2 and parts[1].lstrip("-") == "id":
+        parts = parts[:1]
+    if len(parts) != 1 or parts[0].lstrip("-") not in KEYSET_COLUMNS:
+        abort(400, f"cursor pagination supports a single sort key: {sorted(KEYSET_COLUMNS)}")
+    return parts[0].lstrip("-"), parts[0].startswith("-")
+
+
+def encode_cursor(key, task):
+    value = getattr(task, key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"k": key, "v": value, "id": task.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, key):
+    """Return (value, id) from a cursor made for the same sort key."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        value, last_id = data["v"], int(data["id"])
+        if data["k"] != key:
+            raise ValueError("sort key changed")
+        if value is not None and key in DATETIME_KEYS:
+            value = datetime.fromisoformat(value)
+    except (ValueError, KeyError, TypeError):
+        abort(400, "invalid cursor")
+    return value, last_id
+
+
+def keyset_queries(q, key, descending, cursor=None):
+    """
+    Queries that page `q` by key (NULLs last) then id, after `cursor` if
+    given; read them in order until a page is full. Each is one range of
+    the (user_id, key, id) indexes, so a page costs the same at any depth:
+      1. rows with a key, after the cursor by the row value (key, id)
+      2. the NULL-key tail, by id
+    A cursor whose value is None is already in the tail and skips step 1.
+    """
+    col = KEYSET_COLUMNS[key]
+    direction = desc if descending else asc
+    value = last_id = None
+    if cursor is not None:
+        value, last_id = decode_cursor(cursor, key)
+
+    def after(left, right):
+        return left < right if descending else left > right
+
+    if key == "id":
+        q = q.order_by(direction(Task.id))
+        return [q if cursor is None else q.filter(after(Task.id, last_id))]
+
+    queries = []
+    if cursor is None or value is not None:
+        keyed = q.filter(col.isnot(None)).order_by(nulls_last(direction(col)), direction(Task.id))
+        if cursor is not None:
+            keyed = keyed.filter(after(tuple_(col, Task.id), tuple_(value, last_id)))
+        queries.append(keyed)
+    tail = q.filter(col.is_(None)).order_by(direction(Task.id))
+    if cursor is not None and value is None:
+        tail = tail.filter(after(Task.id, last_id))
+    queries.append(tail)
+    return queries
+
+
+def count_total(q, uid, mode, filters_key):
+    """Total for a listing: exact COUNT, a planner estimate, or a short-lived cached count."""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        estimate = _planner_estimate(q)
+        if estimate is not None:
+            return estimate
+        mode = "cached"
+    if mode == "cached":
+        return count_cache.get(uid, filters_key, lambda: q.order_by(None).count())
+    return q.order_by(None).count()
+
+
+def _planner_estimate(q):
+    # Postgres only: the row estimate from EXPLAIN, without running the query
+    if db.engine.dialect.name != "postgresql":
+        return None
+    try:
+        sql = q.order_by(None).statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+        plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        db.session.rollback()
+        return None
+
+
+class CountCache:
+    """
+    Per-user listing totals kept for `ttl` seconds, keyed by the filter set.
+    A user's entries are dropped whenever a flush touches one of their tasks.
+    """
+
+    def __init__(self, ttl=30.0, max_users=10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, uid, filters_key, compute):
+        now = time.monotonic()
+        with self.lock:
+            hit = self.entries.get(uid, {}).get(filters_key)
+            if hit and hit[1] > now:
+                return hit[0]
+        value = compute()
+        with self.lock:
+            if uid not in self.entries and len(self.entries) >= self.max_users:
+                self.entries.clear()
+            self.entries.setdefault(uid, {})[filters_key] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self, uid):
+        with self.lock:
+            self.entries.pop(uid, None)
+
+
+count_cache = CountCache(ttl=Config.TASK_COUNT_CACHE_TTL_SEC)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_counts(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Task) and obj.user_id is not None:
+            count_cache.invalidate(str(obj.user_id))
@@ -0,0 +1,302 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil.relativedelta import relativedelta  # for monthly repeat
+from sqlalchemy import or_
+from config import Config
+from models import db, Task
+from pagination import count_cache
+import stats
+import sync
+
+REPEAT_STEPS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+
+def _utc(dt):
+    # SQLite hands back naive datetimes; everything here is UTC
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def series_anchor(head):
+    """The series' first scheduled time; occurrence k is anchor + k steps."""
+    return _utc(head.occurrence_at or head.due_at)
+
+
+def occurrence_at(anchor, repeat_every, k):
+    if repeat_every == "monthly":
+        # Always from the anchor, so the 31st stays the last day of short months
+        return anchor + relativedelta(months=k)
+    return anchor + k * REPEAT_STEPS[repeat_every]
+
+
+def start_series(head):
+    """
+    Make `head` (with repeat_every set) the first occurrence of its series:
+    anchor it at its due date and point next_occurrence_at at the second one.
+    """
+    head.is_recurring_template = True
+    head.occurrence_at = head.occurrence_at or head.due_at
+    if head.next_occurrence_at is None:
+        at = occurrence_at(series_anchor(head), head.repeat_every, 1)
+        until = _utc(head.repeat_until)
+        head.next_occurrence_at = at if until is None or at <= until else None
+
+
+def occurrence_times(anchor, repeat_every, start, end, until=None):
+    """
+    Yield the scheduled times in [start, end), none after `until`. The first
+    one is computed directly, so the cost does not depend on how far the
+    window is from the anchor.
+    """
+    if repeat_every == "monthly":
+        k = max((start.year - anchor.year) * 12 + start.month - anchor.month - 1, 0)
+    else:
+        k = max((start - anchor) // REPEAT_STEPS[repeat_every], 0)
+    at = occurrence_at(anchor, repeat_every, k)
+    while at < start:
+        k += 1
+        at = occurrence_at(anchor, repeat_every, k)
+    while at < end and (until is None or at <= until):
+        yield at
+        k += 1
+        at = occurrence_at(anchor, repeat_every, k)
+
+
+def is_scheduled(head, at):
+    """True if `at` is one of the series' occurrences (after the head itself)."""
+    anchor = series_anchor(head)
+    if at <= anchor:
+        return False
+    return next(occurrence_times(anchor, head.repeat_every, at, at + timedelta(seconds=1),
+                                 _utc(head.repeat_until)), None) == at
+
+
+def _occurrence_values(head, at):
+    return {
+        "user_id": head.user_id,
+        "title": head.title,
+        "description": head.description,
+        "priority": head.priority,
+        "due_at": at,
+        "tags": head.tags,
+        "points": head.points,
+        "status": "todo",
+        "recurrence_parent_id": head.id,
+        "occurrence_at": at,
+    }
+
+
+def new_occurrence(head, at):
+    """A concrete task for the occurrence of `head` scheduled at `at`."""
+    return Task(**_occurrence_values(head, at))
+
+
+def _insert_ignoring_stored(rows):
+    # Multi-row INSERT; occurrences already stored (overrides, or another
+    # runner) hit the unique (recurrence_parent_id, occurrence_at) index and are skipped
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(Task).values(rows).on_conflict_do_nothing(
+        index_elements=["recurrence_parent_id", "occurrence_at"])
+    return db.session.execute(stmt).rowcount
+
+
+def materialize(heads, end, batch_size=500):
+    """
+    Store the occurrences of each series in `heads` from its next_occurrence_at
+    up to `end` (exclusive), however many periods that is, and move
+    next_occurrence_at past them (None once the series is over). Returns the
+    number of rows inserted. The caller commits.
+    """
+    rows = []
+    for head in heads:
+        start = _utc(head.next_occurrence_at)
+        if start is None or start >= end:
+            continue
+        anchor, until = series_anchor(head), _utc(head.repeat_until)
+        rows += [_occurrence_values(head, at) for at in occurrence_times(anchor, head.repeat_every, start, end, until)]
+        # A month is the longest step, so the next occurrence is within 32 days of `end`
+        head.next_occurrence_at = next(
+            occurrence_times(anchor, head.repeat_every, end, end + timedelta(days=32), until), None)
+
+    # Core INSERTs also skip the hook that stamps change_seq
+    seqs = sync.bump_all({row["user_id"] for row in rows})
+    for row in rows:
+        row["change_seq"] = seqs[row["user_id"]]
+
+    inserted = 0
+    for i in range(0, len(rows), batch_size):
+        inserted += _insert_ignoring_stored(rows[i:i + batch_size])
+    # Core INSERTs skip the flush hooks that keep counts current
+    for uid in {row["user_id"] for row in rows}:
+        count_cache.invalidate(str(uid))
+        stats.drop_counters(uid)
+    return inserted
+
+
+def horizon_end(now):
+    """Occurrences due before this time are stored as rows; later ones stay virtual."""
+    return now + timedelta(days=Config.TASK_RECURRENCE_HORIZON_DAYS)
+
+
+def expand(uid, start, end):
+    """
+    The user's recurring occurrences in [start, end): stored ones (series
+    heads, materialized occurrences and overrides) as their rows, the rest
+    computed from each series' rule without touching the database.
+    """
+    stored = Task.query.filter(
+        Task.user_id == uid,
+        or_(Task.recurrence_parent_id.isnot(None), Task.is_recurring_template.is_(True)),
+        Task.occurrence_at >= start,
+        Task.occurrence_at < end,
+    ).all()
+    # Deleted overrides still hide their virtual occurrence
+    taken = {(t.recurrence_parent_id or t.id, _utc(t.occurrence_at)) for t in stored}
+    items = [dict(t.to_dict(), virtual=False) for t in stored if t.deleted_at is None]
+
+    heads = Task.query.filter(
+        Task.user_id == uid,
+        Task.repeat_every.isnot(None),
+        Task.next_occurrence_at.isnot(None),
+        Task.next_occurrence_at < end,
+        Task.deleted_at.is_(None),
+        or_(Task.repeat_until.is_(None), Task.repeat_until >= start),
+    ).all()
+    for head in heads:
+        base = dict(head.to_dict(), id=None, recurrence_parent_id=head.id, status="todo",
+                    completed_at=None, created_at=None, updated_at=None, repeat_every=None,
+                    repeat_until=None, next_occurrence_at=None, is_recurring_template=False,
+                    virtual=True)
+        first = max(start, _utc(head.next_occurrence_at))
+        for at in occurrence_times(series_anchor(head), head.repeat_every, first, end, _utc(head.repeat_until)):
+            if (head.id, at) not in taken:
+                items.append(dict(base, due_at=at, occurrence_at=at))
+
+    items.sort(key=lambda item: (_utc(item["occurrence_at"]), item["recurrence_parent_id"] or item["id"]))
+    return items
+
+
+class RecurringRunner:
+    """
+    Keeps every series' stored occurrences rolled forward to the horizon.
+
+    Due series heads are claimed in chunks with SELECT ... FOR UPDATE SKIP
+    LOCKED, so runners on several task-service instances split the work
+    instead of spawning twice; each chunk is one multi-row INSERT and one
+    commit. A head that missed many periods is caught up in the same pass.
+
+    Usage:
+        from recurrence import runner
+
+        runner.start(app)     # background thread
+        runner.run_once()     # all due heads, inside an app context
+        runner.stats()
+    """
+
+    def __init__(self, chunk_size=200, interval=60.0):
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._totals = {"runs": 0, "chunks": 0, "heads": 0, "spawned": 0}
+        self._last = None
+        self.thread = None
+
+    def start(self, app):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, args=(app,), daemon=True, name="recurring-runner")
+            self.thread.start()
+            print("✅ Recurring task runner started")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Process due heads until none are left. Returns this run's counts."""
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)
+        horizon = horizon_end(now)
+        chunks = heads = spawned = 0
+        max_lag = 0.0
+        while True:
+            claimed = (
+                Task.query
+                .filter(
+                    Task.repeat_every.isnot(None),
+                    Task.next_occurrence_at.isnot(None),
+                    Task.next_occurrence_at < horizon,
+                    Task.deleted_at.is_(None),
+                )
+                .order_by(Task.next_occurrence_at, Task.id)
+                .limit(self.chunk_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not claimed:
+                db.session.commit()
+                break
+            # Lag: how long the oldest claimed occurrence has been due without a row
+            max_lag = max(max_lag, (now - _utc(claimed[0].next_occurrence_at)).total_seconds())
+            spawned += materialize(claimed, horizon)
+            db.session.commit()
+            chunks += 1
+            heads += len(claimed)
+            if len(claimed) < self.chunk_size:
+                break
+
+        duration = time.monotonic() - started
+        last = {
+            "chunks": chunks,
+            "heads": heads,
+            "spawned": spawned,
+            "duration_sec": round(duration, 4),
+            "spawned_per_sec": round(spawned / duration, 1) if duration > 0 else None,
+            "max_lag_sec": round(max_lag, 1),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._stats_lock:
+            self._totals["runs"] += 1
+            self._totals["chunks"] += chunks
+            self._totals["heads"] += heads
+            self._totals["spawned"] += spawned
+            self._last = last
+        if spawned:
+            print(f"✅ Recurring runner: {spawned} occurrences for {heads} series in {duration:.2f}s")
+        return last
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "chunk_size": self.chunk_size,
+                "interval_sec": self.interval,
+                "totals": dict(self._totals),
+                "last_run": dict(self._last) if self._last else None,
+            }
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Recurring runner error: {e}")
+                finally:
+                    db.session.remove()
+                self._stop.wait(self.interval)
+
+
+# Global instance
+runner = RecurringRunner(
+    chunk_size=Config.TASK_RECURRING_CHUNK_SIZE,
+    interval=Config.TASK_RECURRING_INTERVAL_SEC,
+)
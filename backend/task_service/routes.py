@@ -1,21 +1,35 @@
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, request, jsonify, abort, current_app
+from functools import wraps
+import hmac
 from datetime import datetime, timezone, timedelta
-from models import db, Task, Tag
-from sqlalchemy import func, or_, desc, asc, text, nulls_last
+from models import db, Task, Tag, Outbox, TASK_FIELDS
+from sqlalchemy import func, or_, desc, asc, text, nulls_last, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 import os, requests
 from werkzeug.exceptions import HTTPException
-from shared.event_client import EventClient, Events
-from dateutil.relativedelta import relativedelta  # for monthly repeat
+from shared.event_client import Events
+from shared.json_provider import stream_list
 from dateutil import parser
 from config import Config
+import outbox
+import stats
+import sync
+from pagination import KEYSET_COLUMNS, TOTAL_MODES, parse_keyset_sort, keyset_queries, encode_cursor, count_total, count_cache
+from search import apply_search
+import recurrence
 
 bp = Blueprint("tasks", __name__,  url_prefix="/api/v1")
 PET_SERVICE_URL = f"{Config.API_GATEWAY_URL}/v1/pet-service"
 
 PRIORITIES = {"low", "medium", "high"}
 TAG_WHITELIST = {"feeding", "cleaning", "playing"}
-
-event_client = EventClient()
+# Query args that narrow GET /tasks (cached totals are kept per combination)
+LIST_FILTER_ARGS = ("only_deleted", "include_deleted", "status", "priority", "tag", "query")
+# POST /tasks/bulk
+BULK_ACTIONS = {"create", "patch", "delete", "restore", "start", "complete"}
+BULK_PATCH_FIELDS = {"title", "description", "priority", "due_at", "tags", "points", "status"}
 
 def _truthy(v) -> bool:
     return str(v).lower() in {"1", "true", "yes", "y"}
@@ -43,9 +57,45 @@ def current_user_id():
         abort(401, "missing user id")
     return uid
 
-def get_task_for_current_user(task_id, include_deleted=False):
+def operator_required(fn):
+    """
+    Gate for operator endpoints (relay/runner triggers and their stats): the
+    X-Ops-Token header must match TASK_OPS_TOKEN. Without a token configured
+    they are disabled, since the gateway proxies every task-service path.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get("TASK_OPS_TOKEN")
+        if not expected:
+            abort(403, "operator endpoints are disabled")
+        if not hmac.compare_digest(request.headers.get("X-Ops-Token", ""), expected):
+            abort(403, "operator token required")
+        return fn(*args, **kwargs)
+    return wrapper
+
+def requested_fields():
+    """
+    ?fields=title,status -> the Task fields to select and return (id is
+    always included), or None for all of them.
+    """
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(["id"] + [f.strip() for f in raw.split(",") if f.strip()]))
+    unknown = [f for f in fields if f not in TASK_FIELDS]
+    if unknown:
+        abort(400, f"unknown fields {unknown}; allowed={list(TASK_FIELDS)}")
+    return fields
+
+def project(q, fields, *extra):
+    """Limit the SELECT of `q` to `fields` (plus `extra` columns needed by the caller)."""
+    if fields is None:
+        return q
+    return q.options(load_only(*[getattr(Task, f) for f in fields], *extra, raiseload=True))
+
+def get_task_for_current_user(task_id, include_deleted=False, fields=None):
     uid = current_user_id()
-    q = Task.query.filter_by(id=task_id, user_id=uid)
+    q = project(Task.query.filter_by(id=task_id, user_id=uid), fields)
     if not include_deleted:
         q = q.filter(Task.deleted_at.is_(None))
     t = q.first()
@@ -62,11 +112,11 @@ def handle_http_exc(e):
 def health():
     return jsonify({'status': 'Task Service is running', 'service': 'task_service'}), 200
 
-@bp.route("/tasks", methods=["POST"])
-def create_task():
-    uid = current_user_id()
-    data = request.get_json(force=True)
-    print(f"inside create task = {data}")
+def _build_task(uid, data):
+    """
+    Validate a create payload and return the new Task (not yet added to the
+    session). Invalid input aborts with 400.
+    """
     title = (data.get("title") or "").strip()
     if not title:
         abort(400, "title is required")
@@ -108,6 +158,7 @@ def create_task():
         if repeat_every not in {"daily", "weekly", "monthly"}:
             abort(400, "repeat_every must be daily|weekly|monthly")
 
+    # Without repeat_until a series runs until repeat_every is cleared
     repeat_until = None
     if data.get("repeat_until"):
         repeat_until = parse_iso(data["repeat_until"])
@@ -123,44 +174,28 @@ def create_task():
         tags=tags_to_save,
         points=int(data.get("points") or 0),
         status=status or "todo",
-        repeat_every=None,
+        repeat_every=repeat_every,
         is_recurring_template=False,
-        repeat_until=None,
+        repeat_until=repeat_until if repeat_every else None,
         next_occurrence_at=None,
     )
-    db.session.add(t)
-    db.session.flush()  
-
-    if repeat_every and repeat_until:
-        current_due = due_at
-
-        while True:
-            if repeat_every == "daily":
-                current_due = current_due + timedelta(days=1)
-            elif repeat_every == "weekly":
-                current_due = current_due + timedelta(weeks=1)
-            elif repeat_every == "monthly":
-                current_due = current_due + relativedelta(months=1)
-
-            if current_due > repeat_until:
-                break
+    if repeat_every:
+        # Stored as a rule: later occurrences are added by recurrence.materialize()
+        recurrence.start_series(t)
+    return t
 
-            clone = Task(
-                user_id=uid,
-                title=title,
-                description=data.get("description"),
-                priority=priority,
-                due_at=current_due,
-                tags=tags_to_save,
-                points=int(data.get("points") or 0),
-                status="todo",
-                repeat_every=None,
-                is_recurring_template=False,
-                repeat_until=None,
-                next_occurrence_at=None,
-            )
-            db.session.add(clone)
 
+@bp.route("/tasks", methods=["POST"])
+def create_task():
+    uid = current_user_id()
+    data = request.get_json(force=True)
+    print(f"inside create task = {data}")
+    t = _build_task(uid, data)
+    db.session.add(t)
+    if t.repeat_every:
+        # Store the occurrences inside the horizon; the runner keeps it rolling
+        db.session.flush()
+        recurrence.materialize([t], recurrence.horizon_end(_utc_now()))
     db.session.commit()
 
     return jsonify(t.to_dict()), 201
@@ -168,8 +203,9 @@ def create_task():
 
 @bp.route("/tasks/<int:task_id>", methods=["GET"])
 def get_task(task_id):
-    t = get_task_for_current_user(task_id)
-    return jsonify(t.to_dict())
+    fields = requested_fields()
+    t = get_task_for_current_user(task_id, fields=fields)
+    return jsonify(t.to_dict(fields))
 
 @bp.route("/tasks", methods=["GET"])
 def list_tasks():
@@ -196,13 +232,40 @@ def list_tasks():
         tag = tag.strip()
         q = q.filter(Task.tags.isnot(None), Task.tags.contains([tag]))
 
-    query_text = request.args.get("query")
+    query_text = (request.args.get("query") or "").strip()
     if query_text:
-        like = f"%{query_text}%"
-        q = q.filter(or_(Task.title.ilike(like), Task.description.ilike(like)))
+        q = apply_search(q, query_text)
+
+    # sort (searches default to relevance, except when paging by cursor)
+    sort = request.args.get("sort") or ("relevance" if query_text and "cursor" not in request.args else "-id")
+    limit = min(max(int(request.args.get("limit", 50)), 1), 100)
+    filters_key = tuple((k, request.args.get(k)) for k in LIST_FILTER_ARGS)
+    fields = requested_fields()
+
+    # cursor (keyset) pagination: ?cursor= for the first page, then next_cursor
+    if "cursor" in request.args:
+        total_mode = (request.args.get("total") or "none").lower()
+        if total_mode not in TOTAL_MODES:
+            abort(400, f"total must be one of {sorted(TOTAL_MODES)}")
+        key, descending = parse_keyset_sort(sort)
+        rows = []
+        for page_q in keyset_queries(q, key, descending, request.args.get("cursor") or None):
+            # the sort key is read for next_cursor even if it is not returned
+            rows += project(page_q, fields, KEYSET_COLUMNS[key]).limit(limit + 1 - len(rows)).all()
+            if len(rows) > limit:
+                break
+        items = rows[:limit]
+        next_cursor = encode_cursor(key, items[-1]) if len(rows) > limit else None
+
+        response = {
+            "items": [t.to_dict(fields) for t in items],
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "total": count_total(q, uid, total_mode, filters_key),
+        }
+        return jsonify(response), 200
 
-    # sort
-    sort = request.args.get("sort", "-id")
     def apply_sort(q, key):
         direction = desc if key.startswith("-") else asc
         col = key.lstrip("-")
@@ -217,17 +280,24 @@ def list_tasks():
         if col in mapping:
             return q.order_by(nulls_last(direction(mapping[col])))
         return q
-    for part in sort.split(","):
-        q = apply_sort(q, part.strip())
+    if sort == "relevance":
+        if not query_text:
+            abort(400, "sort=relevance needs a query")
+        q = apply_search(q, query_text, rank=True)
+    else:
+        for part in sort.split(","):
+            q = apply_sort(q, part.strip())
 
-    # pagination
+    # offset pagination (kept for compatibility)
+    total_mode = (request.args.get("total") or "exact").lower()
+    if total_mode not in TOTAL_MODES:
+        abort(400, f"total must be one of {sorted(TOTAL_MODES)}")
     page = max(int(request.args.get("page", 1)), 1)
-    limit = min(max(int(request.args.get("limit", 50)), 1), 100)
-    items = q.limit(limit).offset((page-1)*limit).all()
-    total = q.order_by(None).count()
+    items = project(q, fields).limit(limit).offset((page-1)*limit).all()
+    total = count_total(q, uid, total_mode, filters_key)
 
     response = {
-        "items": [t.to_dict() for t in items],
+        "items": [t.to_dict(fields) for t in items],
         "page": page,
         "limit": limit,
         "total": total,
@@ -238,12 +308,20 @@ def list_tasks():
 @bp.route("/tasks/<int:task_id>/events/retry", methods=["POST"])
 def retry_complete_event(task_id):
     uid = current_user_id()
-    t = Task.query.filter_by(id=task_id).first_or_404()
-    if t.status != "completed" or t.status != 'done':
+    t = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
+    if t.status not in ("completed", "done"):
         abort(400, "task not completed")
     if t.completed_event_emitted_at:
         return t.to_dict(), 200
 
+    # Make the pending TASK_COMPLETED delivery due now instead of after its backoff
+    Outbox.query.filter_by(
+        idempotency_key=f"task:{t.id}:completed", delivered_at=None
+    ).update({"available_at": _utc_now()})
+    db.session.commit()
+    outbox.relay.wake()
+    return t.to_dict(), 202
+
 @bp.route("/tasks/<int:task_id>", methods=["PATCH"])
 def update_task(task_id):
     uid = current_user_id()
@@ -317,6 +395,13 @@ def update_task(task_id):
                 abort(400, "repeat_until must be after due_at")
             t.repeat_until = end_dt
 
+    if "repeat_every" in data and t.repeat_every:
+        if t.recurrence_parent_id is not None:
+            abort(400, "an occurrence cannot repeat; edit its series instead")
+        recurrence.start_series(t)
+        db.session.flush()
+        recurrence.materialize([t], recurrence.horizon_end(_utc_now()))
+
     db.session.commit()
 
     return jsonify(t.to_dict()), 200
@@ -332,6 +417,19 @@ def start_task(task_id):
 
     return jsonify(t.to_dict()), 200
 
+def _completed_payload(t):
+    return {
+        "type": "TASK_COMPLETED",
+        "source": "task_service",
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        "idempotency_key": f"task:{t.id}:completed",
+        "user_id": t.user_id,
+        "task_id": t.id,
+        "points": int(t.points or 0),
+        "completed_at": t.completed_at.isoformat() if t.completed_at else None,
+        "metadata": {"priority": t.priority, "tags": t.tags or []},
+    }
+
 @bp.route("/tasks/<int:task_id>/complete", methods=["POST"])
 def complete_task(task_id):
     uid = current_user_id()
@@ -342,27 +440,14 @@ def complete_task(task_id):
 
     print(f'Task-{task_id} is set to completed successfully.')
     
+    # Published by the outbox relay once this transaction commits
     if t.completed_event_emitted_at is None:
-        payload = {
-            "type": "TASK_COMPLETED",
-            "source": "task_service",
-            "occurred_at": datetime.now(timezone.utc).isoformat(),
-            "idempotency_key": f"task:{t.id}:completed",
-            "user_id": t.user_id,  
-            "task_id": t.id,
-            "points": int(t.points or 0),
-            "completed_at": t.completed_at.isoformat() if t.completed_at else None,
-            "metadata": {"priority": t.priority, "tags": t.tags or []},
-        }
-        try:
-            r = requests.post(f"{Config.API_GATEWAY_URL}/v1/pet-service/events", json=payload, timeout=3)
-            if r.ok:
-                t.completed_event_emitted_at = datetime.now(timezone.utc)
-           
-        except Exception:
-            pass
-
-    db.session.commit() 
+        payload = _completed_payload(t)
+        outbox.enqueue("pet", "TASK_COMPLETED", payload, task_id=t.id,
+                       idempotency_key=payload["idempotency_key"])
+
+    db.session.commit()
+    outbox.relay.wake()
     return jsonify(t.to_dict()), 200
 
 @bp.route("/tasks/<int:task_id>", methods=["DELETE"])
@@ -370,13 +455,13 @@ def delete_task(task_id):
     uid = current_user_id()
     t = Task.query.filter_by(id=task_id, user_id=uid).first_or_404()
     t.deleted_at = datetime.now(timezone.utc)
-    db.session.commit()
-
-    event_client.emit(Events.TASK_DELETED, {
+    outbox.enqueue("gateway", Events.TASK_DELETED, {
         "task_id": t.id,
         "title": t.title,
         "user_id": t.user_id,
-    })
+    }, task_id=t.id)
+    db.session.commit()
+    outbox.relay.wake()
     return "", 204
 
 @bp.route("/tasks/<int:task_id>/restore", methods=["POST"])
@@ -390,6 +475,213 @@ def restore_task(task_id):
     
     return jsonify(t.to_dict()), 200
 
+def _bulk_list(data, key):
+    values = data.get(key)
+    if not isinstance(values, list) or not values:
+        abort(400, f"{key} must be a non-empty list")
+    if len(values) > Config.TASK_BULK_MAX:
+        abort(413, f"at most {Config.TASK_BULK_MAX} {key} per request")
+    return values
+
+def _bulk_ids(data):
+    """The request's "ids" as distinct integers, in the order given."""
+    try:
+        return list(dict.fromkeys(int(i) for i in _bulk_list(data, "ids")))
+    except (TypeError, ValueError):
+        abort(400, "ids must be integers")
+
+def _ids_filter(ids):
+    # Postgres: WHERE id = ANY(:ids) with one array parameter, so every
+    # lookup size shares one statement; elsewhere a plain IN list
+    if db.engine.dialect.name == "postgresql":
+        return Task.id == any_(bindparam("ids", ids, type_=ARRAY(db.Integer)))
+    return Task.id.in_(ids)
+
+def _bulk_changes(changes):
+    """Validate the changes of a bulk patch (the PATCH /tasks/<id> rules) as UPDATE values."""
+    if not isinstance(changes, dict) or not changes:
+        abort(400, "changes must be a non-empty object")
+    unknown = set(changes) - BULK_PATCH_FIELDS
+    if unknown:
+        abort(400, f"cannot bulk patch {sorted(unknown)}; allowed={sorted(BULK_PATCH_FIELDS)}")
+
+    values = {}
+    if "status" in changes:
+        if changes["status"] in ("done", "completed"):
+            abort(400, "use action=complete to complete tasks")
+        values[Task.status] = changes["status"]
+    if "title" in changes:
+        title = (changes["title"] or "").strip()
+        if not title:
+            abort(400, "title cannot be empty")
+        values[Task.title] = title
+    if "description" in changes:
+        values[Task.description] = changes["description"]
+    if "priority" in changes:
+        p = (changes["priority"] or "").lower()
+        if p not in PRIORITIES:
+            abort(400, "invalid priority (low|medium|high)")
+        values[Task.priority] = p
+    if "due_at" in changes:
+        values[Task.due_at] = parse_iso(changes["due_at"])
+    if "tags" in changes:
+        incoming = changes["tags"] or []
+        if len(incoming) > 1:
+            abort(400, "only one tag is allowed per task")
+        if incoming and incoming[0] not in TAG_WHITELIST:
+            abort(400, f"invalid tag: {incoming[0]}; allowed={sorted(TAG_WHITELIST)}")
+        values[Task.tags] = list(incoming)
+    if "points" in changes:
+        values[Task.points] = int(changes["points"] or 0)
+    return values
+
+def _bulk_create(uid, items):
+    results, created = [], []
+    for index, item in enumerate(items):
+        try:
+            t = _build_task(uid, item if isinstance(item, dict) else {})
+        except HTTPException as e:
+            results.append({"index": index, "status": "invalid", "error": e.description})
+            continue
+        created.append((index, t))
+        db.session.add(t)
+    db.session.flush()  # multi-row INSERTs
+    recurrence.materialize([t for _, t in created if t.repeat_every], recurrence.horizon_end(_utc_now()))
+    results += [{"index": index, "status": "ok", "id": t.id} for index, t in created]
+    results.sort(key=lambda r: r["index"])
+    return results, [t.id for _, t in created]
+
+def _bulk_update(uid, action, ids, data):
+    """
+    Run `action` on the caller's tasks in `ids` with one locking SELECT (for
+    the per-item results) and one UPDATE. Returns (results, changed ids).
+    """
+    now = _utc_now()
+    values = _bulk_changes(data.get("changes")) if action == "patch" else None
+    found = {
+        row.id: row for row in db.session.query(Task.id, Task.status, Task.deleted_at)
+        .filter(Task.user_id == uid, Task.id.in_(ids))
+        .with_for_update()
+    }
+
+    results, eligible = {}, []
+    for task_id in ids:
+        row = found.get(task_id)
+        if row is None or (row.deleted_at is not None and action not in ("delete", "restore")):
+            results[task_id] = {"id": task_id, "status": "not_found"}
+        elif action == "delete" and row.deleted_at is not None:
+            results[task_id] = {"id": task_id, "status": "skipped", "error": "task is already deleted"}
+        elif action == "restore" and row.deleted_at is None:
+            results[task_id] = {"id": task_id, "status": "skipped", "error": "task is not deleted"}
+        elif action == "start" and row.status != "todo":
+            results[task_id] = {"id": task_id, "status": "skipped", "error": "can only start from 'todo'"}
+        else:
+            results[task_id] = {"id": task_id, "status": "ok"}
+            eligible.append(task_id)
+
+    if eligible:
+        q = Task.query.filter(Task.user_id == uid, Task.id.in_(eligible))
+        # Set-based UPDATEs skip the flush hook that stamps change_seq
+        stamp = {Task.change_seq: sync.bump(uid)}
+        if action == "delete":
+            q.update({Task.deleted_at: now, **stamp}, synchronize_session=False)
+        elif action == "restore":
+            q.update({Task.deleted_at: None, **stamp}, synchronize_session=False)
+        elif action == "start":
+            q.update({Task.status: "in_progress", **stamp}, synchronize_session=False)
+        elif action == "complete":
+            q.filter(Task.status != "completed").update(
+                {Task.status: "completed", Task.completed_at: func.coalesce(Task.completed_at, now), **stamp},
+                synchronize_session=False,
+            )
+            # TASK_COMPLETED per task (the pet service dedupes on its idempotency_key)
+            unsent = q.filter(Task.completed_event_emitted_at.is_(None)).all()
+            outbox.enqueue_many("pet", [
+                ("TASK_COMPLETED", _completed_payload(t), t.id, f"task:{t.id}:completed") for t in unsent
+            ])
+        else:
+            q.update({**values, **stamp}, synchronize_session=False)
+
+    return [results[task_id] for task_id in ids], eligible
+
+@bp.route("/tasks/bulk", methods=["POST"])
+def bulk_tasks():
+    """
+    Apply one action to many tasks in a single transaction:
+        {"action": "create", "items": [{"title": "..."}, ...]}
+        {"action": "patch", "ids": [1, 2], "changes": {"priority": "high"}}
+        {"action": "delete" | "restore" | "start" | "complete", "ids": [1, 2]}
+    Each item gets a result: "ok", or "invalid" / "not_found" / "skipped"
+    with an error. One TASKS_BULK_UPDATED event lists the changed tasks.
+    """
+    uid = current_user_id()
+    data = request.get_json(force=True) or {}
+    action = data.get("action")
+    if action not in BULK_ACTIONS:
+        abort(400, f"action must be one of {sorted(BULK_ACTIONS)}")
+
+    if action == "create":
+        results, changed = _bulk_create(uid, _bulk_list(data, "items"))
+    else:
+        results, changed = _bulk_update(uid, action, _bulk_ids(data), data)
+
+    if changed:
+        outbox.enqueue("gateway", Events.TASKS_BULK_UPDATED, {
+            "action": action,
+            "user_id": uid,
+            "task_ids": changed,
+        })
+    # Set-based UPDATEs bypass the flush hooks that keep counts current
+    stats.drop_counters(uid)
+    db.session.commit()
+    count_cache.invalidate(uid)
+    outbox.relay.wake()
+
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    print(f"✅ Bulk {action}: {succeeded}/{len(results)} tasks")
+    return jsonify({
+        "action": action,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }), 200
+
+@bp.route("/tasks/lookup", methods=["POST"])
+def lookup_tasks():
+    """
+    Fetch several of the caller's tasks by id in one query:
+        {"ids": [3, 1, 7], "include_deleted": false, "compact": false}
+    Items come back in the order asked; ids that are not found (or are
+    deleted, unless include_deleted) are listed in "missing". With
+    compact=true each item only has id, status and deleted_at.
+    """
+    uid = current_user_id()
+    data = request.get_json(force=True) or {}
+    ids = _bulk_ids(data)
+    compact = _truthy(data.get("compact"))
+
+    q = Task.query.filter(Task.user_id == uid, _ids_filter(ids))
+    if not _truthy(data.get("include_deleted")):
+        q = q.filter(Task.deleted_at.is_(None))
+
+    if compact:
+        rows = q.with_entities(Task.id, Task.status, Task.deleted_at).all()
+        found = {
+            row.id: {
+                "id": row.id,
+                "status": row.status,
+                "deleted_at": row.deleted_at.isoformat() if row.deleted_at else None,
+            }
+            for row in rows
+        }
+    else:
+        found = {t.id: t.to_dict() for t in q.all()}
+
+    return jsonify({
+        "items": [found[i] for i in ids if i in found],
+        "missing": [i for i in ids if i not in found],
+    }), 200
+
 @bp.route("/tags", methods=["GET"])
 def list_tags():
     return {"items": sorted(TAG_WHITELIST)}, 200
@@ -445,45 +737,104 @@ def detach_tag(task_id, name):
     return t.to_dict(), 200
 
 @bp.route("/tasks/recurring/run", methods=["POST"])
+@operator_required
 def run_recurring():
-    now = _utc_now()
-
-    to_spawn = Task.query.filter(
-        Task.repeat_every.isnot(None),
-        Task.next_occurrence_at.isnot(None),
-        Task.next_occurrence_at <= now,
-        Task.deleted_at.is_(None)
-    ).all()
-
-    spawned = []
-    for tmpl in to_spawn:
-        if tmpl.repeat_until and tmpl.next_occurrence_at > tmpl.repeat_until:
-            tmpl.repeat_every = None
-            tmpl.next_occurrence_at = None
-            continue
-
-        new_task = Task(
-            user_id=tmpl.user_id,
-            title=tmpl.title,
-            description=tmpl.description,
-            priority=tmpl.priority,
-            due_at=tmpl.next_occurrence_at, 
-            tags=tmpl.tags,
-            points=tmpl.points,
-            status="todo",
-        )
-        db.session.add(new_task)
-        spawned.append(new_task)
-
-        if tmpl.repeat_every == "daily":
-            tmpl.next_occurrence_at = tmpl.next_occurrence_at + timedelta(days=1)
-        elif tmpl.repeat_every == "weekly":
-            tmpl.next_occurrence_at = tmpl.next_occurrence_at + timedelta(weeks=1)
-        elif tmpl.repeat_every == "monthly":
-            tmpl.next_occurrence_at = tmpl.next_occurrence_at + relativedelta(months=1)
+    """Roll every series' stored occurrences forward to the horizon, chunk by chunk."""
+    counts = recurrence.runner.run_once()
+    return {**counts, "count": counts["spawned"]}, 200
+
+@bp.route("/tasks/recurring/stats", methods=["GET"])
+@operator_required
+def recurring_stats():
+    return jsonify(recurrence.runner.stats()), 200
+
+@bp.route("/tasks/stats", methods=["GET"])
+def task_stats():
+    """
+    Counts of the caller's active tasks: total/open/completed, overdue and
+    due today, by status, priority and tag, in one query. ?utc_offset= is
+    the caller's offset from UTC in minutes (where "today" starts).
+    """
+    uid = current_user_id()
+    try:
+        offset = int(request.args.get("utc_offset", 0))
+    except ValueError:
+        abort(400, "utc_offset must be minutes")
+    if abs(offset) > 14 * 60:
+        abort(400, "utc_offset must be within 14 hours")
+    return jsonify(stats.for_user(uid, utc_offset=timedelta(minutes=offset))), 200
+
+@bp.route("/tasks/changes", methods=["GET"])
+def task_changes():
+    """
+    Delta sync. Without ?since= returns the active tasks and a cursor; with
+    it, the tasks created, updated, deleted (deleted_at set) or restored
+    since, and "removed" ids of tasks gone for good. 204 when nothing
+    changed, with a re-issued cursor in X-Sync-Cursor to poll with next;
+    410 when the cursor is too old to be served.
+    """
+    uid = current_user_id()
+    try:
+        limit = int(request.args.get("limit", 500))
+    except ValueError:
+        abort(400, "limit must be an integer")
+    limit = min(max(limit, 1), 1000)
+    since = request.args.get("since")
+    result = sync.changes(uid, since, limit)
+    if result is None:
+        return "", 204, {"X-Sync-Cursor": sync.refresh_cursor(since)}
+    return jsonify(result), 200
+
+@bp.route("/tasks/occurrences", methods=["GET"])
+def list_occurrences():
+    """
+    Occurrences of the caller's recurring tasks in [from, to): stored ones
+    as tasks, later ones expanded from the series rule with "virtual": true
+    and id null. Defaults to the next 30 days.
+    """
+    uid = current_user_id()
+    start = parse_iso(request.args.get("from")) or _utc_now()
+    end = parse_iso(request.args.get("to")) or start + timedelta(days=30)
+    if end <= start:
+        abort(400, "to must be after from")
+    if end - start > timedelta(days=Config.TASK_OCCURRENCES_MAX_DAYS):
+        abort(400, f"window is limited to {Config.TASK_OCCURRENCES_MAX_DAYS} days")
+    # A year of daily series is thousands of items: encode them as they are sent
+    return stream_list(recurrence.expand(uid, start, end))
+
+@bp.route("/tasks/<int:task_id>/occurrences", methods=["POST"])
+def materialize_occurrence(task_id):
+    """
+    Store one (possibly virtual) occurrence of a series as a task so it can
+    be edited or completed like any other: {"occurrence_at": "<iso>"}.
+    Returns the existing row (200) if the occurrence is already stored.
+    """
+    head = get_task_for_current_user(task_id)
+    if not head.repeat_every:
+        abort(400, "task is not recurring")
+    data = request.get_json(force=True) or {}
+    at = parse_iso(data.get("occurrence_at"))
+    if at is None or not recurrence.is_scheduled(head, at):
+        abort(400, "occurrence_at is not an occurrence of this task")
+
+    existing = Task.query.filter_by(recurrence_parent_id=head.id, occurrence_at=at).first()
+    if existing:
+        if existing.deleted_at:
+            abort(404, "occurrence was deleted")
+        return jsonify(existing.to_dict()), 200
+    t = recurrence.new_occurrence(head, at)
+    db.session.add(t)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Stored concurrently by the runner or another request
+        db.session.rollback()
+        t = Task.query.filter_by(recurrence_parent_id=head.id, occurrence_at=at).first_or_404()
+        return jsonify(t.to_dict()), 200
+    return jsonify(t.to_dict()), 201
 
-    db.session.commit()
-    return {
-        "spawned": [t.to_dict() for t in spawned],
-        "count": len(spawned),
-    }, 200
\ No newline at end of file
+@bp.route("/tasks/outbox/relay", methods=["POST"])
+@operator_required
+def run_outbox_relay():
+    """Deliver one batch of pending outbox events now (the relay thread also does this)."""
+    return outbox.relay.run_once(), 200
@@ -0,0 +1,53 @@
+from sqlalchemy import or_, case, func, inspect, literal_column
+from config import Config
+from models import db, Task
+
+# Set by detect_search_schema() when the Postgres column and indexes exist
+fulltext_enabled = False
+
+SEARCH_VECTOR = literal_column("tasks.search_vector")
+
+
+def detect_search_schema():
+    """
+    Use the full-text and trigram indexes for ?query= if the search
+    migration (b6e2a0d94c17, `flask db upgrade`) has added them. Elsewhere
+    (SQLite in tests, or not migrated yet) search keeps using plain LIKE.
+    Runs no DDL.
+    """
+    global fulltext_enabled
+    fulltext_enabled = False
+    if db.engine.dialect.name != "postgresql":
+        return
+    if not Config.TASK_SEARCH_LANGUAGE.isidentifier():
+        print(f"⚠️  Invalid TASK_SEARCH_LANGUAGE {Config.TASK_SEARCH_LANGUAGE!r}, falling back to ILIKE")
+        return
+    columns = {c["name"] for c in inspect(db.engine).get_columns("tasks")}
+    fulltext_enabled = "search_vector" in columns
+    if not fulltext_enabled:
+        print("⚠️  Task search column missing (run `flask db upgrade`), falling back to ILIKE")
+
+
+def apply_search(q, query_text, rank=False):
+    """
+    Filter `q` to tasks matching `query_text`: whole words through the
+    tsvector (stemmed, web-search syntax) or any substring of the title or
+    description through the trigram indexes. With rank=True, order by
+    relevance (title matches first).
+    """
+    like = f"%{query_text}%"
+    substring = or_(Task.title.ilike(like), Task.description.ilike(like))
+
+    if not fulltext_enabled:
+        q = q.filter(substring)
+        if rank:
+            q = q.order_by(case((Task.title.ilike(like), 0), else_=1), Task.id.desc())
+        return q
+
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{Config.TASK_SEARCH_LANGUAGE}'::regconfig"), query_text)
+    q = q.filter(or_(SEARCH_VECTOR.op("@@")(tsquery), substring))
+    if rank:
+        # Weighted text rank, plus a bonus for a literal substring hit in the title
+        score = func.ts_rank_cd(SEARCH_VECTOR, tsquery) + case((Task.title.ilike(like), 1.0), else_=0.0)
+        q = q.order_by(score.desc(), Task.id.desc())
+    return q
@@ -1,106 +1,424 @@
-import requests
-import os
-import json
-from datetime import datetime
-from typing import Dict, Optional
-
-class Events:
-    """Event type constants"""
-    USER_CREATED = 'user_created'
-    USER_UPDATED = 'user_updated'
-    TASK_CREATED = 'task_created'
-    TASK_PENDING = 'task_pending'
-    TASK_COMPLETED = 'task_completed'
-    PET_CREATED = 'pet_created'
-    PET_UPDATED = 'pet_updated'
-    TASK_DELETED = 'task_deleted'
-    TASK_RESTORED = 'task_restored'
-    TASK_UPDATED = 'task_updated'
-    ROADMAP_CREATED = 'roadmap_created'
-    ROADMAP_UPDATED = 'roadmap_updated'
-    ROADMAP_DELETED = 'roadmap_deleted'
-
-
-class EventClient:
-    """
-    Client for sending events to the API Gateway.
-    Use this in any microservice container to emit events.
-    
-    Usage:
-        from event_client import EventClient, Events
-        
-        client = EventClient()
-        client.emit(Events.USER_CREATED, {'user_id': 123, 'name': 'John'})
-    """
-    
-    def __init__(self, api_gateway_url: Optional[str] = None):
-        """
-        Initialize event client.
-        
-        Args:
-            api_gateway_url: Full URL to API gateway (e.g., 'http://api_gateway:5000').
-                           If None, uses environment variables.
-        """
-        if api_gateway_url:
-            self.url = api_gateway_url.rstrip('/')
-        else:
-            host = os.getenv('API_GATEWAY_HOST', 'api_gateway')
-            port = os.getenv('API_GATEWAY_PORT', '5000')
-            self.url = f'http://{host}:{port}'
-        
-        self.events_endpoint = f'{self.url}/events'
-        self.timeout = int(os.getenv('EVENT_CLIENT_TIMEOUT', '5'))
-    
-    def emit(self, event_type: str, data: Dict, wait_response: bool = False) -> bool:
-        """
-        Send an event to the API Gateway.
-        
-        Args:
-            event_type: Type of event (use Events constants)
-            data: Event data as dictionary
-            wait_response: If True, wait for response and return status
-        
-        Returns:
-            True if successful, False otherwise
-        """
-        payload = {
-            'type': event_type,
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        try:
-            if wait_response:
-                response = requests.post(
-                    self.events_endpoint,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                if response.status_code in [200, 202]:
-                    print(f"✅ Event emitted: {event_type}")
-                    return True
-                else:
-                    print(f"⚠️  Event failed with status {response.status_code}: {event_type}")
-                    return False
-            else:
-                # Fire and forget
-                requests.post(
-                    self.events_endpoint,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                return True
-        
-        except requests.exceptions.Timeout:
-            print(f"❌ Event timeout: {event_type}")
-            return False
-        except requests.exceptions.ConnectionError:
-            print(f"❌ Cannot connect to API Gateway at {self.events_endpoint}")
-            return False
-        except Exception as e:
-            print(f"❌ Error emitting event {event_type}: {e}")
-            return False
-
-
-# Convenience instance for easy importing
-event_client = EventClient()
\ No newline at end of file
+import requests
+import os
+import json
+import atexit
+import threading
+import time
+import uuid
+from datetime import datetime
+from queue import Queue, Empty, Full
+from typing import Dict, Iterable, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+
+# Marks spill files claimed by this run. A restarted container often reuses
+# the pid (pid 1), so claims from an earlier run are told apart by this too.
+_RUN_ID = uuid.uuid4().hex[:8]
+
+class Events:
+    """Event type constants"""
+    USER_CREATED = 'user_created'
+    USER_UPDATED = 'user_updated'
+    TASK_CREATED = 'task_created'
+    TASK_PENDING = 'task_pending'
+    TASK_COMPLETED = 'task_completed'
+    PET_CREATED = 'pet_created'
+    PET_UPDATED = 'pet_updated'
+    TASK_DELETED = 'task_deleted'
+    TASK_RESTORED = 'task_restored'
+    TASK_UPDATED = 'task_updated'
+    TASKS_BULK_UPDATED = 'tasks_bulk_updated'
+    ROADMAP_CREATED = 'roadmap_created'
+    ROADMAP_UPDATED = 'roadmap_updated'
+    ROADMAP_DELETED = 'roadmap_deleted'
+
+
+class EventClient:
+    """
+    Client for sending events to the API Gateway.
+    Use this in any microservice container to emit events.
+    
+    Usage:
+        from event_client import EventClient, Events
+        
+        client = EventClient()
+        client.emit(Events.USER_CREATED, {'user_id': 123, 'name': 'John'})
+        
+        # Several events in one request, one result per event
+        client.emit_many([(Events.TASK_DELETED, {'task_id': 1}), (Events.TASK_DELETED, {'task_id': 2})])
+    
+    Fire-and-forget emit() only puts the event on a bounded in-memory queue,
+    so request handlers never wait for the gateway. A background thread
+    sends the queue in batches (waiting up to batch_window_ms to fill one)
+    over a pooled session. Failed sends are retried with exponential
+    backoff; when retries run out or the queue is full, events go to
+    spill_dir (if set) and are re-sent once the gateway answers again,
+    otherwise they are dropped. Whatever is queued is flushed at exit.
+    A sender thread that dies is restarted on the next emit().
+    stats() returns the queued / sent / retried / dropped counters.
+    """
+    
+    def __init__(self, api_gateway_url: Optional[str] = None,
+                 batch_window_ms: Optional[int] = None, batch_size: Optional[int] = None,
+                 queue_size: Optional[int] = None, max_retries: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
+        """
+        Initialize event client.
+        
+        Args:
+            api_gateway_url: Full URL to API gateway (e.g., 'http://api_gateway:5000').
+                           If None, uses environment variables.
+            batch_window_ms: How long the sender waits to fill a batch; 0 sends
+                           whatever is queued right away. If None, uses EVENT_CLIENT_BATCH_MS.
+            batch_size: Most events per request. If None, uses EVENT_CLIENT_BATCH_SIZE.
+            queue_size: Events held in memory for background delivery. If None,
+                           uses EVENT_CLIENT_QUEUE_SIZE.
+            max_retries: Send attempts after the first one before spilling or
+                           dropping a batch. If None, uses EVENT_CLIENT_MAX_RETRIES.
+            spill_dir: Directory for events that could not be delivered. If None,
+                           uses EVENT_CLIENT_SPILL_DIR; empty disables spilling.
+        """
+        if api_gateway_url:
+            self.url = api_gateway_url.rstrip('/')
+        else:
+            host = os.getenv('API_GATEWAY_HOST', 'api_gateway')
+            port = os.getenv('API_GATEWAY_PORT', '5000')
+            self.url = f'http://{host}:{port}'
+        
+        self.events_endpoint = f'{self.url}/v1/events'
+        self.timeout = int(os.getenv('EVENT_CLIENT_TIMEOUT', '5'))
+        
+        if batch_window_ms is None:
+            batch_window_ms = int(os.getenv('EVENT_CLIENT_BATCH_MS', '0'))
+        self.batch_window = batch_window_ms / 1000
+        self.batch_size = batch_size or int(os.getenv('EVENT_CLIENT_BATCH_SIZE', '100'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('EVENT_CLIENT_MAX_RETRIES', '5'))
+        self.backoff_base = float(os.getenv('EVENT_CLIENT_BACKOFF_BASE_SEC', '0.2'))
+        self.backoff_max = float(os.getenv('EVENT_CLIENT_BACKOFF_MAX_SEC', '10'))
+        self.spill_dir = spill_dir if spill_dir is not None else os.getenv('EVENT_CLIENT_SPILL_DIR', '')
+        
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=4))
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=4))
+        
+        self._queue = Queue(maxsize=queue_size or int(os.getenv('EVENT_CLIENT_QUEUE_SIZE', '10000')))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._sender = None
+        # Files may be left over from an earlier run; checked after the first successful send
+        self._spill_pending = bool(self.spill_dir)
+        self.counters = {'queued': 0, 'sent': 0, 'retried': 0, 'rejected': 0, 'dropped': 0, 'spilled': 0,
+                         'errors': 0}
+    
+    def emit(self, event_type: str, data: Dict, wait_response: bool = False) -> bool:
+        """
+        Send an event to the API Gateway.
+        
+        Args:
+            event_type: Type of event (use Events constants)
+            data: Event data as dictionary
+            wait_response: If True, send now, wait for response and return status
+        
+        Returns:
+            True if successful (or queued, when not waiting), False otherwise
+        """
+        payload = self._payload(event_type, data)
+        
+        if not wait_response:
+            return self._enqueue(payload)
+        
+        try:
+            response = self.session.post(
+                self.events_endpoint,
+                json=payload,
+                timeout=self.timeout
+            )
+            if response.status_code in [200, 202]:
+                print(f"✅ Event emitted: {event_type}")
+                return True
+            else:
+                print(f"⚠️  Event failed with status {response.status_code}: {event_type}")
+                return False
+        
+        except requests.exceptions.Timeout:
+            print(f"❌ Event timeout: {event_type}")
+            return False
+        except requests.exceptions.ConnectionError:
+            print(f"❌ Cannot connect to API Gateway at {self.events_endpoint}")
+            return False
+        except Exception as e:
+            print(f"❌ Error emitting event {event_type}: {e}")
+            return False
+    
+    def emit_many(self, events: Iterable[Tuple[str, Dict]], wait_response: bool = True) -> List[bool]:
+        """
+        Send several events, batch_size per request.
+        
+        Args:
+            events: (event_type, data) pairs
+            wait_response: If False, queue them for background delivery instead
+        
+        Returns:
+            One flag per event, in order: True if the gateway accepted it
+            (or it was queued, when not waiting)
+        """
+        payloads = [self._payload(event_type, data) for event_type, data in events]
+        if not wait_response:
+            return [self._enqueue(payload) for payload in payloads]
+        
+        accepted = []
+        for start in range(0, len(payloads), self.batch_size):
+            result = self._post_batch(payloads[start:start + self.batch_size])
+            accepted.extend(result if result is not None else [False] * len(payloads[start:start + self.batch_size]))
+        return accepted
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been sent (or given up on)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+    
+    def close(self, timeout: float = 5.0):
+        """Flush, stop the sender and spill what could not be sent in time."""
+        self.flush(timeout)
+        self._stop.set()
+        if self._sender:
+            self._sender.join(timeout=1)
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+                self._queue.task_done()
+            except Empty:
+                break
+        if leftover:
+            self._give_up(leftover)
+        self.session.close()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters, queue_depth=self._queue.qsize(), spill_pending=bool(self._spill_files()))
+    
+    def _payload(self, event_type: str, data: Dict) -> Dict:
+        return {
+            'type': event_type,
+            'data': data,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _enqueue(self, payload: Dict) -> bool:
+        self._ensure_sender()
+        try:
+            self._queue.put_nowait(payload)
+        except Full:
+            print(f"⚠️  Event queue full: {payload['type']}")
+            return self._give_up([payload])
+        self._count('queued')
+        return True
+    
+    def _ensure_sender(self):
+        if self._sender is not None and self._sender.is_alive() or self._stop.is_set():
+            return
+        with self._lock:
+            if self._sender is not None and self._sender.is_alive():
+                return
+            if self._sender is None:
+                atexit.register(self.close)
+            else:
+                print("⚠️  Event sender thread died, restarting")
+            self._sender = threading.Thread(target=self._send_loop, daemon=True, name='event-client-sender')
+            self._sender.start()
+    
+    def _send_loop(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except Empty:
+                continue
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)) if self.batch_window
+                                 else self._queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                if self._deliver(batch):
+                    self._resend_spilled()
+            except Exception as e:
+                # Keep the thread alive for the next batch
+                self._count('errors')
+                print(f"❌ Event sender error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _deliver(self, batch: List[Dict], give_up: bool = True) -> bool:
+        """
+        Send one batch, retrying with backoff. Returns True if the gateway
+        answered; otherwise the batch is spilled or dropped (unless give_up
+        is False, in which case it is left to the caller).
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retried', len(batch))
+                if self._stop.wait(min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)):
+                    break
+            accepted = self._post_batch(batch)
+            if accepted is not None:
+                self._count('sent', sum(accepted))
+                self._count('rejected', len(batch) - sum(accepted))
+                return True
+        if give_up:
+            self._give_up(batch)
+        return False
+    
+    def _post_batch(self, payloads: List[Dict]) -> Optional[List[bool]]:
+        """
+        POST one batch; the gateway answers with a result per event.
+        Returns None when the batch should be retried (gateway unreachable or erroring).
+        """
+        try:
+            response = self.session.post(
+                self.events_endpoint,
+                json=payloads,
+                timeout=self.timeout
+            )
+        except requests.exceptions.Timeout:
+            print(f"❌ Event batch timeout ({len(payloads)} events)")
+            return None
+        except requests.exceptions.ConnectionError:
+            print(f"❌ Cannot connect to API Gateway at {self.events_endpoint}")
+            return None
+        except Exception as e:
+            print(f"❌ Error emitting event batch: {e}")
+            return None
+        
+        if response.status_code >= 500:
+            print(f"⚠️  Event batch failed with status {response.status_code} ({len(payloads)} events)")
+            return None
+        if response.status_code not in [200, 202]:
+            print(f"⚠️  Event batch refused with status {response.status_code} ({len(payloads)} events)")
+            return [False] * len(payloads)
+        
+        accepted = [False] * len(payloads)
+        try:
+            for result in response.json().get('results', []):
+                if result.get('status') == 'accepted':
+                    accepted[result['index']] = True
+                else:
+                    print(f"⚠️  Event rejected: {payloads[result['index']]['type']} ({result.get('error')})")
+        except (ValueError, AttributeError, KeyError, IndexError, TypeError) as e:
+            # Unreadable answer: send again rather than guess what was stored
+            print(f"⚠️  Unreadable event batch response ({len(payloads)} events): {e}")
+            return None
+        print(f"✅ Events emitted: {sum(accepted)}/{len(payloads)}")
+        return accepted
+    
+    def _give_up(self, payloads: List[Dict]) -> bool:
+        """Spill undeliverable events to disk, or drop them. Returns True if spilled."""
+        if self.spill_dir:
+            try:
+                with self._spill_lock:
+                    os.makedirs(self.spill_dir, exist_ok=True)
+                    with open(os.path.join(self.spill_dir, f'events-{os.getpid()}.jsonl'), 'a', encoding='utf-8') as f:
+                        for payload in payloads:
+                            f.write(json.dumps(payload) + '\n')
+                    self._spill_pending = True
+                self._count('spilled', len(payloads))
+                return True
+            except OSError as e:
+                print(f"❌ Cannot spill events to {self.spill_dir}: {e}")
+        self._count('dropped', len(payloads))
+        print(f"❌ Dropped {len(payloads)} event(s)")
+        return False
+    
+    def _resend_spilled(self):
+        """After a successful send, deliver events spilled earlier (by any process)."""
+        if not self._spill_pending:
+            return
+        self._spill_pending = False
+        self._reclaim_abandoned()
+        for name in self._spill_files():
+            path = os.path.join(self.spill_dir, name)
+            claimed = f'{path}.{os.getpid()}-{_RUN_ID}.sending'
+            try:
+                # Renaming claims the file, so two processes never send it twice
+                with self._spill_lock:
+                    os.rename(path, claimed)
+            except OSError:
+                continue
+            payloads = self._read_spill(claimed)
+            for start in range(0, len(payloads), self.batch_size):
+                if not self._deliver(payloads[start:start + self.batch_size], give_up=False):
+                    # Keep what was not delivered on disk, then release the claim
+                    if start:
+                        with open(claimed, 'w', encoding='utf-8') as f:
+                            f.writelines(json.dumps(payload) + '\n' for payload in payloads[start:])
+                    self._release(claimed)
+                    self._spill_pending = True
+                    return
+            # Removed only once every event in it was delivered
+            os.remove(claimed)
+    
+    def _read_spill(self, path: str) -> List[Dict]:
+        payloads = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    if line.strip():
+                        payloads.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash while spilling
+                    print(f"⚠️  Skipped unreadable spilled event in {path}")
+        return payloads
+    
+    def _reclaim_abandoned(self):
+        """Release spill files claimed by a process (or earlier run) that stopped mid-resend."""
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return
+        for name in os.listdir(self.spill_dir):
+            if not name.endswith('.sending'):
+                continue
+            pid, _, run_id = name[:-len('.sending')].rpartition('.')[2].partition('-')
+            if not pid.isdigit():
+                continue
+            if int(pid) == os.getpid() and run_id == _RUN_ID:
+                continue  # ours, still being sent
+            if int(pid) != os.getpid() and _process_alive(int(pid)):
+                continue
+            self._release(os.path.join(self.spill_dir, name))
+    
+    def _release(self, claimed: str):
+        """Turn a claimed file back into a spill file (under a new name: the old one may be in use)."""
+        with self._spill_lock:
+            try:
+                os.rename(claimed, os.path.join(self.spill_dir, f'events-{os.getpid()}-{time.time_ns()}.jsonl'))
+            except OSError as e:
+                print(f"❌ Cannot release spill file {claimed}: {e}")
+    
+    def _spill_files(self) -> List[str]:
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return []
+        return sorted(name for name in os.listdir(self.spill_dir) if name.endswith('.jsonl'))
+    
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counters[key] += n
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        return True  # os.kill() would terminate it; leave Windows claims alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
+
+
+# Convenience instance for easy importing
+event_client = EventClient()
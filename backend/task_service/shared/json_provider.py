@@ -0,0 +1,100 @@
+"""
+Flask JSON provider shared by the services.
+
+Uses orjson (C) when it is installed and the stdlib encoder otherwise.
+Either way datetimes are written as ISO 8601 strings, so models can hand
+raw datetime values to the response instead of calling isoformat() per field.
+
+Usage:
+    from shared.json_provider import FastJSONProvider, stream_list
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # in a view: encode the items one at a time while the response is sent
+    return stream_list(query.yield_per(500), lambda t: t.to_dict(), total=n)
+"""
+import json
+from datetime import date
+
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with an orjson fast path and ISO 8601 dates."""
+
+    # Keep the models' field order; sorting every object costs time for nothing
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        # Flask's default writes dates as HTTP dates; everything here uses ISO 8601
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_option(self):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dump_bytes(self, obj):
+        """Encode `obj` to UTF-8 JSON bytes."""
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_option())
+        return json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii,
+                          sort_keys=self.sort_keys, separators=(",", ":")).encode()
+
+    def dumps(self, obj, **kwargs):
+        # Callers passing json.dumps() options get the stdlib encoder
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dump_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        # orjson.JSONDecodeError is a ValueError, like the stdlib's
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def stream_list(items, serialize=None, key="items", **extra):
+    """
+    A streamed JSON response `{**extra, key: [serialize(item), ...]}`
+    (items as they are when there is no `serialize`).
+
+    Each item is encoded as it is produced, so a large listing is never
+    held in memory as one dict nor as one string. `items` may be a lazy
+    query (e.g. `.yield_per(500)`); it is consumed inside the request
+    context. `extra` values are encoded up front.
+    """
+    provider = current_app.json
+    encode = provider.dump_bytes if isinstance(provider, FastJSONProvider) else (
+        lambda obj: provider.dumps(obj).encode())
+    head = encode(extra)[:-1] if extra else b"{"
+
+    def generate():
+        chunk = [head + (b"," if extra else b"") + encode(key) + b":["]
+        for i, item in enumerate(items):
+            chunk.append((b"," if i else b"") + encode(serialize(item) if serialize else item))
+            # One write per batch of items rather than one per item
+            if len(chunk) >= 100:
+                yield b"".join(chunk)
+                chunk = []
+        chunk.append(b"]}\n")
+        yield b"".join(chunk)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=provider.mimetype)
@@ -0,0 +1,220 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, func, literal, null, select, true, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+from config import Config
+from models import db, Task, TaskCounter
+
+DONE_STATUSES = ("completed", "done")
+COUNTED_ATTRS = ("user_id", "status", "priority", "tags", "deleted_at")
+READY = "_ready"
+
+
+def _columns(facet, key, sub, n, updated_at=None):
+    return (literal(facet).label("facet"), key.label("key"), sub.label("sub"),
+            n.label("n"), (updated_at if updated_at is not None else null()).label("updated_at"))
+
+
+def _active(uid):
+    return (Task.user_id == uid, Task.deleted_at.is_(None))
+
+
+def _tag_values():
+    # One row per (task, tag): a table-valued function over the JSON array
+    if db.engine.dialect.name == "postgresql":
+        return func.jsonb_array_elements_text(Task.tags).table_valued("value").alias("tag")
+    return func.json_each(Task.tags).table_valued("value").alias("tag")
+
+
+def _grouped_selects(uid):
+    """Active tasks per (status, priority) and per (tag, status)."""
+    by_status = (
+        select(*_columns("status_priority", Task.status, Task.priority, func.count()))
+        .where(*_active(uid))
+        .group_by(Task.status, Task.priority)
+    )
+    tag = _tag_values()
+    by_tag = (
+        select(*_columns("tag", tag.c.value, Task.status, func.count()))
+        .select_from(Task).join(tag, true())
+        .where(*_active(uid), Task.tags.isnot(None))
+        .group_by(tag.c.value, Task.status)
+    )
+    return [by_status, by_tag]
+
+
+def _due_selects(uid, now, today_start, today_end):
+    """Open tasks past due, and open tasks due today (both read the (user_id, due_at) index)."""
+    open_ = Task.status.notin_(DONE_STATUSES)
+    overdue = select(*_columns("overdue", null(), null(), func.count())).where(
+        *_active(uid), open_, Task.due_at < now)
+    due_today = select(*_columns("due_today", null(), null(), func.count())).where(
+        *_active(uid), open_, Task.due_at >= today_start, Task.due_at < today_end)
+    return [overdue, due_today]
+
+
+def _counter_select(uid):
+    c = TaskCounter
+    return select(c.facet.label("facet"), c.key.label("key"), c.sub.label("sub"),
+                  c.count.label("n"), c.updated_at.label("updated_at")).where(c.user_id == uid)
+
+
+def _counters_fresh(rows, now):
+    ready = next((r for r in rows if r.facet == READY), None)
+    if ready is None or ready.updated_at is None:
+        return False
+    built = ready.updated_at if ready.updated_at.tzinfo else ready.updated_at.replace(tzinfo=timezone.utc)
+    return now - built < timedelta(seconds=Config.TASK_STATS_COUNTERS_TTL_SEC)
+
+
+def _store_counters(uid, rows, now):
+    """Replace the user's counters with the grouped rows just computed."""
+    db.session.execute(delete(TaskCounter).where(TaskCounter.user_id == uid))
+    values = [
+        {"user_id": uid, "facet": r.facet, "key": r.key or "", "sub": r.sub or "", "count": r.n, "updated_at": now}
+        for r in rows if r.facet in ("status_priority", "tag")
+    ]
+    values.append({"user_id": uid, "facet": READY, "key": "", "sub": "", "count": 0, "updated_at": now})
+    db.session.execute(TaskCounter.__table__.insert(), values)
+    db.session.commit()
+
+
+def for_user(uid, utc_offset=timedelta(0), now=None):
+    """
+    The user's task facets, from one UNION ALL statement: either grouped
+    aggregates over the tasks table, or (TASK_STATS_COUNTERS_ENABLED) the
+    user's counters rows. Overdue and due-today depend on the clock and are
+    always counted from the tasks table. `utc_offset` sets where "today"
+    starts and ends.
+    """
+    now = now or datetime.now(timezone.utc)
+    local = now + utc_offset
+    today_start = datetime(local.year, local.month, local.day, tzinfo=timezone.utc) - utc_offset
+    due = _due_selects(uid, now, today_start, today_start + timedelta(days=1))
+
+    source = "sql"
+    rows = None
+    if Config.TASK_STATS_COUNTERS_ENABLED:
+        rows = db.session.execute(union_all(_counter_select(uid), *due)).all()
+        if _counters_fresh(rows, now):
+            source = "counters"
+        else:
+            rows = None
+    if rows is None:
+        rows = db.session.execute(union_all(*_grouped_selects(uid), *due)).all()
+        if Config.TASK_STATS_COUNTERS_ENABLED:
+            _store_counters(uid, rows, now)
+
+    return _facets(rows, now, source)
+
+
+def _facets(rows, now, source):
+    by_status, by_priority, by_tag = Counter(), Counter(), {}
+    stats = {"overdue": 0, "due_today": 0}
+    for r in rows:
+        if not r.n:
+            continue
+        if r.facet == "status_priority":
+            by_status[r.key] += r.n
+            by_priority[r.sub or "none"] += r.n
+        elif r.facet == "tag":
+            tag = by_tag.setdefault(r.key, {"total": 0, "open": 0})
+            tag["total"] += r.n
+            if r.sub not in DONE_STATUSES:
+                tag["open"] += r.n
+        elif r.facet in stats:
+            stats[r.facet] = r.n
+    completed = sum(by_status[s] for s in DONE_STATUSES)
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "open": total - completed,
+        "completed": completed,
+        "overdue": stats["overdue"],
+        "due_today": stats["due_today"],
+        "by_status": dict(by_status),
+        "by_priority": dict(by_priority),
+        "by_tag": by_tag,
+        "source": source,
+        "as_of": now,
+    }
+
+
+def drop_counters(uid):
+    """
+    Forget a user's counters (rebuilt on the next read). For set-based
+    writes to tasks, which the flush hook does not see. The caller commits.
+    """
+    if Config.TASK_STATS_COUNTERS_ENABLED:
+        db.session.execute(delete(TaskCounter).where(TaskCounter.user_id == str(uid)))
+
+
+def _counted(values):
+    """The counter keys (facet, key, sub) a task with these values adds to."""
+    if values["user_id"] is None or values["deleted_at"] is not None:
+        return []
+    keys = [("status_priority", values["status"] or "", values["priority"] or "")]
+    tags = values["tags"] if isinstance(values["tags"], list) else []
+    keys += [("tag", str(t), values["status"] or "") for t in dict.fromkeys(tags)]
+    return keys
+
+
+def _values(state, old):
+    values = {}
+    for attr in COUNTED_ATTRS:
+        if old and attr in state.committed_state:
+            values[attr] = state.committed_state[attr]
+            if values[attr] is NO_VALUE:
+                return None  # changed without being loaded first: previous value unknown
+        else:
+            values[attr] = getattr(state.obj(), attr)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _count_deltas(session, flush_context):
+    if not Config.TASK_STATS_COUNTERS_ENABLED:
+        return
+    deltas, stale = Counter(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Task):
+            continue
+        state = db.inspect(obj)
+        before = None if obj in session.new else _values(state, old=True)
+        after = None if obj in session.deleted else _values(state, old=False)
+        if before is None and obj not in session.new:
+            stale.add(str(obj.user_id))
+            continue
+        for key in _counted(before) if before else []:
+            deltas[(str(before["user_id"]),) + key] -= 1
+        for key in _counted(after) if after else []:
+            deltas[(str(after["user_id"]),) + key] += 1
+
+    deltas = {k: d for k, d in deltas.items() if d}
+    users = {k[0] for k in deltas} | stale
+    if not users:
+        return
+    conn = session.connection()
+    if stale:
+        conn.execute(delete(TaskCounter).where(TaskCounter.user_id.in_(stale)))
+    # Only users whose counters are complete; the others are rebuilt on read
+    ready = set(conn.execute(select(TaskCounter.user_id).where(
+        TaskCounter.user_id.in_(users - stale), TaskCounter.facet == READY)).scalars())
+    rows = [{"user_id": uid, "facet": facet, "key": key, "sub": sub, "count": d}
+            for (uid, facet, key, sub), d in deltas.items() if uid in ready]
+    if rows:
+        conn.execute(_upsert_add(), rows)
+
+
+def _upsert_add():
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(TaskCounter)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "facet", "key", "sub"],
+        set_={"count": TaskCounter.count + stmt.excluded.count},
+    )
@@ -0,0 +1,153 @@
+import base64
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import abort
+from sqlalchemy import delete, event, insert, select, tuple_
+from sqlalchemy.orm import Session
+from config import Config
+from models import db, Task, TaskSync, TaskTombstone
+
+
+def _upsert():
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(TaskSync)
+
+
+def bump(uid, conn=None):
+    """
+    Advance the user's change sequence and return the new value. The user's
+    task_sync row stays locked until commit, so another transaction writing
+    the same user's tasks waits here and gets (and commits) the next value.
+    """
+    stmt = _upsert().values(user_id=uid, seq=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"], set_={"seq": TaskSync.seq + 1},
+    ).returning(TaskSync.seq)
+    return (conn or db.session).execute(stmt).scalar_one()
+
+
+def bump_all(uids):
+    """bump() for several users, in a fixed order so two writers cannot deadlock."""
+    return {uid: bump(uid) for uid in sorted(uids)}
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(session, flush_context, instances):
+    """Stamp ORM-written tasks with the next change_seq; keep tombstones for removed rows."""
+    touched = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task) and (obj in session.new or session.is_modified(obj)):
+            touched.setdefault(str(obj.user_id), []).append(obj)
+    removed = [obj for obj in session.deleted if isinstance(obj, Task)]
+    if not touched and not removed:
+        return
+
+    conn = session.connection()
+    seqs = {uid: bump(uid, conn) for uid in sorted(set(touched) | {str(t.user_id) for t in removed})}
+    for uid, tasks in touched.items():
+        for t in tasks:
+            t.change_seq = seqs[uid]
+    if removed:
+        now = datetime.now(timezone.utc)
+        conn.execute(insert(TaskTombstone), [
+            {"user_id": str(t.user_id), "task_id": t.id, "change_seq": seqs[str(t.user_id)], "removed_at": now}
+            for t in removed
+        ])
+        # Cursors older than the retention get 410, so older tombstones can go
+        conn.execute(delete(TaskTombstone).where(
+            TaskTombstone.user_id.in_({str(t.user_id) for t in removed}),
+            TaskTombstone.removed_at < now - timedelta(days=Config.TASK_TOMBSTONE_RETENTION_DAYS),
+        ))
+
+
+def encode_cursor(seq, last_id=None):
+    raw = json.dumps({"s": seq, "i": last_id, "t": int(time.time())}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (seq, last id or None, issued unix time)."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        last_id = data["i"]
+        return int(data["s"]), (int(last_id) if last_id is not None else None), int(data["t"])
+    except (ValueError, KeyError, TypeError):
+        abort(400, "invalid cursor")
+
+
+def refresh_cursor(token):
+    """
+    Re-issue an up-to-date cursor with the current time. Only for a cursor
+    that has nothing after it: any change made later gets a tombstone newer
+    than the new cursor, so it expires no earlier than that tombstone.
+    """
+    seq, last_id, _ = decode_cursor(token)
+    return encode_cursor(seq, last_id)
+
+
+def _after(seq_col, id_col, seq, last_id):
+    if last_id is None:
+        return seq_col > seq
+    return tuple_(seq_col, id_col) > tuple_(seq, last_id)
+
+
+def changes(uid, since=None, limit=500):
+    """
+    The user's tasks created, updated, deleted or restored after `since`
+    (and ids of rows removed outright), oldest change first, at most `limit`.
+    Returns None when nothing changed: the steady-state poll reads only the
+    user's task_sync row (the caller hands back refresh_cursor(since) so an
+    idle client's cursor never ages out). Without `since`, returns all
+    active tasks.
+    """
+    seq, last_id = -1, None
+    if since:
+        seq, last_id, issued = decode_cursor(since)
+        if time.time() - issued > Config.TASK_TOMBSTONE_RETENTION_DAYS * 86400:
+            abort(410, "cursor expired; sync again without since")
+
+    # Changes up to the committed sequence value: every write numbered at or
+    # below it has committed, since bump() holds the row until commit
+    current = db.session.execute(select(TaskSync.seq).where(TaskSync.user_id == uid)).scalar() or 0
+    if since and last_id is None and current <= seq:
+        return None
+
+    tasks_q = Task.query.filter(
+        Task.user_id == uid,
+        Task.change_seq <= current,
+        _after(Task.change_seq, Task.id, seq, last_id),
+    )
+    if not since:
+        tasks_q = tasks_q.filter(Task.deleted_at.is_(None))
+    tasks = tasks_q.order_by(Task.change_seq, Task.id).limit(limit + 1).all()
+
+    removed = []
+    if since:
+        removed = db.session.execute(
+            select(TaskTombstone.change_seq, TaskTombstone.task_id)
+            .where(
+                TaskTombstone.user_id == uid,
+                TaskTombstone.change_seq <= current,
+                _after(TaskTombstone.change_seq, TaskTombstone.task_id, seq, last_id),
+            )
+            .order_by(TaskTombstone.change_seq, TaskTombstone.task_id)
+            .limit(limit + 1)
+        ).all()
+
+    merged = sorted([((t.change_seq, t.id), t) for t in tasks] + [((r.change_seq, r.task_id), None) for r in removed],
+                    key=lambda pair: pair[0])
+    page, has_more = merged[:limit], len(merged) > limit
+
+    # A full page resumes after its last row; the last page jumps to `current`
+    cursor = encode_cursor(*page[-1][0]) if has_more else encode_cursor(current)
+    return {
+        "changes": [t.to_dict() for _, t in page if t is not None],
+        "removed": [key[1] for key, t in page if t is None],
+        "cursor": cursor,
+        "has_more": has_more,
+    }
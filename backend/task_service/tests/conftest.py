@@ -8,6 +8,9 @@ if BASE_DIR not in sys.path:
 
 os.environ["TASK_DATABASE_URL"] = "sqlite:///:memory:"
 os.environ["DEBUG"] = "True"
+os.environ["OUTBOX_RELAY_ENABLED"] = "False"
+os.environ["TASK_RECURRING_RUNNER_ENABLED"] = "False"
+os.environ["TASK_OPS_TOKEN"] = "test-ops"
 
 from app import create_app
 from models import db
@@ -0,0 +1,89 @@
+# tests/test_bulk.py
+from models import db, Task, Outbox
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def _bulk(client, body, headers=H):
+    return client.post(f"{API}/tasks/bulk", json=body, headers=headers)
+
+def _create(client, n):
+    r = _bulk(client, {"action": "create", "items": [{"title": f"T{i}", "points": 5} for i in range(n)]})
+    assert r.status_code == 200
+    return [item["id"] for item in r.get_json()["results"]]
+
+def test_bulk_create_reports_invalid_items(client):
+    r = _bulk(client, {"action": "create", "items": [{"title": "a"}, {"priority": "low"}, {"title": "c", "priority": "urgent"}]})
+    data = r.get_json()
+    assert r.status_code == 200 and data["succeeded"] == 1 and data["failed"] == 2
+    assert [x["status"] for x in data["results"]] == ["ok", "invalid", "invalid"]
+    assert data["results"][1]["error"] == "title is required"
+    assert Task.query.filter_by(user_id="u1").count() == 1
+
+def test_bulk_delete_restore_start(client):
+    ids = _create(client, 3)
+    other = _create(client, 1)[0]
+    # another user's task is not found
+    r = _bulk(client, {"action": "delete", "ids": ids[:2] + [other]}, headers={"X-User-Id": "u2"})
+    assert [x["status"] for x in r.get_json()["results"]] == ["not_found"] * 3
+
+    r = _bulk(client, {"action": "delete", "ids": ids[:2]}).get_json()
+    assert r["succeeded"] == 2
+    listed = client.get(f"{API}/tasks", headers=H).get_json()
+    assert {t["id"] for t in listed["items"]} == {ids[2], other} and listed["total"] == 2
+
+    r = _bulk(client, {"action": "restore", "ids": ids}).get_json()
+    assert [x["status"] for x in r["results"]] == ["ok", "ok", "skipped"]
+
+    client.post(f"{API}/tasks/{ids[0]}/start", headers=H)
+    r = _bulk(client, {"action": "start", "ids": ids}).get_json()
+    assert [x["status"] for x in r["results"]] == ["skipped", "ok", "ok"]
+    assert {db.session.get(Task, i).status for i in ids} == {"in_progress"}
+
+    # one batched gateway event per call that changed something
+    events = Outbox.query.filter_by(destination="gateway").all()
+    assert [e.payload["action"] for e in events] == ["create", "create", "delete", "restore", "start"]
+    assert events[2].payload["task_ids"] == ids[:2]
+
+def test_bulk_complete_enqueues_each_completion_once(client):
+    ids = _create(client, 3)
+    r = _bulk(client, {"action": "complete", "ids": ids[:2]}).get_json()
+    assert r["succeeded"] == 2
+    r = _bulk(client, {"action": "complete", "ids": ids}).get_json()
+    assert r["succeeded"] == 3
+    rows = Outbox.query.filter_by(destination="pet").order_by(Outbox.task_id).all()
+    assert [row.task_id for row in rows] == ids
+    assert all(row.payload["points"] == 5 for row in rows)
+    assert all(db.session.get(Task, i).completed_at is not None for i in ids)
+
+def test_bulk_patch_and_validation(client):
+    ids = _create(client, 2)
+    r = _bulk(client, {"action": "patch", "ids": ids, "changes": {"priority": "high", "tags": ["feeding"]}})
+    assert r.status_code == 200
+    assert {(t.priority, tuple(t.tags)) for t in Task.query.all()} == {("high", ("feeding",))}
+
+    assert _bulk(client, {"action": "patch", "ids": ids, "changes": {"status": "done"}}).status_code == 400
+    assert _bulk(client, {"action": "patch", "ids": ids, "changes": {"user_id": "u2"}}).status_code == 400
+    assert _bulk(client, {"action": "archive", "ids": ids}).status_code == 400
+    assert _bulk(client, {"action": "delete", "ids": []}).status_code == 400
+    assert _bulk(client, {"action": "delete", "ids": ["x"]}).status_code == 400
+    assert _bulk(client, {"action": "delete", "ids": list(range(501))}).status_code == 413
+
+def test_lookup_by_ids(client):
+    ids = _create(client, 3)
+    _bulk(client, {"action": "delete", "ids": [ids[1]]})
+    _bulk(client, {"action": "complete", "ids": [ids[2]]})
+    asked = [ids[2], 999, ids[1], ids[0]]
+
+    r = client.post(f"{API}/tasks/lookup", json={"ids": asked}, headers=H).get_json()
+    assert [t["id"] for t in r["items"]] == [ids[2], ids[0]] and r["missing"] == [999, ids[1]]
+    assert r["items"][0]["title"] == "T2"
+
+    r = client.post(f"{API}/tasks/lookup", json={"ids": asked, "include_deleted": True, "compact": True}, headers=H).get_json()
+    assert r["missing"] == [999]
+    assert r["items"][0] == {"id": ids[2], "status": "completed", "deleted_at": None}
+    assert set(r["items"][1]) == {"id", "status", "deleted_at"} and r["items"][1]["deleted_at"]
+
+    # other users' tasks are never returned
+    r = client.post(f"{API}/tasks/lookup", json={"ids": ids}, headers={"X-User-Id": "u2"}).get_json()
+    assert r["items"] == [] and r["missing"] == ids
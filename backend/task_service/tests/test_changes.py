@@ -0,0 +1,120 @@
+# tests/test_changes.py
+from sqlalchemy import event, text
+from config import Config
+from models import db, Task
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def _create(client, title, headers=H):
+    return client.post(f"{API}/tasks", json={"title": title}, headers=headers).get_json()["id"]
+
+def _changes(client, since=None, limit=None):
+    url = f"{API}/tasks/changes?" + "&".join(
+        f"{k}={v}" for k, v in (("since", since), ("limit", limit)) if v is not None)
+    return client.get(url, headers=H)
+
+def _selects(client, since):
+    seen = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        seen.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        r = _changes(client, since)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    return r, seen
+
+def test_initial_sync_then_empty_polls(client):
+    a, b = _create(client, "A"), _create(client, "B")
+    _create(client, "not mine", headers={"X-User-Id": "u2"})
+    client.delete(f"{API}/tasks/{b}", headers=H)
+
+    first = _changes(client).get_json()
+    assert [t["id"] for t in first["changes"]] == [a] and first["removed"] == [] and not first["has_more"]
+
+    r, seen = _selects(client, first["cursor"])
+    assert r.status_code == 204 and r.data == b""
+    assert len(seen) == 1 and "task_sync" in seen[0][0]
+
+def test_changes_cover_updates_deletes_restores_and_removals(client):
+    a, b, c = _create(client, "A"), _create(client, "B"), _create(client, "C")
+    cursor = _changes(client).get_json()["cursor"]
+
+    client.patch(f"{API}/tasks/{a}", json={"title": "A2"}, headers=H)
+    client.delete(f"{API}/tasks/{b}", headers=H)
+    d = _create(client, "D")
+    db.session.delete(db.session.get(Task, c))
+    db.session.commit()
+
+    r = _changes(client, cursor).get_json()
+    by_id = {t["id"]: t for t in r["changes"]}
+    assert set(by_id) == {a, b, d} and r["removed"] == [c]
+    assert by_id[a]["title"] == "A2" and by_id[b]["deleted_at"] is not None
+
+    client.post(f"{API}/tasks/{b}/restore", headers=H)
+    r = _changes(client, r["cursor"]).get_json()
+    assert [t["id"] for t in r["changes"]] == [b] and r["changes"][0]["deleted_at"] is None
+    assert _changes(client, r["cursor"]).status_code == 204
+
+def test_pages_through_one_bulk_change(client):
+    ids = [_create(client, f"T{i}") for i in range(5)]
+    cursor = _changes(client).get_json()["cursor"]
+    client.post(f"{API}/tasks/bulk", json={"action": "start", "ids": ids}, headers=H)
+
+    seen = []
+    while True:
+        r = _changes(client, cursor, limit=2).get_json()
+        seen += [t["id"] for t in r["changes"]]
+        cursor = r["cursor"]
+        if not r["has_more"]:
+            break
+    assert seen == ids
+    assert _changes(client, cursor).status_code == 204
+
+def test_bad_and_expired_cursors(client, monkeypatch):
+    _create(client, "A")
+    cursor = _changes(client).get_json()["cursor"]
+    assert _changes(client, "nonsense").status_code == 400
+    monkeypatch.setattr(Config, "TASK_TOMBSTONE_RETENTION_DAYS", -1)
+    assert _changes(client, cursor).status_code == 410
+
+def test_idle_polls_refresh_the_cursor(client, monkeypatch):
+    import sync, types
+    clock = [1_000_000_000.0]
+    monkeypatch.setattr(sync, "time", types.SimpleNamespace(time=lambda: clock[0]))
+    day = 86400
+    retention = Config.TASK_TOMBSTONE_RETENTION_DAYS * day
+
+    _create(client, "A")
+    cursor = _changes(client).get_json()["cursor"]
+    clock[0] += retention - day
+    r = _changes(client, cursor)
+    assert r.status_code == 204
+    refreshed = r.headers["X-Sync-Cursor"]
+
+    # the original cursor ages out, the refreshed one (nothing changed since) does not
+    clock[0] += 2 * day
+    assert _changes(client, cursor).status_code == 410
+    assert _changes(client, refreshed).status_code == 204
+
+    b = _create(client, "B")
+    r = _changes(client, refreshed).get_json()
+    assert [t["id"] for t in r["changes"]] == [b]
+
+def test_limit_must_be_an_integer(client):
+    assert _changes(client, limit="abc").status_code == 400
+    assert _changes(client, limit=0).status_code == 200
+
+def test_changes_query_reads_the_change_seq_index(client):
+    for i in range(30):
+        _create(client, f"T{i}", headers={"X-User-Id": f"u{i % 3}"})
+    cursor = _changes(client).get_json()["cursor"]
+    _create(client, "new")
+    db.session.execute(text("ANALYZE"))
+    r, seen = _selects(client, cursor)
+    assert r.status_code == 200
+    sql, params = next(q for q in seen if q[0].startswith("SELECT tasks.id"))
+    plan = " | ".join(row[3] for row in db.session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {sql}", tuple(params)))
+    assert "USING INDEX ix_tasks_user_change_seq " in plan and "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,45 @@
+# tests/test_fields.py
+from sqlalchemy import event
+from models import db
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def _seed(client, n):
+    return [client.post(f"{API}/tasks", json={"title": f"T{i}", "description": "x" * 500, "tags": ["feeding"]},
+                        headers=H).get_json()["id"] for i in range(n)]
+
+def _selects(client, url):
+    seen = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT tasks."):
+            seen.append(statement)
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        r = client.get(url, headers=H)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    return r, seen
+
+def test_list_fields_limit_select_and_payload(client):
+    _seed(client, 3)
+    r, seen = _selects(client, f"{API}/tasks?fields=title,status")
+    assert r.status_code == 200
+    assert all(set(t) == {"id", "title", "status"} for t in r.get_json()["items"])
+    assert len(seen) == 1 and "description" not in seen[0] and "tasks.title" in seen[0]
+
+    # cursor pages load the sort key for next_cursor without returning it
+    r, seen = _selects(client, f"{API}/tasks?fields=title&cursor=&sort=due_at&limit=2")
+    data = r.get_json()
+    assert data["next_cursor"] and set(data["items"][0]) == {"id", "title"}
+    assert "tasks.due_at" in seen[0] and "description" not in seen[0]
+    nxt = client.get(f"{API}/tasks?fields=title&cursor={data['next_cursor']}&sort=due_at&limit=2", headers=H).get_json()
+    assert len(nxt["items"]) == 1
+
+def test_detail_fields_and_unknown_field(client):
+    tid = _seed(client, 1)[0]
+    r, seen = _selects(client, f"{API}/tasks/{tid}?fields=tags,due_at")
+    assert r.get_json() == {"id": tid, "tags": ["feeding"], "due_at": r.get_json()["due_at"]}
+    assert "description" not in seen[0]
+    assert client.get(f"{API}/tasks/{tid}", headers=H).get_json()["description"] == "x" * 500
+    assert client.get(f"{API}/tasks?fields=title,secret", headers=H).status_code == 400
@@ -0,0 +1,30 @@
+# tests/test_json_provider.py
+import json
+from datetime import datetime, timezone
+from shared import json_provider
+from shared.json_provider import FastJSONProvider, stream_list
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def test_datetimes_are_iso_8601_with_either_encoder(app, monkeypatch):
+    assert isinstance(app.json, FastJSONProvider)
+    at = datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc)
+    fast = app.json.dumps({"at": at, "day": at.date()})
+    monkeypatch.setattr(json_provider, "orjson", None)
+    assert json.loads(app.json.dumps({"at": at, "day": at.date()})) == json.loads(fast) == {
+        "at": "2026-03-01T09:30:00+00:00", "day": "2026-03-01"}
+
+def test_task_datetimes_round_trip(client):
+    due = "2026-03-01T09:30:00+00:00"
+    t = client.post(f"{API}/tasks", json={"title": "Walk", "due_at": due}, headers=H).get_json()
+    # SQLite hands back naive datetimes, Postgres aware ones
+    assert t["due_at"].startswith("2026-03-01T09:30:00")
+    assert datetime.fromisoformat(t["created_at"])
+
+def test_stream_list_is_one_json_document(app):
+    with app.test_request_context():
+        r = stream_list(range(250), lambda i: {"i": i}, total=250)
+        body = b"".join(r.response)
+    assert r.is_streamed and r.mimetype == "application/json"
+    assert json.loads(body) == {"total": 250, "items": [{"i": i} for i in range(250)]}
@@ -0,0 +1,74 @@
+# tests/test_pagination.py
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def _seed(client, n):
+    for i in range(n):
+        # a few shared due dates to exercise the id tiebreaker, and no-due tasks
+        client.post(f"{API}/tasks", json={"title": f"T{i:02d}", "due_at": f"2030-01-0{1 + i % 3}T10:00:00Z"}, headers=H)
+
+def _walk(client, query):
+    ids, cursor, pages = [], "", 0
+    while cursor is not None:
+        r = client.get(f"{API}/tasks?{query}&limit=4&cursor={cursor}", headers=H)
+        assert r.status_code == 200
+        data = r.get_json()
+        ids += [t["id"] for t in data["items"]]
+        cursor, pages = data["next_cursor"], pages + 1
+    return ids, pages
+
+def test_cursor_pages_match_offset_order(client):
+    _seed(client, 11)
+    for sort in ("-id", "due_at", "-due_at", "title"):
+        ids, pages = _walk(client, f"sort={sort}")
+        tiebreak = "-id" if sort.startswith("-") else "id"
+        offset_page = client.get(f"{API}/tasks?sort={sort},{tiebreak}&limit=100", headers=H).get_json()
+        expected = [t["id"] for t in offset_page["items"]]
+        assert ids == expected and len(ids) == 11 and pages == 3
+
+def test_cursor_total_modes_and_errors(client):
+    _seed(client, 5)
+    r = client.get(f"{API}/tasks?cursor=&limit=2", headers=H).get_json()
+    assert r["total"] is None and r["has_more"]
+    r = client.get(f"{API}/tasks?cursor=&limit=2&total=cached", headers=H).get_json()
+    assert r["total"] == 5
+    # the cached count is dropped when the user's tasks change
+    client.post(f"{API}/tasks", json={"title": "new"}, headers=H)
+    assert client.get(f"{API}/tasks?cursor=&total=cached", headers=H).get_json()["total"] == 6
+    assert client.get(f"{API}/tasks?cursor=&total=estimate", headers=H).get_json()["total"] == 6
+
+    assert client.get(f"{API}/tasks?cursor=garbage", headers=H).status_code == 400
+    assert client.get(f"{API}/tasks?cursor=&sort=status", headers=H).status_code == 400
+    first = client.get(f"{API}/tasks?cursor=&limit=2&sort=title", headers=H).get_json()["next_cursor"]
+    assert client.get(f"{API}/tasks?cursor={first}&sort=-id", headers=H).status_code == 400
+
+def test_cursor_pages_cross_into_the_null_tail(client):
+    _seed(client, 5)
+    for i in range(6):
+        client.post(f"{API}/tasks", json={"title": f"N{i}"}, headers=H)
+    for sort in ("due_at", "-due_at"):
+        ids, pages = _walk(client, f"sort={sort}")
+        tiebreak = "-id" if sort.startswith("-") else "id"
+        expected = [t["id"] for t in client.get(f"{API}/tasks?sort={sort},{tiebreak}&limit=100",
+                                                headers=H).get_json()["items"]]
+        assert ids == expected and len(ids) == 11 and pages == 3
+
+def test_cursor_predicates_are_index_ranges(client):
+    from sqlalchemy import event
+    from models import db
+    _seed(client, 6)
+    client.post(f"{API}/tasks", json={"title": "no due"}, headers=H)
+    cursor = client.get(f"{API}/tasks?cursor=&sort=due_at&limit=2", headers=H).get_json()["next_cursor"]
+    seen = []
+    def capture(conn, cur, statement, parameters, context, executemany):
+        if statement.startswith("SELECT tasks.id"):
+            seen.append(statement)
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        client.get(f"{API}/tasks?cursor={cursor}&sort=due_at&limit=10", headers=H)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    # A (due_at, id) row-value range, then the NULL tail: no OR for the planner to give up on
+    keyed, tail = seen
+    assert "(tasks.due_at, tasks.id) > (" in keyed and " OR " not in keyed
+    assert "tasks.due_at IS NULL" in tail and " OR " not in tail
@@ -0,0 +1,88 @@
+# tests/test_query_plans.py
+# Plan regression: the hot list_tasks queries must be answered from the
+# partial (user_id, <key>, id) indexes, already in order, without a table scan.
+from sqlalchemy import event, text
+from models import db
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+# SQLite appends the rowid (= id) to every index, so for the id sort the plain
+# user_id index is an equally good (user_id, id) index
+HOT_QUERIES = {
+    "cursor=&sort=-id": ("ix_tasks_active_user_id", "ix_tasks_user_id"),
+    "cursor=&sort=due_at": ("ix_tasks_active_user_due_at",),
+    "cursor=&sort=-created_at": ("ix_tasks_active_user_created_at",),
+    "cursor=&sort=priority": ("ix_tasks_active_user_priority",),
+    "cursor=&sort=title": ("ix_tasks_active_user_title",),
+    "status=done&sort=-id": ("ix_tasks_active_user_status",),
+}
+
+def _seed(client):
+    for i in range(30):
+        client.post(f"{API}/tasks", json={"title": f"T{i:02d}", "priority": ("low", "high")[i % 2],
+                                          "due_at": f"2030-01-{1 + i % 28:02d}T10:00:00Z"},
+                    headers={"X-User-Id": f"u{i % 3}"})
+
+def _list_select(client, query):
+    """Run GET /tasks?<query> and return the SQL and parameters of its page SELECT."""
+    seen = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT tasks.id"):
+            seen.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(f"{API}/tasks?{query}", headers=H).status_code == 200
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    return seen[0]
+
+def test_list_queries_use_active_indexes(client):
+    _seed(client)
+    db.session.execute(text("ANALYZE"))
+    for query, indexes in HOT_QUERIES.items():
+        sql, params = _list_select(client, query)
+        rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params))
+        plan = " | ".join(row[3] for row in rows)
+        assert any(f"USING INDEX {index} " in plan for index in indexes), f"{query}: {plan}"
+        assert "TEMP B-TREE" not in plan, f"{query} sorts outside the index: {plan}"
+
+def _pg_keys(clauses):
+    """Postgres rendering of ORDER BY / index key expressions, without the table prefix."""
+    from sqlalchemy.dialects import postgresql
+    return [str(c.compile(dialect=postgresql.dialect())).replace("tasks.", "") for c in clauses]
+
+def test_cursor_orders_match_a_postgres_index_in_either_direction(app):
+    # No Postgres here, so compare the ORDER BY of every cursor sort with the
+    # index definitions: a forward scan must produce it exactly, or a
+    # backward scan must (Postgres flips ASC NULLS LAST to DESC NULLS FIRST).
+    from models import Task
+    from pagination import KEYSET_COLUMNS, keyset_queries
+    flip = {"ASC": "DESC", "DESC": "ASC", "NULLS LAST": "NULLS FIRST", "NULLS FIRST": "NULLS LAST"}
+
+    def normalized(key):
+        # Postgres defaults: ASC is NULLS LAST, DESC is NULLS FIRST
+        key = key if " DESC" in key or " ASC" in key else key + " ASC"
+        if "NULLS" not in key:
+            key += " NULLS LAST" if key.endswith("ASC") else " NULLS FIRST"
+        return key
+
+    def backwards(key):
+        column, direction, nulls = key.split(" ", 2)
+        return f"{column} {flip[direction]} {flip[nulls]}"
+
+    indexes = [[normalized(k) for k in _pg_keys(ix.expressions)]
+               for ix in Task.__table__.indexes if ix.name.startswith("ix_tasks_active_user_")]
+    scans = indexes + [[backwards(k) for k in ix] for ix in indexes]
+    for key in KEYSET_COLUMNS:
+        for descending in (False, True):
+            name = f"{'-' if descending else ''}{key}"
+            keyed, *tail = keyset_queries(Task.query, key, descending)
+            order = ["user_id ASC NULLS LAST"] + [normalized(k) for k in _pg_keys(keyed._order_by_clauses)]
+            # user_id is fixed by the filter, so its direction does not matter
+            assert any(scan[1:] == order[1:] and len(scan) == len(order) for scan in scans), f"{name}: {order}"
+            for query in tail:
+                # The NULL tail fixes the key too: (user_id, key, id) gives the id order
+                order = [normalized(k) for k in _pg_keys(query._order_by_clauses)]
+                assert any(scan[-1:] == order and scan[1].startswith(f"{key} ") for scan in scans), \
+                    f"{name} NULL tail: {order}"
@@ -0,0 +1,96 @@
+# tests/test_recurrence.py
+from datetime import datetime, timedelta, timezone
+from models import db, Task
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+OPS = {"X-Ops-Token": "test-ops"}
+
+def _iso(dt):
+    return dt.isoformat().replace("+00:00", "Z")
+
+# One clock reading for the module, so times built in one test line up to the second
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+def _day(days):
+    # an hour in the past, so "today + 7 days" is always inside the 7 day horizon
+    return NOW + timedelta(days=days, hours=-1)
+
+def test_create_stores_rule_and_horizon_only(client):
+    # three years of daily repeats: only the horizon (7 days) becomes rows
+    r = client.post(f"{API}/tasks", json={"title": "Feed", "due_at": _iso(_day(0)),
+                                          "repeat_every": "daily", "repeat_until": _iso(_day(3 * 365))}, headers=H)
+    assert r.status_code == 201
+    head = r.get_json()
+    assert head["is_recurring_template"] and head["occurrence_at"]
+    rows = Task.query.filter_by(recurrence_parent_id=head["id"]).count()
+    assert rows == 7
+
+    # the runner rolls the horizon forward without duplicating rows
+    assert client.post(f"{API}/tasks/recurring/run", headers=OPS).get_json()["count"] == 0
+    assert Task.query.filter_by(recurrence_parent_id=head["id"]).count() == rows
+
+def test_occurrences_window_expands_virtually(client):
+    head = client.post(f"{API}/tasks", json={"title": "Clean", "due_at": _iso(_day(0)), "repeat_every": "weekly"},
+                       headers=H).get_json()
+    r = client.get(f"{API}/tasks/occurrences?from={_iso(_day(-1))}&to={_iso(_day(70))}", headers=H)
+    items = r.get_json()["items"]
+    assert len(items) == 10
+    assert [i["virtual"] for i in items[:2]] == [False, False] and all(i["virtual"] for i in items[2:])
+    assert all(i["recurrence_parent_id"] == head["id"] for i in items[1:])
+    assert items[5]["due_at"].startswith(_day(35).date().isoformat())
+    # windows far from the anchor are computed directly and are bounded
+    far = client.get(f"{API}/tasks/occurrences?from={_iso(_day(3000))}&to={_iso(_day(3014))}", headers=H)
+    assert len(far.get_json()["items"]) == 2
+    assert client.get(f"{API}/tasks/occurrences?from={_iso(_day(0))}&to={_iso(_day(900))}", headers=H).status_code == 400
+
+def test_materialize_override_replaces_virtual_occurrence(client):
+    head = client.post(f"{API}/tasks", json={"title": "Play", "due_at": _iso(_day(0)), "repeat_every": "weekly"},
+                       headers=H).get_json()
+    at = _iso(_day(28))
+    r = client.post(f"{API}/tasks/{head['id']}/occurrences", json={"occurrence_at": at}, headers=H)
+    assert r.status_code == 201
+    override = r.get_json()
+    assert client.post(f"{API}/tasks/{head['id']}/occurrences", json={"occurrence_at": at}, headers=H).status_code == 200
+    assert client.post(f"{API}/tasks/{head['id']}/occurrences", json={"occurrence_at": _iso(_day(29))},
+                       headers=H).status_code == 400
+
+    client.post(f"{API}/tasks/{override['id']}/complete", headers=H)
+    items = client.get(f"{API}/tasks/occurrences?from={_iso(_day(27))}&to={_iso(_day(29))}", headers=H).get_json()["items"]
+    assert len(items) == 1 and items[0]["id"] == override["id"] and items[0]["status"] == "completed"
+
+    # a deleted override is not brought back as a virtual occurrence
+    client.delete(f"{API}/tasks/{override['id']}", headers=H)
+    assert client.get(f"{API}/tasks/occurrences?from={_iso(_day(27))}&to={_iso(_day(29))}", headers=H).get_json()["items"] == []
+
+def test_monthly_series_keeps_day_of_month(client):
+    head = client.post(f"{API}/tasks", json={"title": "Vet", "due_at": "2031-01-31T10:00:00Z", "repeat_every": "monthly",
+                                             "repeat_until": "2031-05-31T10:00:00Z"}, headers=H).get_json()
+    items = client.get(f"{API}/tasks/occurrences?from=2031-01-01T00:00:00Z&to=2031-12-31T00:00:00Z", headers=H).get_json()["items"]
+    assert [i["due_at"][:10] for i in items] == ["2031-01-31", "2031-02-28", "2031-03-31", "2031-04-30", "2031-05-31"]
+    assert items[0]["id"] == head["id"]
+
+def test_runner_catches_up_in_chunks(client):
+    import recurrence
+    heads = [client.post(f"{API}/tasks", json={"title": f"S{i}", "due_at": _iso(_day(-30)), "repeat_every": "daily"},
+                         headers=H).get_json()["id"] for i in range(5)]
+    # forget everything after the head, as if the runner had been down for a month
+    Task.query.filter(Task.recurrence_parent_id.in_(heads)).delete(synchronize_session=False)
+    for head in Task.query.filter(Task.id.in_(heads)):
+        head.next_occurrence_at = head.due_at + timedelta(days=1)
+    db.session.commit()
+    # one override already stored is kept, not duplicated
+    client.post(f"{API}/tasks/{heads[0]}/occurrences", json={"occurrence_at": _iso(_day(-10))}, headers=H)
+
+    recurrence.runner.chunk_size = 2
+    try:
+        r = client.post(f"{API}/tasks/recurring/run", headers=OPS).get_json()
+    finally:
+        recurrence.runner.chunk_size = 200
+    assert r["heads"] == 5 and r["chunks"] == 3
+    assert r["spawned"] == 5 * 37 - 1 and r["max_lag_sec"] >= 29 * 86400
+    assert Task.query.filter(Task.recurrence_parent_id.in_(heads)).count() == 5 * 37
+    assert client.post(f"{API}/tasks/recurring/run", headers=OPS).get_json()["spawned"] == 0
+
+    stats = client.get(f"{API}/tasks/recurring/stats", headers=OPS).get_json()
+    assert stats["totals"]["spawned"] >= 5 * 37 - 1 and stats["last_run"]["spawned"] == 0
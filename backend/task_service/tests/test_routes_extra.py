@@ -1,5 +1,7 @@
 # tests/test_routes_extra.py
+from datetime import datetime
 API = "/api/v1"
+OPS = {"X-Ops-Token": "test-ops"}
 
 def test_create_without_title(client):
     r = client.post(f"{API}/tasks", json={"description": "missing title"})
@@ -62,22 +64,91 @@ def test_list_filters_sort_pagination(client):
 
 def test_complete_idempotent_and_event_flag(client, monkeypatch):
     # fake pet-service
-    class FakeResp: ok=True
+    class FakeResp: ok=True; status_code=200
     calls = {"n": 0}
     def fake_post(*a, **k):
         calls["n"] += 1
         return FakeResp()
-    import routes
-    monkeypatch.setattr(routes.requests, "post", fake_post)
+    import outbox
+    from models import db, Task
+    monkeypatch.setattr(outbox.requests, "post", fake_post)
+    H = {"X-User-Id": "u1"}
 
-    r = client.post("/api/v1/tasks", json={"title":"X","points":10})
+    r = client.post("/api/v1/tasks", json={"title":"X","points":10}, headers=H)
     tid = r.get_json()["id"]
 
-    # first complete -> send event once
-    r = client.post(f"/api/v1/tasks/{tid}/complete")
+    # completing only writes the outbox row, twice completed -> still one row
+    r = client.post(f"/api/v1/tasks/{tid}/complete", headers=H)
     assert r.status_code == 200
   
-    r = client.post(f"/api/v1/tasks/{tid}/complete")
+    r = client.post(f"/api/v1/tasks/{tid}/complete", headers=H)
     assert r.status_code == 200
+    assert calls["n"] == 0
+
+    # the relay sends the event once and marks the task
+    r = client.post("/api/v1/tasks/outbox/relay", headers=OPS)
+    assert r.get_json() == {"delivered": 1, "failed": 0}
+    client.post("/api/v1/tasks/outbox/relay", headers=OPS)
     assert calls["n"] == 1
+    assert db.session.get(Task, tid).completed_event_emitted_at is not None
+
+def test_outbox_retries_failed_delivery(client, monkeypatch):
+    import outbox
+    from models import Outbox
+    monkeypatch.setattr(outbox.event_client, "emit_many", lambda events: [False] * len(events))
+    H = {"X-User-Id": "u1"}
+
+    tid = client.post("/api/v1/tasks", json={"title":"Y"}, headers=H).get_json()["id"]
+    assert client.delete(f"/api/v1/tasks/{tid}", headers=H).status_code == 204
+
+    r = client.post("/api/v1/tasks/outbox/relay", headers=OPS)
+    assert r.get_json() == {"delivered": 0, "failed": 1}
+    row = Outbox.query.filter_by(task_id=tid).one()
+    assert row.event_type == "task_deleted" and row.delivered_at is None and row.attempts == 1
+
+    # backed off: not due again yet
+    r = client.post("/api/v1/tasks/outbox/relay", headers=OPS)
+    assert r.get_json() == {"delivered": 0, "failed": 0}
+
+def test_outbox_relay_sends_outside_the_transaction(client, monkeypatch):
+    import outbox
+    from models import db, Outbox
+    seen = {}
+    def fake_emit_many(events):
+        # rows are leased and committed before anything is sent
+        seen["in_transaction"] = db.session().in_transaction()
+        seen["leased"] = Outbox.query.one().available_at.replace(tzinfo=None) > datetime.utcnow()
+        return [True] * len(events)
+    monkeypatch.setattr(outbox.event_client, "emit_many", fake_emit_many)
+    H = {"X-User-Id": "u1"}
+
+    tid = client.post("/api/v1/tasks", json={"title":"Z"}, headers=H).get_json()["id"]
+    client.delete(f"/api/v1/tasks/{tid}", headers=H)
+    assert client.post("/api/v1/tasks/outbox/relay", headers=OPS).get_json() == {"delivered": 1, "failed": 0}
+    assert seen == {"in_transaction": False, "leased": True}
+    row = Outbox.query.one()
+    assert row.delivered_at is not None and row.attempts == 1
+
+def test_operator_endpoints_need_the_ops_token(client):
+    assert client.post("/api/v1/tasks/outbox/relay").status_code == 403
+    assert client.post("/api/v1/tasks/outbox/relay", headers={"X-Ops-Token": "nope"}).status_code == 403
+    assert client.post("/api/v1/tasks/recurring/run", headers={"X-User-Id": "u1"}).status_code == 403
+
+def test_outbox_enqueue_skips_keys_already_queued(app):
+    import outbox
+    from models import db, Task, Outbox
+    assert outbox.enqueue("pet", "TASK_COMPLETED", {"n": 1}, task_id=1, idempotency_key="task:1:completed")
+    db.session.commit()
 
+    # Same key again (as a racing transaction would): skipped by ON CONFLICT, the caller's write commits
+    db.session.add(Task(user_id="u1", title="kept"))
+    assert not outbox.enqueue("pet", "TASK_COMPLETED", {"n": 2}, task_id=1, idempotency_key="task:1:completed")
+    assert outbox.enqueue_many("pet", [
+        ("TASK_COMPLETED", {"n": 3}, 1, "task:1:completed"),
+        ("TASK_COMPLETED", {"n": 4}, 2, "task:2:completed"),
+        ("TASK_COMPLETED", {"n": 5}, 2, "task:2:completed"),
+        ("task_deleted", {"n": 6}, 2, None),
+    ]) == 2
+    db.session.commit()
+    assert Task.query.filter_by(title="kept").count() == 1
+    assert sorted(row.payload["n"] for row in Outbox.query) == [1, 4, 6]
@@ -0,0 +1,18 @@
+# tests/test_search.py
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def test_query_matches_substrings_and_ranks_title_first(client):
+    client.post(f"{API}/tasks", json={"title": "Groceries", "description": "buy dog food"}, headers=H)
+    client.post(f"{API}/tasks", json={"title": "Walk the dog", "description": "around the park"}, headers=H)
+    client.post(f"{API}/tasks", json={"title": "Laundry"}, headers=H)
+
+    r = client.get(f"{API}/tasks?query=dog", headers=H)
+    assert r.status_code == 200
+    assert [t["title"] for t in r.get_json()["items"]] == ["Walk the dog", "Groceries"]
+
+    # substring inside a word, explicit sort still wins over relevance
+    r = client.get(f"{API}/tasks?query=rocer&sort=title", headers=H)
+    assert [t["title"] for t in r.get_json()["items"]] == ["Groceries"]
+
+    assert client.get(f"{API}/tasks?sort=relevance", headers=H).status_code == 400
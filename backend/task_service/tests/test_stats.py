@@ -0,0 +1,75 @@
+# tests/test_stats.py
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from config import Config
+from models import db, TaskCounter
+
+API = "/api/v1"
+H = {"X-User-Id": "u1"}
+
+def _create(client, title, **fields):
+    r = client.post(f"{API}/tasks", json={"title": title, **fields}, headers=H)
+    assert r.status_code == 201
+    return r.get_json()["id"]
+
+def _stats(client, url=f"{API}/tasks/stats"):
+    seen = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT"):
+            seen.append(statement)
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        r = client.get(url, headers=H)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    assert r.status_code == 200
+    return r.get_json(), seen
+
+def _seed(client):
+    past = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+    later = (datetime.now(timezone.utc) + timedelta(days=5)).isoformat()
+    a = _create(client, "Feed", tags=["feeding"], priority="high", due_at=past)
+    b = _create(client, "Play", tags=["playing"], due_at=later)
+    c = _create(client, "Clean", tags=["feeding"], priority="low")   # due today by default
+    _create(client, "Other user", tags=["feeding"])
+    client.post(f"{API}/tasks", json={"title": "x"}, headers={"X-User-Id": "u2"})
+    client.post(f"{API}/tasks/{c}/complete", headers=H)
+    return a, b, c
+
+def test_stats_facets_in_one_query(client):
+    _seed(client)
+    stats, selects = _stats(client)
+    assert len(selects) == 1
+    assert stats["total"] == 4 and stats["completed"] == 1 and stats["open"] == 3
+    assert stats["by_status"] == {"todo": 3, "completed": 1}
+    assert stats["by_priority"] == {"high": 1, "medium": 2, "low": 1}
+    assert stats["by_tag"] == {"feeding": {"total": 3, "open": 2}, "playing": {"total": 1, "open": 1}}
+    assert stats["overdue"] == 1 and stats["due_today"] == 1
+    assert stats["source"] == "sql"
+    assert client.get(f"{API}/tasks/stats?utc_offset=abc", headers=H).status_code == 400
+
+def test_counters_follow_every_write(client, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_STATS_COUNTERS_ENABLED", True)
+    a, b, c = _seed(client)
+    first, _ = _stats(client)
+    assert first["source"] == "sql" and TaskCounter.query.filter_by(user_id="u1", facet="_ready").count() == 1
+    # set-based bulk writes drop the counters; the next read rebuilds them
+    d = _create(client, "New", tags=["playing"])
+    client.post(f"{API}/tasks/bulk", json={"action": "complete", "ids": [d]}, headers=H)
+    assert TaskCounter.query.filter_by(user_id="u1").count() == 0
+    assert _stats(client)[0]["source"] == "sql"
+
+    # single-task writes are applied as deltas
+    client.patch(f"{API}/tasks/{a}", json={"priority": "low", "tags": ["cleaning"]}, headers=H)
+    client.post(f"{API}/tasks/{b}/start", headers=H)
+    client.delete(f"{API}/tasks/{c}", headers=H)
+    client.post(f"{API}/tasks/{b}/complete", headers=H)
+
+    counted, selects = _stats(client)
+    assert len(selects) == 1 and counted["source"] == "counters"
+    monkeypatch.setattr(Config, "TASK_STATS_COUNTERS_ENABLED", False)
+    fresh, _ = _stats(client)
+    assert {k: v for k, v in counted.items() if k not in ("source", "as_of")} == \
+        {k: v for k, v in fresh.items() if k not in ("source", "as_of")}
+    assert fresh["by_tag"] == {"cleaning": {"total": 1, "open": 1}, "playing": {"total": 2, "open": 0},
+                               "feeding": {"total": 1, "open": 1}}
@@ -11,7 +11,7 @@
  */
 
 /* Import necessary modules and components */
-import React, { useEffect, useState, Fragment } from "react";
+import React, { useEffect, useRef, useState, Fragment } from "react";
 /* Import Pet_Service helper functions */
 import { fetchPetMe, fetchPetStatus } from "./pages/PetOverview.jsx";
 /* Google Auth import Login from "./pages/Login.jsx";*/
@@ -335,25 +335,60 @@ function HomePage() {
     }
   }, []);
 
+  // Delta sync: tasks by id, and the cursor of the last /tasks/changes call
+  const tasksById = useRef(new Map());
+  const syncCursor = useRef(null);
+
   useEffect(() => {
     fetchAndProcessTasks();
+    const t = setInterval(fetchAndProcessTasks, 30000); // only changes since the last poll
+    return () => clearInterval(t);
   }, []);
 
-  const fetchAndProcessTasks = async () => {
-    try {
-      setLoading(true);
-      const baseUrl = import.meta.env.VITE_API_GATEWAY_URL;
-      const response = await fetch(`${baseUrl}/v1/task-service/tasks`, {
+  // Apply GET /tasks/changes pages until caught up; false if nothing changed
+  const syncTasks = async () => {
+    const baseUrl = import.meta.env.VITE_API_GATEWAY_URL;
+    let changed = false;
+    while (true) {
+      const since = syncCursor.current ? `?since=${syncCursor.current}` : "";
+      const response = await fetch(`${baseUrl}/v1/task-service/tasks/changes${since}`, {
         method: "GET",
         headers: getAuthHeaders(),
       });
 
+      if (response.status === 204) {
+        // Nothing new: keep polling with the re-issued cursor so it never expires
+        syncCursor.current = response.headers.get("X-Sync-Cursor") || syncCursor.current;
+        return changed;
+      }
+      if (response.status === 410) {
+        // Cursor too old: start over from a full sync
+        syncCursor.current = null;
+        tasksById.current = new Map();
+        continue;
+      }
       if (!response.ok) {
-          throw new Error(`Failed to fetch tasks: ${response.statusText}`);
-        }
+        throw new Error(`Failed to fetch tasks: ${response.statusText}`);
+      }
 
       const data = await response.json();
-      const items = data.items || [];
+      (data.changes || []).forEach((task) => {
+        if (task.deleted_at) tasksById.current.delete(task.id);
+        else tasksById.current.set(task.id, task);
+      });
+      (data.removed || []).forEach((id) => tasksById.current.delete(id));
+      syncCursor.current = data.cursor;
+      changed = true;
+      if (!data.has_more) return changed;
+    }
+  };
+
+  const fetchAndProcessTasks = async () => {
+    try {
+      if (!syncCursor.current) setLoading(true);
+      if (!(await syncTasks())) return;
+
+      const items = Array.from(tasksById.current.values());
       setAllTasks(items);
       
       // Filter active tasks due this week (not completed)
@@ -1,122 +1,182 @@
-const statusMap = {
-  todo: "To Do",
-  in_progress: "In Progress",
-  done: "Completed",
-};
-
-const priorityMap = {
-  low: "Low",
-  medium: "Medium",
-  high: "High",
-};
-
-const tagMap = {
-  feeding: "Feeding",
-  cleaning: "Cleaning",
-  playing: "Playing",
-};
-
-// Convert backend value to UI value
-export const toUIValue = (type, value) => {
-  const maps = {
-    status: statusMap,
-    priority: priorityMap,
-    tag: tagMap,
-  };
-  return maps[type]?.[value?.toLowerCase()] || value;
-};
-
-// Convert UI value to backend value
-export const toBackendValue = (type, value) => {
-  const maps = {
-    status: reverseMap(statusMap),
-    priority: reverseMap(priorityMap),
-    tag: reverseMap(tagMap),
-  };
-  return maps[type]?.[value] || value;
-};
-
-// Helper to reverse a map
-const reverseMap = (map) => {
-  return Object.fromEntries(Object.entries(map).map(([k, v]) => [v, k]));
-};
-
-export function listenToEvents(onEvent) {
-  const eventSource = new EventSource(`${import.meta.env.VITE_BACKEND_URL}/v1/events`);
-
-  eventSource.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data);
-      onEvent(data);
-    } catch (err) {
-      console.error("Error parsing SSE event:", err);
-    }
-  };
-
-  eventSource.onerror = (err) => {
-    console.error("SSE connection error:", err);
-    eventSource.close();
-  };
-
-  return eventSource;
-}
-
-export function isoToDatetimeLocal(isoString) {
-  if (!isoString) return "";
-  
-  const date = new Date(isoString);
-  
-  // Convert to local timezone
-  const year = date.getFullYear();
-  const month = String(date.getMonth() + 1).padStart(2, "0");
-  const day = String(date.getDate()).padStart(2, "0");
-  const hours = String(date.getHours()).padStart(2, "0");
-  const minutes = String(date.getMinutes()).padStart(2, "0");
-  
-  return `${year}-${month}-${day}T${hours}:${minutes}`;
-}
-
-export function datetimeLocalToISO(datetimeLocal) {
-  if (!datetimeLocal) return null;
-  
-  // datetime-local is in browser's local time
-  const [datePart, timePart] = datetimeLocal.split("T");
-  const [year, month, day] = datePart.split("-");
-  const [hours, minutes] = timePart.split(":");
-  
-  // Create a date in local time
-  const date = new Date(year, parseInt(month) - 1, day, hours, minutes, 0);
-  
-  // Convert to ISO string
-  return date.toISOString();
-}
-
-export const formatDatetimeDisplay = (isoString) => {
-  if (!isoString) return "No due date";
-  
-  const date = new Date(isoString);
-  return date.toLocaleDateString("en-US", {
-    month: "short",
-    day: "numeric",
-    year: "numeric",
-    hour12: true,
-  });
-};
-
-export function getToday() {
-  const today = new Date();
-  today.setHours(23, 59, 0, 0);
-  return today.toISOString();
-}
-
-export function ensureDatetimeLocal(value) {
-  if (!value) return "";
-  
-  // If it's already in datetime-local format (YYYY-MM-DDTHH:MM)
-  if (/^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$/.test(value)) {
-    return value;
-  }
-  
-  // If it's ISO format, convert it
-  return isoToDatetimeLocal(value);
+const statusMap = {
+  todo: "To Do",
+  in_progress: "In Progress",
+  done: "Completed",
+};
+
+const priorityMap = {
+  low: "Low",
+  medium: "Medium",
+  high: "High",
+};
+
+const tagMap = {
+  feeding: "Feeding",
+  cleaning: "Cleaning",
+  playing: "Playing",
+};
+
+// Convert backend value to UI value
+export const toUIValue = (type, value) => {
+  const maps = {
+    status: statusMap,
+    priority: priorityMap,
+    tag: tagMap,
+  };
+  return maps[type]?.[value?.toLowerCase()] || value;
+};
+
+// Convert UI value to backend value
+export const toBackendValue = (type, value) => {
+  const maps = {
+    status: reverseMap(statusMap),
+    priority: reverseMap(priorityMap),
+    tag: reverseMap(tagMap),
+  };
+  return maps[type]?.[value] || value;
+};
+
+// Helper to reverse a map
+const reverseMap = (map) => {
+  return Object.fromEntries(Object.entries(map).map(([k, v]) => [v, k]));
+};
+
+// Subscribe to the current user's real-time events. `types` optionally
+// limits the stream to some event types, e.g. ["task_deleted"].
+//
+// The stream is opened with a ticket from POST /v1/events/ticket (it outlives
+// the 15-minute access token). On error the connection is reopened with a
+// fresh ticket and the last received event id, so missed events are replayed.
+// Returns an object with close().
+export function listenToEvents(onEvent, types = []) {
+  const baseUrl = import.meta.env.VITE_BACKEND_URL;
+  let eventSource = null;
+  let lastEventId = null;
+  let retryTimer = null;
+  let retryDelay = 1000;
+  let closed = false;
+
+  const fetchTicket = async () => {
+    const token = localStorage.getItem("access_token");
+    const res = await fetch(`${baseUrl}/v1/events/ticket`, {
+      method: "POST",
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!res.ok) throw new Error(`Event stream ticket failed: ${res.status}`);
+    return (await res.json()).ticket;
+  };
+
+  const connect = async () => {
+    let ticket;
+    try {
+      ticket = await fetchTicket();
+    } catch (err) {
+      console.error("SSE connection error:", err);
+      scheduleReconnect();
+      return;
+    }
+    if (closed) return;
+
+    const params = new URLSearchParams({ ticket });
+    if (types.length) params.set("types", types.join(","));
+    if (lastEventId) params.set("last_event_id", lastEventId);
+    eventSource = new EventSource(`${baseUrl}/v1/events?${params.toString()}`);
+
+    eventSource.onopen = () => {
+      retryDelay = 1000;
+    };
+
+    eventSource.onmessage = (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+      try {
+        const data = JSON.parse(event.data);
+        onEvent(data);
+      } catch (err) {
+        console.error("Error parsing SSE event:", err);
+      }
+    };
+
+    eventSource.onerror = (err) => {
+      console.error("SSE connection error:", err);
+      // Reconnect ourselves: the browser would retry with the old URL (and ticket)
+      eventSource.close();
+      scheduleReconnect();
+    };
+  };
+
+  const scheduleReconnect = () => {
+    if (closed) return;
+    retryTimer = setTimeout(connect, retryDelay);
+    retryDelay = Math.min(retryDelay * 2, 30000);
+  };
+
+  connect();
+
+  return {
+    close() {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (eventSource) eventSource.close();
+    },
+  };
+}
+
+export function isoToDatetimeLocal(isoString) {
+  if (!isoString) return "";
+  
+  const date = new Date(isoString);
+  
+  // Convert to local timezone
+  const year = date.getFullYear();
+  const month = String(date.getMonth() + 1).padStart(2, "0");
+  const day = String(date.getDate()).padStart(2, "0");
+  const hours = String(date.getHours()).padStart(2, "0");
+  const minutes = String(date.getMinutes()).padStart(2, "0");
+  
+  return `${year}-${month}-${day}T${hours}:${minutes}`;
+}
+
+export function datetimeLocalToISO(datetimeLocal) {
+  if (!datetimeLocal) return null;
+  
+  // datetime-local is in browser's local time
+  const [datePart, timePart] = datetimeLocal.split("T");
+  const [year, month, day] = datePart.split("-");
+  const [hours, minutes] = timePart.split(":");
+  
+  // Create a date in local time
+  const date = new Date(year, parseInt(month) - 1, day, hours, minutes, 0);
+  
+  // Convert to ISO string
+  return date.toISOString();
+}
+
+export const formatDatetimeDisplay = (isoString) => {
+  if (!isoString) return "No due date";
+  
+  const date = new Date(isoString);
+  return date.toLocaleDateString("en-US", {
+    month: "short",
+    day: "numeric",
+    year: "numeric",
+    hour12: true,
+  });
+};
+
+export function getToday() {
+  const today = new Date();
+  today.setHours(23, 59, 0, 0);
+  return today.toISOString();
+}
+
+export function ensureDatetimeLocal(value) {
+  if (!value) return "";
+  
+  // If it's already in datetime-local format (YYYY-MM-DDTHH:MM)
+  if (/^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$/.test(value)) {
+    return value;
+  }
+  
+  // If it's ISO format, convert it
+  return isoToDatetimeLocal(value);
 }
\ No newline at end of file
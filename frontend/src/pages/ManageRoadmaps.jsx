@@ -95,32 +95,25 @@ export default function ManageRoadmaps() {
           }
         });
 
-        // Fetch task details for all assigned tasks
+        // Fetch task details for all assigned tasks in one request
         if (allTaskIds.size > 0) {
-          const taskPromises = Array.from(allTaskIds).map(async (taskId) => {
-            try {
-              const taskResponse = await fetch(`${baseUrl}/v1/task-service/tasks/${taskId}`, {
-                method: "GET",
-                headers: getAuthHeaders(),
+          try {
+            const taskResponse = await fetch(`${baseUrl}/v1/task-service/tasks/lookup`, {
+              method: "POST",
+              headers: getAuthHeaders(),
+              body: JSON.stringify({ ids: Array.from(allTaskIds) }),
+            });
+            if (taskResponse.ok) {
+              const { items } = await taskResponse.json();
+              const tasksMapObj = {};
+              items.forEach((task) => {
+                tasksMapObj[task.id] = task;
               });
-              if (taskResponse.ok) {
-                const taskData = await taskResponse.json();
-                return { id: taskId, task: taskData };
-              }
-            } catch (err) {
-              console.error(`Error fetching task ${taskId}:`, err);
+              setTasksMap(tasksMapObj);
             }
-            return null;
-          });
-
-          const taskResults = await Promise.all(taskPromises);
-          const tasksMapObj = {};
-          taskResults.forEach((result) => {
-            if (result && result.task) {
-              tasksMapObj[result.id] = result.task;
-            }
-          });
-          setTasksMap(tasksMapObj);
+          } catch (err) {
+            console.error("Error fetching roadmap tasks:", err);
+          }
         }
 
         setError(null);
@@ -4,7 +4,8 @@
 // High-level UI for a single virtual pet:
 // - Loads pet profile, current status, and action-point balances from the API.
 // - Polls for updates on an interval.
-// - Triggers backend actions (feed/play/clean) that spend points and may level up.
+// - Triggers backend actions (feed/play/clean) that spend points and may level up;
+//   rapid clicks are batched into one request.
 // - Shows a lightweight "Level Up" modal when the pet gains a level.
 //
 // Notes
@@ -222,18 +223,35 @@ export default function PetOverview() {
     setTimeout(() => setShowLevelup(false), 2500);
   };
 
-  // Execute an action on the backend; handles common error messages and
-  // re-fetches point totals after a successful spend. Also triggers level-up UI.
-  const doAction = async (action /* 'feed' | 'play' | 'clean' */) => {
+  // Clicks are queued and sent as one POST /pets/me/actions batch once the
+  // user pauses (or the current batch returns), so a burst of clicks costs
+  // one request instead of one per click.
+  const ACTION_BATCH_DELAY_MS = 300;
+  const ACTION_BATCH_MAX = 50; // PET_ACTIONS_BATCH_MAX on the pet service
+  const queueRef = useRef([]);
+  const flushTimerRef = useRef(null);
+  const inFlightRef = useRef(false);
+
+  const doAction = (action /* 'feed' | 'play' | 'clean' */) => {
+    queueRef.current.push(action);
+    clearTimeout(flushTimerRef.current);
+    flushTimerRef.current = setTimeout(flushActions, ACTION_BATCH_DELAY_MS);
+  };
+
+  // Send the queued actions; handles common error messages, applies the
+  // returned pet and point totals, and triggers level-up UI.
+  const flushActions = async () => {
+    if (inFlightRef.current || queueRef.current.length === 0) return;
+    const batch = queueRef.current.slice(0, ACTION_BATCH_MAX);
+    queueRef.current = queueRef.current.slice(ACTION_BATCH_MAX);
+    inFlightRef.current = true;
     try {
       const beforeLevel = Number(levelRef.current || 0);
-      const res = await fetch(
-        `${baseUrl}/v1/pet-service/pets/me/actions/${action}`,
-        {
-          method: "POST",
-          headers: getAuthHeaders(), 
-        }
-      );
+      const res = await fetch(`${baseUrl}/v1/pet-service/pets/me/actions`, {
+        method: "POST",
+        headers: getAuthHeaders(),
+        body: JSON.stringify({ actions: batch }),
+      });
       if (!res.ok) {
         const txt = await res.text();
         if (txt && txt.includes("insufficient_points")) {
@@ -242,7 +260,7 @@ export default function PetOverview() {
         throw new Error(`Action failed: ${txt || res.statusText}`);
       }
 
-      // Expect shape { pet: {...updated fields...} }
+      // Expect shape { pet: {...updated fields...}, applied: [...], stopped }
       const data = await res.json();
       const updatedPet = data?.pet || {};
 
@@ -258,15 +276,38 @@ export default function PetOverview() {
         return next;
       });
 
-      // Refresh point balances after a spend to reflect the new totals.
-      fetchPoints();
+      // The returned pet carries the new point totals.
+      setPoints((prev) => ({
+        ...prev,
+        feeding: updatedPet.feeding_points ?? prev.feeding,
+        playing: updatedPet.playing_points ?? prev.playing,
+        cleaning: updatedPet.cleaning_points ?? prev.cleaning,
+      }));
+
+      if (data?.stopped) {
+        const skipped = batch.length - data.stopped.index;
+        throw new Error(
+          `Not enough points: ${skipped} of ${batch.length} action(s) not applied.`
+        );
+      }
     } catch (e) {
       console.error(e);
       // Keep user-facing feedback brief and actionable.
       alert(e.message || "Could not apply action.");
+    } finally {
+      inFlightRef.current = false;
+      // Clicks that arrived while this batch was in flight go out next.
+      if (queueRef.current.length > 0) flushActions();
     }
   };
 
+  // Send anything still queued when leaving the page.
+  useEffect(() => () => {
+    clearTimeout(flushTimerRef.current);
+    flushActions();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
   const [showChecklist, setShowChecklist] = useState(false);
   return (
     <div className="po-page">
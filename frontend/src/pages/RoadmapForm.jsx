@@ -111,24 +111,19 @@ export default function RoadmapForm() {
             .filter((taskId) => !existingTaskIds.has(taskId));
 
           if (missingTaskIds.length) {
-            const fetchedTasks = await Promise.all(
-              missingTaskIds.map(async (taskId) => {
-                try {
-                  const res = await fetch(`${baseUrl}/v1/task-service/tasks/${taskId}`, {
-                    method: "GET",
-                    headers: getAuthHeaders(),
-                  });
-                  if (res.ok) {
-                    return await res.json();
-                  }
-                } catch (error) {
-                  console.error(`Failed to fetch task ${taskId}:`, error);
-                }
-                return null;
-              })
-            );
-
-            mergedTasks = mergedTasks.concat(fetchedTasks.filter(Boolean));
+            try {
+              const res = await fetch(`${baseUrl}/v1/task-service/tasks/lookup`, {
+                method: "POST",
+                headers: getAuthHeaders(),
+                body: JSON.stringify({ ids: missingTaskIds }),
+              });
+              if (res.ok) {
+                const { items } = await res.json();
+                mergedTasks = mergedTasks.concat(items);
+              }
+            } catch (error) {
+              console.error("Failed to fetch roadmap tasks:", error);
+            }
           }
         }
 
@@ -143,23 +143,34 @@ export default function TasksPageUI() {
       setLoading(true);
       const baseUrl = import.meta.env.VITE_API_GATEWAY_URL;
 
-      const response = await fetch(`${baseUrl}/v1/task-service/tasks`, {
-        method: "GET",
-        headers: getAuthHeadersLocal(),
-      });
+      // Only the fields this page shows; the counts come from the stats endpoint
+      const [response, statsResponse] = await Promise.all([
+        fetch(`${baseUrl}/v1/task-service/tasks?fields=title,status,tags,due_at`, {
+          method: "GET",
+          headers: getAuthHeadersLocal(),
+        }),
+        fetch(`${baseUrl}/v1/task-service/tasks/stats?utc_offset=${-new Date().getTimezoneOffset()}`, {
+          method: "GET",
+          headers: getAuthHeadersLocal(),
+        }),
+      ]);
 
       if (!response.ok) {
         throw new Error(`Failed to fetch tasks: ${response.statusText}`);
       }
+      if (!statsResponse.ok) {
+        throw new Error(`Failed to fetch task stats: ${statsResponse.statusText}`);
+      }
 
       const data = await response.json();
       const allTasks = data.items || [];
 
-      // Calculate statistics from ALL tasks
-      const total = allTasks.length;
-      const completed = allTasks.filter((task) => task.status === "completed").length;
-      const inProgress = allTasks.filter((task) => task.status === "in_progress").length;
-      const pending = allTasks.filter((task) => task.status !== "completed").length;
+      // Counted by the task service over ALL tasks, not just this page
+      const counts = await statsResponse.json();
+      const total = counts.total;
+      const completed = counts.completed;
+      const inProgress = counts.by_status?.in_progress || 0;
+      const pending = counts.open;
 
       console.log("Task stats:", { total, completed, inProgress, pending });
 